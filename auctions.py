@@ -0,0 +1,99 @@
+"""
+Auction engine for TadzzyBot
+Auctions live in data["auctions"] (player_name -> auction dict). Their deadlines
+are epoch seconds registered on the shared DeadlineScheduler, which settles
+them automatically when they expire; bids inside the last few minutes push the
+deadline out (anti-snipe).
+"""
+
+import time
+from datetime import datetime, timezone
+from typing import Callable, Optional
+
+ANTI_SNIPE_SECONDS = 5 * 60
+
+
+def to_epoch(ends_at) -> float:
+    """Deadlines used to be naive UTC ISO strings; accept both forms."""
+    if isinstance(ends_at, (int, float)):
+        return float(ends_at)
+    return datetime.fromisoformat(ends_at).replace(tzinfo=timezone.utc).timestamp()
+
+
+class AuctionEngine:
+    def __init__(self, auctions: dict, scheduler, on_expire: Callable[[str], object],
+                 mark: Callable[[str], None]):
+        self.auctions = auctions
+        self.scheduler = scheduler
+        self.on_expire = on_expire
+        self.mark = mark
+
+    def _expired(self, key):
+        return self.on_expire(key[1])
+
+    def _schedule(self, name: str, ends_at: float):
+        self.scheduler.schedule(("auction", name), ends_at, self._expired)
+
+    def load(self, auctions: dict) -> int:
+        """Adopt a freshly loaded auctions section: convert deadlines and schedule active ones."""
+        self.auctions = auctions
+        scheduled = 0
+        for name, auction in auctions.items():
+            if not auction.get("active", False):
+                continue
+            ends_at = auction.get("ends_at")
+            if not isinstance(ends_at, (int, float)):
+                auction["ends_at"] = to_epoch(ends_at) if ends_at else time.time()
+                self.mark(name)
+            # Already-expired auctions fire on the scheduler's first pass
+            self._schedule(name, auction["ends_at"])
+            scheduled += 1
+        return scheduled
+
+    def get_active(self, name: str) -> Optional[dict]:
+        auction = self.auctions.get(name)
+        if auction and auction.get("active", False):
+            return auction
+        return None
+
+    def open(self, name: str, created_by: str, channel_id: Optional[int], duration_seconds: float) -> dict:
+        ends_at = time.time() + duration_seconds
+        auction = {
+            "highest_bid": 0,
+            "highest_bidder": None,
+            "active": True,
+            "created_by": created_by,
+            "channel_id": channel_id,
+            "ends_at": ends_at,
+        }
+        self.auctions[name] = auction
+        self.mark(name)
+        self._schedule(name, ends_at)
+        return auction
+
+    def is_expired(self, auction: dict, now: Optional[float] = None) -> bool:
+        return (now or time.time()) > auction["ends_at"]
+
+    def place_bid(self, name: str, bidder: str, amount: int, now: Optional[float] = None) -> float:
+        """Record a bid that has already been validated. Returns the (possibly extended) deadline."""
+        now = now or time.time()
+        auction = self.auctions[name]
+        auction["highest_bid"] = int(amount)
+        auction["highest_bidder"] = bidder
+        new_end = max(auction["ends_at"], now + ANTI_SNIPE_SECONDS)
+        if new_end != auction["ends_at"]:
+            auction["ends_at"] = new_end
+            self._schedule(name, new_end)
+        self.mark(name)
+        return new_end
+
+    def close(self, name: str):
+        auction = self.auctions.get(name)
+        if auction is not None:
+            auction["active"] = False
+            self.mark(name)
+        self.scheduler.cancel(("auction", name))
+
+    @property
+    def active_count(self) -> int:
+        return sum(1 for a in self.auctions.values() if a.get("active", False))
@@ -0,0 +1,277 @@
+"""
+Deduplicated backups for TadzzyBot
+A backup is a small manifest plus content-addressed chunks:
+- each per-user section is cut into chunks of about CHUNK_TARGET records. Chunk
+  boundaries depend only on the record keys (a chunk ends after a key whose crc32
+  is 0 mod CHUNK_TARGET), so a change to one user only changes that user's
+  chunk and every other chunk is shared with the previous backup
+- chunks are named by the sha256 of their content and stored compressed
+  (zlib or lzma); chunks that already exist are not compressed or written again
+- retention keeps the newest backup of each of the last N hours / days / weeks
+  and deletes chunks no remaining manifest refers to. The sweep leaves .tmp
+  files and chunks touched since the oldest backup still being written alone
+  (create touches every chunk it reuses), so a concurrent create never loses
+  a chunk its manifest is about to name
+- verify re-hashes every chunk of a backup; restore rebuilds its data dict
+
+All of this is blocking and meant to run in a worker thread.
+
+Usage: python backups.py list|verify <id>|restore <id> [out_file]   (store: backups/)
+"""
+
+import hashlib
+import json
+import lzma
+import os
+import sys
+import threading
+import time
+import zlib
+from datetime import datetime, timezone
+from typing import Dict, List, Tuple
+
+from persistence import json_default, write_json_atomic
+
+CHUNK_TARGET = 512
+CODECS = {
+    "zlib": (b"z", lambda raw: zlib.compress(raw, 6), zlib.decompress),
+    "lzma": (b"x", lambda raw: lzma.compress(raw, preset=6), lzma.decompress),
+}
+_DECODERS = {marker: decompress for marker, _compress, decompress in CODECS.values()}
+
+
+def _dumps(obj) -> bytes:
+    # Deterministic text, so identical records always hash the same
+    return json.dumps(obj, sort_keys=True, ensure_ascii=False, separators=(",", ":"),
+                      default=json_default).encode("utf-8")
+
+
+def split_records(section: dict, target: int = CHUNK_TARGET) -> List[dict]:
+    chunks = []
+    current = {}
+    for key in sorted(section):
+        current[key] = section[key]
+        if zlib.crc32(key.encode("utf-8")) % target == 0:
+            chunks.append(current)
+            current = {}
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def keep_ids(backups: List[Tuple[str, float]], hourly: int, daily: int, weekly: int) -> set:
+    """Newest backup in each of the most recent `hourly` hours, `daily` days and `weekly` weeks."""
+    newest_first = sorted(backups, key=lambda b: b[1], reverse=True)
+    keep = {newest_first[0][0]} if newest_first else set()
+    for count, period in ((hourly, 3600), (daily, 86400), (weekly, 7 * 86400)):
+        periods = set()
+        for backup_id, created in newest_first:
+            if len(periods) >= count:
+                break
+            slot = int(created // period)
+            if slot not in periods:
+                periods.add(slot)
+                keep.add(backup_id)
+    return keep
+
+
+class BackupStore:
+    def __init__(self, root: str, codec: str = "zlib"):
+        if codec not in CODECS:
+            raise ValueError(f"Unknown backup codec '{codec}' (use {', '.join(CODECS)})")
+        self.root = root
+        self.codec = codec
+        self.chunk_dir = os.path.join(root, "chunks")
+        self.manifest_dir = os.path.join(root, "manifests")
+        self._creating: Dict[object, float] = {}  # token -> start time of backups being written
+        self._creating_lock = threading.Lock()
+
+    # -----------------------------
+    # Chunks
+    # -----------------------------
+    def _chunk_path(self, digest: str) -> str:
+        return os.path.join(self.chunk_dir, digest[:2], digest)
+
+    def _put(self, raw: bytes, stats: dict) -> str:
+        digest = hashlib.sha256(raw).hexdigest()
+        path = self._chunk_path(digest)
+        stats["chunks"] += 1
+        stats["raw_bytes"] += len(raw)
+        if os.path.exists(path):
+            try:
+                os.utime(path)  # mark it in use for a concurrent prune
+                return digest
+            except FileNotFoundError:
+                pass  # swept just now; write it again
+        marker, compress, _decompress = CODECS[self.codec]
+        blob = marker + compress(raw)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(blob)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+        stats["new_chunks"] += 1
+        stats["new_bytes"] += len(blob)
+        return digest
+
+    def _get(self, digest: str) -> bytes:
+        with open(self._chunk_path(digest), "rb") as f:
+            blob = f.read()
+        decompress = _DECODERS.get(blob[:1])
+        if decompress is None:
+            raise ValueError(f"Chunk {digest[:12]} has an unknown codec")
+        raw = decompress(blob[1:])
+        if hashlib.sha256(raw).hexdigest() != digest:
+            raise ValueError(f"Chunk {digest[:12]} is corrupt (hash mismatch)")
+        return raw
+
+    # -----------------------------
+    # Manifests
+    # -----------------------------
+    def _manifest_path(self, backup_id: str) -> str:
+        return os.path.join(self.manifest_dir, backup_id + ".json")
+
+    def create(self, snapshot: Dict[str, object]) -> dict:
+        """Back up a snapshot (see persistence.take_snapshot). Returns the manifest."""
+        now = time.time()
+        token = object()
+        with self._creating_lock:
+            self._creating[token] = now
+        try:
+            return self._create(snapshot, now)
+        finally:
+            with self._creating_lock:
+                self._creating.pop(token, None)
+
+    def _create(self, snapshot: Dict[str, object], now: float) -> dict:
+        start = time.perf_counter()
+        os.makedirs(self.manifest_dir, exist_ok=True)
+        backup_id = datetime.fromtimestamp(now, timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        n = 1
+        while os.path.exists(self._manifest_path(backup_id)):
+            n += 1
+            backup_id = f"{backup_id.split('-')[0]}-{n}"
+        stats = {"chunks": 0, "new_chunks": 0, "raw_bytes": 0, "new_bytes": 0}
+        sections = {}
+        for name, value in snapshot.items():
+            if isinstance(value, dict):
+                chunks = [self._put(_dumps(part), stats) for part in split_records(value)]
+                sections[name] = {"records": len(value), "chunks": chunks}
+            else:
+                sections[name] = {"whole": self._put(_dumps(value), stats)}
+        manifest = {
+            "id": backup_id,
+            "created_at": now,
+            "codec": self.codec,
+            "sections": sections,
+            "stats": dict(stats, seconds=round(time.perf_counter() - start, 3)),
+        }
+        write_json_atomic(self._manifest_path(backup_id), manifest, None)
+        return manifest
+
+    def list(self) -> List[dict]:
+        """Manifests, oldest first."""
+        if not os.path.isdir(self.manifest_dir):
+            return []
+        manifests = []
+        for fname in os.listdir(self.manifest_dir):
+            if fname.endswith(".json"):
+                try:
+                    manifests.append(self.manifest(fname[:-5]))
+                except Exception as e:
+                    print(f"[Backup] Unreadable manifest {fname}:", e)
+        return sorted(manifests, key=lambda m: m["created_at"])
+
+    def manifest(self, backup_id: str) -> dict:
+        with open(self._manifest_path(backup_id), "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def verify(self, backup_id: str) -> List[str]:
+        """Problems found (missing or corrupt chunks); empty means restorable."""
+        problems = []
+        for name, spec in self.manifest(backup_id)["sections"].items():
+            for digest in spec.get("chunks", [spec.get("whole")]):
+                try:
+                    self._get(digest)
+                except FileNotFoundError:
+                    problems.append(f"{name}: chunk {digest[:12]} is missing")
+                except Exception as e:
+                    problems.append(f"{name}: {e}")
+        return problems
+
+    def restore(self, backup_id: str) -> Dict[str, object]:
+        data = {}
+        for name, spec in self.manifest(backup_id)["sections"].items():
+            if "whole" in spec:
+                data[name] = json.loads(self._get(spec["whole"]))
+                continue
+            section = {}
+            for digest in spec["chunks"]:
+                section.update(json.loads(self._get(digest)))
+            data[name] = section
+        return data
+
+    # -----------------------------
+    # Retention
+    # -----------------------------
+    def prune(self, hourly: int = 24, daily: int = 7, weekly: int = 8) -> Tuple[int, int]:
+        """Apply retention, then delete unreferenced chunks. Returns (backups, chunks) removed."""
+        manifests = self.list()
+        keep = keep_ids([(m["id"], m["created_at"]) for m in manifests], hourly, daily, weekly)
+        removed = 0
+        live = set()
+        for m in manifests:
+            if m["id"] in keep:
+                for spec in m["sections"].values():
+                    live.update(spec.get("chunks", [spec.get("whole")]))
+            else:
+                os.remove(self._manifest_path(m["id"]))
+                removed += 1
+        swept = 0
+        if removed and os.path.isdir(self.chunk_dir):
+            with self._creating_lock:
+                # Chunks touched after this may belong to a manifest not written yet
+                cutoff = min(self._creating.values(), default=time.time()) - 1
+            for sub in os.listdir(self.chunk_dir):
+                subdir = os.path.join(self.chunk_dir, sub)
+                for fname in os.listdir(subdir):
+                    if fname in live or fname.endswith(".tmp"):
+                        continue
+                    path = os.path.join(subdir, fname)
+                    try:
+                        if os.path.getmtime(path) >= cutoff:
+                            continue
+                        os.remove(path)
+                    except FileNotFoundError:
+                        continue
+                    swept += 1
+        return removed, swept
+
+
+def describe(manifest: dict) -> str:
+    stats = manifest["stats"]
+    created = datetime.fromtimestamp(manifest["created_at"], timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
+    return (f"{manifest['id']} ({created}): {stats['chunks']:,} chunks, {stats['new_chunks']:,} new, "
+            f"{stats['new_bytes'] / 1e6:.2f}MB written for {stats['raw_bytes'] / 1e6:.1f}MB of data")
+
+
+if __name__ == "__main__":
+    store = BackupStore("backups")
+    command = sys.argv[1] if len(sys.argv) > 1 else ""
+    if command == "list":
+        for m in store.list():
+            print(describe(m))
+    elif command == "verify" and len(sys.argv) > 2:
+        problems = store.verify(sys.argv[2])
+        print("OK" if not problems else "\n".join(problems))
+        sys.exit(1 if problems else 0)
+    elif command == "restore" and len(sys.argv) > 2:
+        out = sys.argv[3] if len(sys.argv) > 3 else f"tadzzy_data.restored_{sys.argv[2]}.json"
+        start = time.perf_counter()
+        size = write_json_atomic(out, store.restore(sys.argv[2]))
+        print(f"Restored {sys.argv[2]} to {out} ({size:,} bytes) in {time.perf_counter() - start:.2f}s")
+    else:
+        print(__doc__)
+        sys.exit(1)
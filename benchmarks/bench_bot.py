@@ -0,0 +1,357 @@
+"""
+Offline load test for the whole bot: bot.py's real commands and background
+tasks run against a fake gateway and a fake HTTP layer, with no network.
+- the fake gateway builds one guild with a text channel per simulated user
+  and injects messages straight into bot.on_message (so XP, the guess
+  listener and command dispatch all run), reactions via bot.dispatch and
+  button clicks as INTERACTION_CREATE events
+- the fake HTTP layer replaces HTTPClient.request, records every outgoing
+  call by route and returns payloads discord.py can parse
+- messages are injected open-loop at --rate per second for --duration
+  seconds in the chosen mix; latency is from injection until the handler
+  returns (for !sell that includes the ✅ confirmation, sent as soon as the
+  bot starts waiting for it)
+
+Reports commands/s, per-kind latency percentiles, HTTP calls, loop lag and
+memory. Run it before and after a performance change. Data files are written
+to a temporary directory.
+
+Usage: python benchmarks/bench_bot.py [--users 500] [--rate 200] [--duration 20]
+                                      [--mix chat=50,buy=12,sell=10,bid=10,trade=6,leaderboard=8,browse=4]
+"""
+
+import argparse
+import asyncio
+import gc
+import itertools
+import os
+import random
+import re
+import tempfile
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+from functools import lru_cache
+from urllib.parse import unquote
+
+import synthetic
+
+DEFAULT_MIX = "chat=50,buy=12,sell=10,bid=10,trade=6,leaderboard=8,browse=4"
+
+
+def rss_mb(field: str = "VmRSS") -> float:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(field + ":"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def percentile(sorted_values, q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+@lru_cache(maxsize=None)
+def _route_pattern(path: str):
+    return re.compile(re.sub(r"\\{(\w+)\\}", r"(?P<\1>[^/]+)", re.escape(path)) + "$")
+
+
+def route_params(route) -> dict:
+    """Path parameters of a discord.http.Route (it only keeps channel_id/guild_id as attributes)."""
+    m = _route_pattern(route.path).search(route.url)
+    return {k: unquote(v) for k, v in m.groupdict().items()} if m else {}
+
+
+class FakeHTTP:
+    """Stands in for HTTPClient.request: records the call, returns a plausible payload."""
+
+    def __init__(self, harness: "Harness"):
+        self.harness = harness
+        self.calls = Counter()
+
+    async def request(self, route, *, files=None, form=None, **kwargs):
+        h = self.harness
+        self.calls[f"{route.method} {route.path}"] += 1
+        path = route.path
+        params = route_params(route)
+        if path.startswith("/channels/{channel_id}/messages") and "reactions" not in path:
+            if route.method in ("POST", "PATCH"):
+                message_id = params.get("message_id") or h.snowflake()
+                payload = h.message_payload(int(route.channel_id), h.bot_user, "", message_id=message_id)
+                body = kwargs.get("json") or {}
+                payload["components"] = body.get("components", [])
+                h.last_message[int(route.channel_id)] = payload
+                return payload
+            return None
+        if "/reactions/" in path and route.method == "PUT":
+            # Confirmation prompts add ✅ then ❌ and then wait; answer once both are on
+            if params.get("emoji") == "❌":
+                h.confirm_soon(int(route.channel_id), int(params["message_id"]))
+            return None
+        if path == "/users/@me/channels":
+            recipient = h.user_payload(int(kwargs["json"]["recipient_id"]))
+            return {"id": str(h.snowflake()), "type": 1, "recipients": [recipient], "last_message_id": None}
+        if path == "/users/{user_id}":
+            return h.user_payload(int(params["user_id"]))
+        return None
+
+    async def webhook_request(self, route, session=None, *, payload=None, **kwargs):
+        """Stands in for the webhook adapter, which carries interaction responses."""
+        self.calls[f"{route.method} {route.path}"] += 1
+        if route.path.endswith("/callback"):
+            waiter = self.harness.interactions.pop(int(route_params(route)["webhook_id"]), None)
+            if waiter is not None and not waiter.done():
+                waiter.set_result(payload)
+        return None
+
+
+class Harness:
+    def __init__(self, tadzzy, users: int, seed: int = 1):
+        import discord
+        self.discord = discord
+        self.tadzzy = tadzzy
+        self.bot = tadzzy.bot
+        self.rng = random.Random(seed)
+        self._ids = itertools.count(discord.utils.time_snowflake(datetime.now(timezone.utc)))
+        self.guild_id = self.snowflake()
+        self.bot_user = {"id": str(self.snowflake()), "username": "TadzzyBot", "discriminator": "0",
+                         "avatar": None, "bot": True}
+        self.user_ids = [self.snowflake() for _ in range(users)]
+        self.channel_of = {uid: self.snowflake() for uid in self.user_ids}
+        self.owner_of = {cid: uid for uid, cid in self.channel_of.items()}
+        self.last_message = {}  # channel id -> payload of the bot's latest message there
+        self.interactions = {}  # interaction id -> future resolved by the interaction response
+        self.http = FakeHTTP(self)
+
+    def snowflake(self) -> int:
+        return next(self._ids)
+
+    # -----------------------------
+    # Payloads
+    # -----------------------------
+    def user_payload(self, uid: int) -> dict:
+        return {"id": str(uid), "username": f"user{uid % 100000}", "discriminator": "0", "avatar": None}
+
+    def member_payload(self, uid: int) -> dict:
+        return {"user": self.user_payload(uid), "roles": [], "joined_at": "2024-01-01T00:00:00+00:00",
+                "deaf": False, "mute": False, "flags": 0}
+
+    def message_payload(self, channel_id: int, author: dict, content: str, message_id=None, mentions=()) -> dict:
+        payload = {
+            "id": str(message_id or self.snowflake()), "channel_id": str(channel_id), "guild_id": str(self.guild_id),
+            "author": author, "content": content, "timestamp": datetime.now(timezone.utc).isoformat(),
+            "edited_timestamp": None, "tts": False, "mention_everyone": False, "mention_roles": [],
+            "mentions": [dict(self.user_payload(m), member=self.member_payload(m)) for m in mentions],
+            "attachments": [], "embeds": [], "pinned": False, "type": 0,
+        }
+        if not author.get("bot"):
+            payload["member"] = {k: v for k, v in self.member_payload(int(author["id"])).items() if k != "user"}
+        return payload
+
+    # -----------------------------
+    # Fake gateway
+    # -----------------------------
+    async def connect(self):
+        """What login + READY + GUILD_CREATE would have done."""
+        bot, discord = self.bot, self.discord
+        await bot._async_setup_hook()
+        bot.http.request = self.http.request
+        discord.webhook.async_.async_context.get().request = self.http.webhook_request
+        state = bot._connection
+        state.user = discord.ClientUser(state=state, data=self.bot_user)
+        self.guild = state._add_guild_from_data({
+            "id": str(self.guild_id), "name": "Load test", "owner_id": self.bot_user["id"],
+            "member_count": len(self.user_ids) + 1,
+            "roles": [{"id": str(self.guild_id), "name": "@everyone", "permissions": "0", "position": 0,
+                       "color": 0, "hoist": False, "managed": False, "mentionable": False}],
+            "channels": [{"id": str(cid), "type": 0, "name": f"chan-{n}", "position": n,
+                          "permission_overwrites": [], "guild_id": str(self.guild_id)}
+                         for n, cid in enumerate(self.channel_of.values())],
+            "members": [self.member_payload(uid) for uid in self.user_ids],
+        })
+        bot._ready.set()
+
+    async def send(self, uid: int, content: str, mentions=()):
+        channel = self.guild.get_channel(self.channel_of[uid])
+        payload = self.message_payload(channel.id, self.user_payload(uid), content, mentions=mentions)
+        message = self.discord.Message(state=self.bot._connection, channel=channel, data=payload)
+        await self.tadzzy.on_message(message)
+
+    async def click(self, uid: int, custom_id: str, timeout: float = 10) -> dict:
+        """Press a button on the bot's latest message in uid's channel; returns the interaction response."""
+        channel_id = self.channel_of[uid]
+        interaction_id = self.snowflake()
+        waiter = self.interactions[interaction_id] = asyncio.get_running_loop().create_future()
+        self.bot._connection.parse_interaction_create({
+            "id": str(interaction_id), "application_id": self.bot_user["id"], "type": 3, "token": "token",
+            "version": 1, "guild_id": str(self.guild_id), "channel_id": str(channel_id),
+            "member": dict(self.member_payload(uid), permissions="0"), "message": self.last_message[channel_id],
+            "data": {"custom_id": custom_id, "component_type": 2}, "locale": "en-US", "guild_locale": "en-US",
+            "app_permissions": "0",
+        })
+        return await asyncio.wait_for(waiter, timeout)
+
+    def confirm_soon(self, channel_id: int, message_id: int):
+        # Runs after the command has registered its wait_for
+        asyncio.get_running_loop().call_soon(self._confirm, channel_id, message_id)
+
+    def _confirm(self, channel_id: int, message_id: int):
+        uid = self.owner_of.get(channel_id)
+        if uid is None:
+            return
+        channel = self.guild.get_channel(channel_id)
+        message = self.discord.Message(state=self.bot._connection, channel=channel,
+                                       data=self.message_payload(channel_id, self.bot_user, "", message_id=message_id))
+        reaction = self.discord.Reaction(message=message, data={"count": 1, "me": False,
+                                                                "emoji": {"id": None, "name": "✅"}}, emoji="✅")
+        self.bot.dispatch("reaction_add", reaction, self.guild.get_member(uid))
+
+
+class LoadTest:
+    def __init__(self, harness: Harness, mix: dict):
+        self.h = harness
+        self.t = harness.tadzzy
+        self.kinds = list(mix)
+        self.weights = [mix[k] for k in self.kinds]
+        self.latencies = defaultdict(list)
+        self.failures = Counter()
+        cards = self.t.footballers
+        self.buyable = [c["name"] for c in cards if c["price"] <= self.t.STARTING_BALANCE]
+        self.biddable = [c["name"] for c in cards if " " not in c["name"]][:5]
+
+    async def setup(self):
+        t = self.t
+        for uid in self.h.user_ids:
+            t.ensure_user_exists(uid)
+            t.set_balance(uid, 10 ** 12)  # enough to keep buying and bidding for the whole run
+        for name in self.biddable:
+            await self.h.send(self.h.user_ids[0], f"!spawnauction {name}")
+
+    def pick(self, kind: str):
+        """(user, content, mentions) for one injected message."""
+        rng, users = self.h.rng, self.h.user_ids
+        uid = rng.choice(users)
+        if kind == "buy":
+            return uid, f"!buy {rng.choice(self.buyable)}", ()
+        if kind == "sell":
+            owned = self.t.get_collection(uid)
+            if owned:
+                return uid, f"!sell {rng.choice(owned)['name']}", ()
+            return uid, f"!buy {rng.choice(self.buyable)}", ()
+        if kind == "bid" and self.biddable:
+            name = rng.choice(self.biddable)
+            auction = self.t.auction_engine.get_active(name)
+            current = int(auction.get("highest_bid", 0)) if auction else 0
+            return uid, f"!bid {name} {current + rng.randint(1, 1000)}", ()
+        if kind == "trade":
+            target = rng.choice(users)
+            if target != uid and self.t.get_collection(uid):
+                return uid, f"!trade <@{target}> 1", (target,)
+            return uid, "!leaderboard", ()
+        if kind == "leaderboard":
+            return uid, "!leaderboard", ()
+        if kind == "browse":
+            return uid, rng.choice(("!shop", "!allplayers")), ()
+        return uid, rng.choice(("gg", "anyone up for a trade?", "lol", "nice pull", "what rarity is that")), ()
+
+    async def one(self, kind: str):
+        uid, content, mentions = self.pick(kind)
+        start = time.perf_counter()
+        try:
+            await self.h.send(uid, content, mentions)
+            if kind == "trade" and mentions:
+                # The target accepts straight away
+                for trade_id in self.t.trade_manager.incoming(mentions[0])[:1]:
+                    await self.h.send(mentions[0], f"!accepttrade {trade_id}")
+            elif kind == "browse":
+                # Turn two pages and close the menu
+                for button in ("next", "next", "stop"):
+                    await self.h.click(uid, "tadzzy:pages:" + button)
+        except Exception as e:
+            self.failures[f"{kind}: {type(e).__name__}"] += 1
+        self.latencies[kind].append(time.perf_counter() - start)
+
+    async def run(self, rate: float, duration: float):
+        loop = asyncio.get_running_loop()
+        pending = set()
+        start = loop.time()
+        n = 0
+        while loop.time() - start < duration:
+            kind = self.h.rng.choices(self.kinds, self.weights)[0]
+            task = loop.create_task(self.one(kind))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+            n += 1
+            # Open loop: the schedule doesn't wait for slow commands
+            delay = start + n / rate - loop.time()
+            await asyncio.sleep(max(0.0, delay))
+        injected_for = loop.time() - start
+        if pending:
+            await asyncio.wait(pending, timeout=60)
+        return n, injected_for, loop.time() - start
+
+
+async def main_async(args):
+    mix = {k: float(v) for k, v in (part.split("=") for part in args.mix.split(","))}
+    workdir = tempfile.mkdtemp(prefix="tadzzy_loadtest_")
+    os.chdir(workdir)  # bot.py writes its data, ledger and backups relative to the cwd
+    os.environ.setdefault("DISCORD_TOKEN", "")
+    before_import = rss_mb()
+    import bot as tadzzy
+
+    harness = Harness(tadzzy, args.users, args.seed)
+    await harness.connect()
+    tadzzy.load_data()
+    tadzzy.scheduler.start()
+    tadzzy.loop_lag.start()
+    tadzzy.paginator.start(tadzzy.bot)
+    for task in (tadzzy.xp_flush_task, tadzzy.autosave_task, tadzzy.ledger_flush_task):
+        task.start()
+    test = LoadTest(harness, mix)
+    await test.setup()
+    gc.collect()
+    baseline = rss_mb()
+
+    injected, inject_seconds, total_seconds = await test.run(args.rate, args.duration)
+
+    for task in (tadzzy.xp_flush_task, tadzzy.autosave_task, tadzzy.ledger_flush_task):
+        task.cancel()
+    await tadzzy.save_data_async()
+    await tadzzy.ledger.flush()
+
+    done = sum(len(v) for v in test.latencies.values())
+    print(f"{args.users:,} users, target {args.rate:,.0f} msg/s for {args.duration:.0f}s, "
+          f"{len(tadzzy.footballers)} cards, data in {workdir}")
+    print(f"  injected {injected:,} messages in {inject_seconds:.1f}s, all handled after {total_seconds:.1f}s: "
+          f"{done / total_seconds:,.0f} msg/s handled")
+    print(f"  {'kind':<12}{'count':>8}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}")
+    for kind in test.kinds:
+        values = sorted(test.latencies.get(kind, ()))
+        if values:
+            print(f"  {kind:<12}{len(values):>8,}" + "".join(
+                f"{percentile(values, q) * 1000:>7.1f}ms" for q in (0.5, 0.95, 0.99)) + f"{values[-1] * 1000:>7.1f}ms")
+    lag = tadzzy.metrics.get("loop_lag_seconds")
+    if lag:
+        print(f"  loop lag: p99 {lag.quantile(0.99) * 1000:.0f}ms, max {lag.max * 1000:.0f}ms")
+    print(f"  HTTP calls: {sum(harness.http.calls.values()):,} "
+          f"({', '.join(f'{route} x{n:,}' for route, n in harness.http.calls.most_common(4))})")
+    print(f"  memory: {before_import:.0f}MB before import, {baseline:.0f}MB after setup, "
+          f"{rss_mb():.0f}MB after run, peak {rss_mb('VmHWM'):.0f}MB")
+    if test.failures:
+        print("  failures:", dict(test.failures))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--rate", type=float, default=200.0, help="messages injected per second")
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds of injection")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="kind=weight list; kinds: " + DEFAULT_MIX)
+    parser.add_argument("--seed", type=int, default=1)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Broadcast throughput against a local fake Discord (no network).
+
+FakeDiscord answers each DM after a simulated round trip, enforces a global
+requests/second limit by raising a 429-style error with retry_after, and
+rejects a share of members as "DMs closed". The old sequential loop is compared
+with BroadcastRunner.
+
+Usage: python benchmarks/bench_broadcast.py [members] [latency_ms] [global_limit_per_s]
+"""
+
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+import synthetic  # noqa: F401  (puts the repo root on sys.path)
+
+from broadcast import BroadcastJob, BroadcastRunner
+
+
+class FakeRateLimited(Exception):
+    status = 429
+
+    def __init__(self, retry_after):
+        super().__init__("429 Too Many Requests")
+        self.retry_after = retry_after
+
+
+class FakeForbidden(Exception):
+    status = 403
+
+
+class FakeDiscord:
+    def __init__(self, latency: float, limit_per_second: int, closed_dms: float = 0.05):
+        self.latency = latency
+        self.limit = limit_per_second
+        self.closed = {uid for uid in range(1_000_000) if random.Random(uid).random() < closed_dms}
+        self.window_start = time.monotonic()
+        self.window_count = 0
+        self.delivered = set()
+        self.rate_limited = 0
+
+    async def send(self, user_id: int, text: str):
+        now = time.monotonic()
+        if now - self.window_start >= 1.0:
+            self.window_start, self.window_count = now, 0
+        self.window_count += 1
+        if self.window_count > self.limit:
+            self.rate_limited += 1
+            raise FakeRateLimited(1.0 - (now - self.window_start))
+        await asyncio.sleep(self.latency)
+        if user_id in self.closed:
+            raise FakeForbidden("Cannot send messages to this user")
+        self.delivered.add(user_id)
+
+
+async def sequential(fake, members):
+    sent = failed = 0
+    for uid in members:
+        try:
+            await fake.send(uid, "hi")
+            sent += 1
+        except Exception:
+            failed += 1
+    return sent, failed
+
+
+async def pooled(fake, members, limit):
+    with tempfile.TemporaryDirectory() as tmp:
+        runner = BroadcastRunner(fake.send, os.path.join(tmp, "state.json"), workers=16,
+                                 rate_per_second=limit * 0.9, checkpoint_seconds=1.0)
+        job = await runner.run(BroadcastJob("bench", 1, 1, "hi", members))
+        return job.sent, job.failed
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    latency = (int(sys.argv[2]) if len(sys.argv) > 2 else 80) / 1000
+    limit = int(sys.argv[3]) if len(sys.argv) > 3 else 50
+    members = list(range(count))
+    for name, fn in (("sequential", lambda f: sequential(f, members)),
+                     ("worker pool", lambda f: pooled(f, members, limit))):
+        fake = FakeDiscord(latency, limit)
+        start = time.perf_counter()
+        sent, failed = asyncio.run(fn(fake))
+        elapsed = time.perf_counter() - start
+        print(f"{name:>11}: {count / elapsed:6.1f} DMs/s, {sent} sent, {failed} failed, "
+              f"{fake.rate_limited} rate-limited responses, {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
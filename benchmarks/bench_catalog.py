@@ -0,0 +1,54 @@
+"""
+Card lookups against a large synthetic catalog: the old linear scan with
+normalize_name on every entry vs CardCatalog's hash index, plus the cost of
+building the index and of "did you mean" suggestions for misspelled names.
+
+Usage: python benchmarks/bench_catalog.py [catalog_size] [lookups]
+"""
+
+import random
+import sys
+import time
+
+from synthetic import make_catalog
+
+from catalog import CardCatalog, normalize_name
+
+
+def linear_find(cards, name):
+    name_norm = normalize_name(name)
+    for p in cards:
+        if normalize_name(p["name"]) == name_norm:
+            return p
+    return None
+
+
+def timed(fn, queries):
+    start = time.perf_counter()
+    for q in queries:
+        fn(q)
+    return (time.perf_counter() - start) / len(queries) * 1e6
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    lookups = int(sys.argv[2]) if len(sys.argv) > 2 else 2_000
+    cards = make_catalog(size)
+    rng = random.Random(5)
+    queries = [rng.choice(cards)["name"].upper() for _ in range(lookups)]
+    # Drop one character to simulate a typo
+    typos = [q[:i] + q[i + 1:] for q in queries for i in [rng.randrange(len(q))]]
+
+    start = time.perf_counter()
+    catalog = CardCatalog(cards)
+    print(f"{size:,} cards, index built in {(time.perf_counter() - start) * 1000:.0f}ms")
+    print(f"linear scan: {timed(lambda q: linear_find(cards, q), queries[:200]):,.1f} µs/lookup")
+    print(f"hash index:  {timed(catalog.get, queries):,.2f} µs/lookup")
+    start = time.perf_counter()
+    catalog.suggest(typos[0])
+    print(f"suggestion index built on first use in {(time.perf_counter() - start) * 1000:.0f}ms")
+    print(f"suggestions: {timed(catalog.suggest, typos[:500]):,.1f} µs/query")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Memory and file size of user_collections: legacy full card dicts vs OwnedCard
+catalog references.
+
+Usage: python benchmarks/bench_collections.py [users] [cards_per_user]
+"""
+
+import gc
+import json
+import os
+import sys
+import tempfile
+import tracemalloc
+
+from synthetic import make_catalog, make_data
+
+from catalog import CardCatalog
+from owned_cards import upgrade_collections
+from persistence import write_json_atomic
+
+
+def retained_after(fn):
+    gc.collect()
+    tracemalloc.start()
+    result = fn()
+    gc.collect()
+    current, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current
+
+
+def main():
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    per_user = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    cards = make_catalog(200)
+    catalog = CardCatalog(cards)
+    collections = make_data(users, cards, per_user)["user_collections"]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_path = os.path.join(tmp, "legacy.json")
+        compact_path = os.path.join(tmp, "compact.json")
+        write_json_atomic(legacy_path, collections)
+
+        def load_legacy():
+            with open(legacy_path, encoding="utf-8") as f:
+                return json.load(f)
+
+        legacy, legacy_mem = retained_after(load_legacy)
+        upgraded = upgrade_collections(legacy, catalog)
+        write_json_atomic(compact_path, legacy)
+        del legacy
+
+        def load_compact():
+            with open(compact_path, encoding="utf-8") as f:
+                loaded = json.load(f)
+            upgrade_collections(loaded, catalog)
+            return loaded
+
+        compact, compact_mem = retained_after(load_compact)
+        assert sum(len(c) for c in compact.values()) == upgraded
+
+        legacy_size = os.path.getsize(legacy_path)
+        compact_size = os.path.getsize(compact_path)
+
+    print(f"{users:,} users x {per_user} cards ({upgraded:,} cards)")
+    print(f"file size: {legacy_size / 1e6:,.1f} MB -> {compact_size / 1e6:,.1f} MB "
+          f"({100 * (1 - compact_size / legacy_size):.0f}% smaller)")
+    print(f"memory:    {legacy_mem / 1e6:,.1f} MB -> {compact_mem / 1e6:,.1f} MB "
+          f"({100 * (1 - compact_mem / legacy_mem):.0f}% smaller)")
+
+
+if __name__ == "__main__":
+    main()
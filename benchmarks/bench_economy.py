@@ -0,0 +1,171 @@
+"""
+Concurrent buy / sell / trade stress test for the economy transaction layer.
+
+Thousands of command coroutines run at once against a small user pool, each
+awaiting in the middle the way the real commands do (a reaction wait, a channel
+send). The old read-await-write pattern is compared with the bot's: read,
+await, then one Economy call that re-checks at the moment of writing (no locks).
+Cards are sold back at their buy price, so balances plus the value of owned
+cards must stay constant; any drift is a lost update or a duplicated card.
+
+Usage: python benchmarks/bench_economy.py [operations] [users]
+"""
+
+import asyncio
+import random
+import sys
+import time
+
+import synthetic
+
+from owned_cards import OwnedCard
+from transactions import Economy
+
+MAX_SLOTS = 15
+START_BALANCE = 10_000_000
+
+
+class Store:
+    def __init__(self, users: int, catalog):
+        self.balances = {uid: START_BALANCE for uid in range(users)}
+        self.collections = {uid: [] for uid in range(users)}
+        self.catalog = catalog
+
+    def get_balance(self, uid):
+        return self.balances[uid]
+
+    def set_balance(self, uid, amount):
+        self.balances[uid] = amount
+
+    def get_collection(self, uid):
+        return self.collections[uid]
+
+    def add_card(self, uid, card):
+        if len(self.collections[uid]) >= MAX_SLOTS:
+            return False
+        self.collections[uid].append(card)
+        return True
+
+    def remove_card(self, uid, card):
+        try:
+            self.collections[uid].remove(card)
+        except ValueError:
+            return False
+        return True
+
+    def wealth(self) -> int:
+        return sum(self.balances.values()) + sum(c["price"] for coll in self.collections.values() for c in coll)
+
+    def duplicates(self) -> int:
+        seen = set()
+        dupes = 0
+        for coll in self.collections.values():
+            for card in coll:
+                dupes += id(card) in seen
+                seen.add(id(card))
+        return dupes
+
+
+async def pause(rng):
+    # Stand-in for the awaits inside a command (sends, reaction waits)
+    for _ in range(rng.randint(0, 3)):
+        await asyncio.sleep(0)
+
+
+# The pre-transaction command bodies: check, await, then write what was read
+async def naive_buy(store, rng, uid, card):
+    balance = store.get_balance(uid)
+    if balance < card["price"] or len(store.get_collection(uid)) >= MAX_SLOTS:
+        return
+    await pause(rng)
+    store.set_balance(uid, balance - card["price"])
+    store.add_card(uid, OwnedCard(card))
+
+
+async def naive_sell(store, rng, uid):
+    coll = store.get_collection(uid)
+    if not coll:
+        return
+    card = rng.choice(coll)
+    await pause(rng)
+    store.remove_card(uid, card)
+    store.set_balance(uid, store.get_balance(uid) + card["price"])
+
+
+async def naive_trade(store, rng, sender, recipient):
+    coll = store.get_collection(sender)
+    if not coll:
+        return
+    card = rng.choice(coll)
+    await pause(rng)
+    if len(store.get_collection(recipient)) < MAX_SLOTS:
+        store.remove_card(sender, card)
+        store.add_card(recipient, card)
+
+
+# The bot's command bodies: check, await, then an Economy call that re-checks
+async def checked_buy(economy, rng, uid, card):
+    if economy.get_balance(uid) < card["price"]:
+        return
+    await pause(rng)
+    economy.buy_card(uid, OwnedCard(card), card["price"])
+
+
+async def checked_sell(economy, rng, uid):
+    coll = economy.get_collection(uid)
+    if not coll:
+        return
+    card = rng.choice(coll)
+    await pause(rng)
+    economy.sell_card(uid, card, card["price"])
+
+
+async def checked_trade(economy, rng, sender, recipient):
+    coll = economy.get_collection(sender)
+    if not coll:
+        return
+    card = rng.choice(coll)
+    await pause(rng)
+    economy.transfer_card(sender, recipient, card, MAX_SLOTS)
+
+
+async def run(mode: str, operations: int, users: int, seed: int = 7):
+    rng = random.Random(seed)
+    store = Store(users, synthetic.make_catalog(200, seed))
+    economy = Economy(store.get_balance, store.set_balance, store.get_collection,
+                      store.add_card, store.remove_card)
+    buy, sell, trade = ((naive_buy, naive_sell, naive_trade) if mode == "naive"
+                        else (checked_buy, checked_sell, checked_trade))
+    target = store if mode == "naive" else economy
+    cheap = [c for c in store.catalog if c["price"] <= START_BALANCE // 4]
+    before = store.wealth()
+    jobs = []
+    for _ in range(operations):
+        uid = rng.randrange(users)
+        roll = rng.random()
+        if roll < 0.45:
+            jobs.append(buy(target, random.Random(rng.random()), uid, rng.choice(cheap)))
+        elif roll < 0.8:
+            jobs.append(sell(target, random.Random(rng.random()), uid))
+        else:
+            jobs.append(trade(target, random.Random(rng.random()), uid, rng.randrange(users)))
+    start = time.perf_counter()
+    await asyncio.gather(*jobs)
+    elapsed = time.perf_counter() - start
+    negative = sum(1 for b in store.balances.values() if b < 0)
+    print(f"{mode:>7}: {operations / elapsed:9,.0f} ops/s, wealth drift {store.wealth() - before:+,}, "
+          f"duplicated cards {store.duplicates()}, negative balances {negative}")
+    return store.wealth() - before, store.duplicates(), negative
+
+
+def main():
+    operations = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    users = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    asyncio.run(run("naive", operations, users))
+    drift, dupes, negative = asyncio.run(run("economy", operations, users))
+    if drift or dupes or negative:
+        sys.exit("Economy run lost updates!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Peak memory and time to load tadzzy_data.json: the old json.load of the whole
+file vs the streaming loader (loader.py). Each load runs in a fresh child
+process so its peak RSS is measured on its own.
+
+Usage: python benchmarks/bench_load.py [users ...]      (default: 100000 1000000)
+"""
+
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import synthetic
+
+from loader import stream_load
+from storage import PERSISTED_SECTIONS
+
+
+def write_data_file(path: str, users: int, cards_per_user: int = 5, seed: int = 1):
+    """Write the on-disk layout section by section (cards stored as catalog ids)."""
+    rng = random.Random(seed)
+    names = [c["name"] for c in synthetic.make_catalog()]
+    base_uid = 100_000_000_000_000_000
+    uids = [str(base_uid + n) for n in range(users)]
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("{\n")
+        for section, make in (
+            ("tadbucks_balances", lambda: rng.randint(0, 10_000_000)),
+            ("tadzzy_points", lambda: rng.randint(0, 500)),
+            ("xp_levels", lambda: rng.randint(0, 5000)),
+            ("user_collections", lambda: rng.sample(names, cards_per_user)),
+        ):
+            f.write(f'  "{section}": {{\n')
+            f.write(",\n".join(f'    "{uid}": {json.dumps(make())}' for uid in uids))
+            f.write("\n  },\n")
+        f.write('  "gamenights": [],\n  "auctions": {},\n  "trades": {},\n  "settings": {"starting_balance": 50000}\n}\n')
+
+
+def peak_rss_mb() -> float:
+    # VmHWM starts fresh in the child; ru_maxrss is inherited from the parent across exec
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KiB on Linux
+
+
+def child(mode: str, path: str):
+    baseline = peak_rss_mb()
+    data = {}
+    start = time.perf_counter()
+    if mode == "json":
+        with open(path, "r", encoding="utf-8") as f:
+            file_data = json.load(f)
+        for k in PERSISTED_SECTIONS:
+            if k in file_data:
+                data[k] = file_data[k]
+        del file_data
+    else:
+        stream_load(path, data, PERSISTED_SECTIONS)
+    elapsed = time.perf_counter() - start
+    print(json.dumps({"seconds": elapsed, "peak_mb": peak_rss_mb(), "baseline_mb": baseline,
+                      "users": len(data["tadbucks_balances"])}))
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--child":
+        return child(sys.argv[2], sys.argv[3])
+    sizes = [int(a) for a in sys.argv[1:]] or [100_000, 1_000_000]
+    with tempfile.TemporaryDirectory() as tmp:
+        for users in sizes:
+            path = os.path.join(tmp, f"data_{users}.json")
+            write_data_file(path, users)
+            size_mb = os.path.getsize(path) / 1e6
+            print(f"{users:,} users, {size_mb:,.1f}MB file")
+            for mode in ("json", "stream"):
+                out = subprocess.run([sys.executable, __file__, "--child", mode, path],
+                                     capture_output=True, text=True, check=True).stdout
+                r = json.loads(out.strip().splitlines()[-1])
+                print(f"  {mode:>6}: {r['seconds']:6.2f}s, peak RSS {r['peak_mb']:7.1f}MB "
+                      f"(+{r['peak_mb'] - r['baseline_mb']:.1f}MB over baseline), {r['users']:,} users")
+
+
+if __name__ == "__main__":
+    main()
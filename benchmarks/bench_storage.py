@@ -0,0 +1,76 @@
+"""
+JSON vs SQLite storage backend on the same workload.
+
+Each round mutates a handful of random users (balance, XP, collection) the way
+the bot's commands do, marks them dirty and saves.
+
+Usage: python benchmarks/bench_storage.py [users] [rounds] [changes_per_round]
+"""
+
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+from synthetic import make_catalog, make_data
+
+from storage import JsonBackend, SQLiteBackend, PERSISTED_SECTIONS
+
+
+async def run(backend, data, rounds: int, changes: int, catalog):
+    rng = random.Random(7)
+    uids = list(data["tadbucks_balances"])
+    if isinstance(backend, SQLiteBackend):
+        backend.save_all(data)
+    else:
+        backend.save_sync(data)
+    save_ms = []
+    for _ in range(rounds):
+        for uid in rng.sample(uids, changes):
+            data["tadbucks_balances"][uid] += 100
+            backend.mark("tadbucks_balances", uid)
+            data["xp_levels"][uid] += 1
+            backend.mark("xp_levels", uid)
+            coll = data["user_collections"][uid]
+            coll[rng.randrange(len(coll))] = dict(rng.choice(catalog))
+            backend.mark("user_collections", uid)
+        start = time.perf_counter()
+        await backend.save(data)
+        save_ms.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    fresh = {}
+    loader = type(backend)(backend.path, PERSISTED_SECTIONS)
+    loader.load(fresh)
+    load_ms = (time.perf_counter() - start) * 1000
+    loader.close()
+    backend.close()
+    assert fresh["tadbucks_balances"] == data["tadbucks_balances"]
+    save_ms.sort()
+    return {
+        "save_p50_ms": save_ms[len(save_ms) // 2],
+        "save_max_ms": save_ms[-1],
+        "load_ms": load_ms,
+    }
+
+
+def main():
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    changes = int(sys.argv[3]) if len(sys.argv) > 3 else 50
+    catalog = make_catalog()
+    print(f"{users:,} users, {rounds} saves of {changes} changed users each")
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, backend in (
+            ("json", JsonBackend(os.path.join(tmp, "data.json"), PERSISTED_SECTIONS)),
+            ("sqlite", SQLiteBackend(os.path.join(tmp, "data.db"), PERSISTED_SECTIONS)),
+        ):
+            result = asyncio.run(run(backend, make_data(users, catalog), rounds, changes, catalog))
+            print(f"{name:>7}: save p50 {result['save_p50_ms']:.2f}ms, max {result['save_max_ms']:.2f}ms, "
+                  f"load {result['load_ms']:.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Messages/second through the XP path: the old per-message on_message logic vs
+the batched XPAccumulator flushed on a timer. Both runs must end with identical
+XP, balances and points, which also checks that level-ups inside a batch are
+paid exactly once per threshold crossed.
+
+Usage: python benchmarks/bench_xp.py [messages] [users] [messages_per_flush]
+"""
+
+import random
+import sys
+import time
+
+import synthetic  # noqa: F401  (puts the repo root on sys.path)
+
+from xp import XPAccumulator, levels_crossed
+
+LEVEL_XP_REWARD = 1
+LEVEL_UP_XP_THRESHOLD = 50
+LEVEL_REWARD_TADBUCKS = 5000
+LEVEL_REWARD_TADZZY = 5
+STARTING_BALANCE = 50_000
+
+
+def fresh_data():
+    return {"tadbucks_balances": {}, "tadzzy_points": {}, "xp_levels": {}, "user_collections": {},
+            "settings": {"starting_balance": STARTING_BALANCE}}
+
+
+def ensure_user_exists(data, user_id):
+    uid = str(user_id)
+    if uid not in data["tadbucks_balances"]:
+        data["tadbucks_balances"][uid] = data["settings"].get("starting_balance", STARTING_BALANCE)
+    if uid not in data["tadzzy_points"]:
+        data["tadzzy_points"][uid] = 0
+    if uid not in data["xp_levels"]:
+        data["xp_levels"][uid] = 0
+    if uid not in data["user_collections"]:
+        data["user_collections"][uid] = []
+
+
+def legacy(data, authors):
+    # Mirrors the pre-batching on_message body
+    level_ups = 0
+    for uid in authors:
+        ensure_user_exists(data, uid)
+        data["xp_levels"][str(uid)] = int(data["xp_levels"].get(str(uid), 0)) + LEVEL_XP_REWARD
+        current_xp = data["xp_levels"][str(uid)]
+        if current_xp % LEVEL_UP_XP_THRESHOLD == 0:
+            data["tadbucks_balances"][str(uid)] = int(data["tadbucks_balances"].get(str(uid), STARTING_BALANCE)) + LEVEL_REWARD_TADBUCKS
+            data["tadzzy_points"][str(uid)] = int(data["tadzzy_points"].get(str(uid), 0)) + LEVEL_REWARD_TADZZY
+            level_ups += 1
+    return level_ups
+
+
+def flush(data, acc):
+    level_ups = 0
+    for uid, messages, _channel, _mention in acc.drain():
+        ensure_user_exists(data, uid)
+        key = str(uid)
+        old_xp = data["xp_levels"][key]
+        new_xp = old_xp + messages * LEVEL_XP_REWARD
+        data["xp_levels"][key] = new_xp
+        levels = levels_crossed(old_xp, new_xp, LEVEL_UP_XP_THRESHOLD)
+        if levels:
+            data["tadbucks_balances"][key] += LEVEL_REWARD_TADBUCKS * levels
+            data["tadzzy_points"][key] += LEVEL_REWARD_TADZZY * levels
+            level_ups += levels
+    return level_ups
+
+
+def batched(data, authors, per_flush):
+    acc = XPAccumulator()
+    add = acc.add
+    level_ups = 0
+    for i, uid in enumerate(authors, 1):
+        add(uid, None, "")
+        if i % per_flush == 0:
+            level_ups += flush(data, acc)
+    return level_ups + flush(data, acc)
+
+
+def main():
+    messages = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    users = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    per_flush = int(sys.argv[3]) if len(sys.argv) > 3 else 2_000
+    rng = random.Random(3)
+    # Busy channels: a few chatty users dominate
+    population = [100_000_000_000_000_000 + n for n in range(users)]
+    authors = rng.choices(population, weights=[1 / (n + 1) for n in range(users)], k=messages)
+
+    results = {}
+    for name, fn in (("per-message", lambda d: legacy(d, authors)),
+                     ("batched", lambda d: batched(d, authors, per_flush))):
+        data = fresh_data()
+        start = time.perf_counter()
+        level_ups = fn(data)
+        elapsed = time.perf_counter() - start
+        results[name] = data
+        print(f"{name:>12}: {messages / elapsed:,.0f} msg/s ({level_ups:,} level-ups)")
+
+    assert results["per-message"] == results["batched"], "batched XP diverged from per-message XP"
+    print("final XP / balances / points identical")
+
+
+if __name__ == "__main__":
+    main()
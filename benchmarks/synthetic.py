@@ -0,0 +1,54 @@
+"""
+Synthetic TadzzyBot data for the benchmarks in this directory.
+Cards mirror the shape of the entries in bot.footballers without importing bot.py
+(which needs discord.py and a token).
+"""
+
+import os
+import random
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+RARITIES = [
+    ("Secret", 0x000000, 100_000_000, 5000),
+    ("Mythic", 0xff0000, 3_000_000, 1500),
+    ("Legendary", 0xffff00, 1_500_000, 750),
+    ("Epic", 0x800080, 800_000, 400),
+    ("Expensive", 0x00ff00, 5_000_000, 2500),
+    ("Common", 0x0000ff, 20_000, 10),
+]
+
+
+def make_catalog(size: int = 50, seed: int = 1):
+    rng = random.Random(seed)
+    cards = []
+    for i in range(size):
+        rarity, color, price, income = rng.choice(RARITIES)
+        cards.append({"name": f"Player {i}", "rarity": rarity, "price": price - i, "color": color, "income_rate": income})
+    return cards
+
+
+def make_data(users: int, catalog=None, cards_per_user: int = 5, seed: int = 1) -> dict:
+    rng = random.Random(seed)
+    catalog = catalog or make_catalog()
+    data = {
+        "tadbucks_balances": {},
+        "tadzzy_points": {},
+        "xp_levels": {},
+        "user_collections": {},
+        "gamenights": [],
+        "auctions": {},
+        "trades": {},
+        "settings": {"starting_balance": 50_000},
+    }
+    base_uid = 100_000_000_000_000_000
+    for n in range(users):
+        uid = str(base_uid + n)
+        data["tadbucks_balances"][uid] = rng.randint(0, 10_000_000)
+        data["tadzzy_points"][uid] = rng.randint(0, 500)
+        data["xp_levels"][uid] = rng.randint(0, 5000)
+        data["user_collections"][uid] = [dict(c) for c in rng.sample(catalog, min(cards_per_user, len(catalog)))]
+    return data
@@ -8,31 +8,82 @@ TadzzyBot - Enhanced version with full shop, trading system, selling system and
 - Income tracking and reporting commands
 """
 
+# Imported first so the startup profile also times the imports below
+from startup import StartupProfile, profile_requested
+startup_profile = StartupProfile(profile_requested())
+
 import discord
 from discord.ext import commands, tasks
-import json
 import random
 import asyncio
 import os
-import shutil
 import re
+import time
 from datetime import datetime, timedelta, timezone
 from typing import Optional, Dict, List
 from dotenv import load_dotenv
 
+from persistence import take_snapshot
+from storage import PERSISTED_SECTIONS, create_storage
+from xp import XPAccumulator, levels_crossed
+from income import IncomeEngine
+from catalog import CardCatalog, normalize_name
+from owned_cards import OwnedCard, upgrade_collections
+from leaderboard import NameCache, RankIndex
+from broadcast import BroadcastJob, BroadcastRunner
+from scheduler import DeadlineScheduler
+from auctions import AuctionEngine
+from trades import TradeManager
+from transactions import Economy
+from ledger import Ledger, audit
+from guess import GuessDB
+from backups import BackupStore, describe as describe_backup
+from metrics import LoopLagMonitor, Metrics
+from keep_alive import HealthServer
+from loopwatch import LoopWatchdog
+from paginator import Paginator
+from giveaways import GiveawayManager
+from cooldowns import Cooldowns, OnCooldown
+
 # -----------------------------
 # Config
 # -----------------------------
 DATA_FILE = "tadzzy_data.json"
+SQLITE_FILE = "tadzzy_data.db"
+STORAGE_BACKEND = os.getenv("TADZZY_STORAGE", "json")  # "json" or "sqlite"
 DATA_BACKUP_DIR = "backups"
+BACKUP_INTERVAL_MINUTES = 60
+BACKUP_CODEC = "zlib"  # or "lzma": smaller, slower
+BACKUP_KEEP_HOURLY = 24
+BACKUP_KEEP_DAILY = 7
+BACKUP_KEEP_WEEKLY = 8
 AUTOSAVE_INTERVAL_SECONDS = 60
+SQLITE_AUTOSAVE_INTERVAL_SECONDS = 5  # SQLite saves are cheap, flush more often
 STARTING_BALANCE = 50_000
 MAX_COLLECTION_SLOTS = 15
 LEVEL_XP_REWARD = 1
 LEVEL_UP_XP_THRESHOLD = 50
 LEVEL_REWARD_TADBUCKS = 5000
 LEVEL_REWARD_TADZZY = 5
+XP_FLUSH_INTERVAL_SECONDS = 2
+XP_COOLDOWN_SECONDS = 3  # messages closer together than this earn no XP
+GAMBLE_COOLDOWN_SECONDS = 24 * 3600
 AUCTION_DEFAULT_DURATION_HOURS = 1
+CATALOG_PAGE_SIZE = 8
+BROADCAST_STATE_FILE = "broadcast_state.json"
+BROADCAST_WORKERS = 8
+BROADCAST_RATE_PER_SECOND = 20  # each DM can cost two requests; global limit is 50/s
+LEDGER_FILE = "tadzzy_ledger.db"
+LEDGER_FLUSH_INTERVAL_SECONDS = 5
+LEDGER_SNAPSHOT_EVERY = 100_000  # events between balance snapshots
+GUESS_ARTIFACT_FILE = "guess_clues.json"  # optional, from `python guess.py compile`
+HEALTH_PORT = int(os.getenv("TADZZY_HEALTH_PORT", "8080"))
+HEALTH_MAX_LOOP_LAG_SECONDS = 1.0
+HEALTH_MAX_AUTOSAVE_AGE_SECONDS = 3 * AUTOSAVE_INTERVAL_SECONDS
+WATCHDOG_THRESHOLD_SECONDS = 0.25  # record a stack when the loop is blocked this long
+SHARD_COUNT = os.getenv("TADZZY_SHARD_COUNT")  # unset: let Discord recommend a count
+
+startup_profile.mark("imports")
 
 # -----------------------------
 # Load token & set intents
@@ -48,7 +99,19 @@ intents.members = True
 intents.guilds = True
 intents.reactions = True
 
-bot = commands.Bot(command_prefix="!", intents=intents, help_command=None)
+def shard_options() -> dict:
+    """AutoShardedBot arguments. Every shard runs in this one process and shares `data`;
+    there is no mode that splits shards across processes (the economy lives here only)."""
+    options = {}
+    if SHARD_COUNT:
+        options["shard_count"] = int(SHARD_COUNT)
+    return options
+
+
+bot = commands.AutoShardedBot(command_prefix="!", intents=intents, help_command=None, **shard_options())
+metrics = Metrics()
+loop_lag = LoopLagMonitor(metrics)
+watchdog = LoopWatchdog(WATCHDOG_THRESHOLD_SECONDS)
 
 # -----------------------------
 # In-memory data structure (persisted to JSON)
@@ -57,11 +120,13 @@ data = {
     "tadbucks_balances": {},  # user_id: int
     "tadzzy_points": {},      # user_id: int
     "xp_levels": {},          # user_id: int
-    "user_collections": {},   # user_id: [card dicts]
+    "user_collections": {},   # user_id: [OwnedCard] (stored as catalog ids)
     "gamenights": [],         # list of links
-    "auctions": {},           # player_name: auction dict
-    "guess_db": {},           # we'll fill programmatically (clues)
-    "trades": {},             # trade_id: trade dict
+    "auctions": {},           # player_name: auction dict (ends_at in epoch seconds)
+    "trades": {},             # trade_id: pending trade offer
+    "giveaways": {},          # message_id: running giveaway (ends_at in epoch seconds)
+    "giveaway_entrants": {},  # "message_id:user_id": join time (one record per entrant)
+    "cooldowns": {},          # "command:user_id": expiry in epoch seconds
     "settings": {             # future expansions
         "starting_balance": STARTING_BALANCE
     }
@@ -142,108 +207,138 @@ common_players = [f"Tadstarman Bot{i}" for i in range(1, 51 - len(footballers))]
 for i, name in enumerate(common_players):
     footballers.append({"name": name, "rarity": "Common", "price": 150, "color": 0x0000ff, "income_rate": 1})
 
-# Normalizing helper
-def normalize_name(n: str) -> str:
-    return n.strip().lower()
+# Indexed once at startup: name lookup, rarity buckets, price views, suggestions
+catalog = CardCatalog(footballers)
+footballers = catalog.cards  # a tuple: the catalog order can't be changed in place
+startup_profile.mark("catalog")
 
-# find player card by name (case-insensitive)
+# find player card by name (case-insensitive, ignores spaces/punctuation)
 def find_player_card_by_name(name: str) -> Optional[dict]:
-    name_norm = normalize_name(name)
-    for p in footballers:
-        if normalize_name(p["name"]) == name_norm:
-            return p
-    return None
+    return catalog.get(name)
+
+def suggestion_hint(name: str) -> str:
+    suggestions = catalog.suggest(name)
+    if not suggestions:
+        return ""
+    return " Did you mean " + " or ".join(f"**{c['name']}**" for c in suggestions) + "?"
 
 # -----------------------------
-# Guess-the-player DB
+# Guess-the-player DB (clues built per difficulty on first use, see guess.py)
 # -----------------------------
-def build_guess_db():
-    g = {
-        "easy": [
-            ("Plays as an Argentine forward for PSG", "Messi"),
-            ("Portuguese superstar, now at Al-Nassr", "Ronaldo"),
-            ("Egyptian winger who plays for Liverpool", "Salah"),
-            ("Polish striker known for lethal finishing", "Lewandowski"),
-            ("French speedster who plays for PSG", "Mbappe"),
-            ("Brazilian flair, now an epic name", "Neymar"),
-        ],
-        "normal": [
-            ("Belgian creative mid at Manchester City", "De Bruyne"),
-            ("Korean attacker at Spurs", "Son"),
-            ("Former Barca & Bayern striker, Polish", "Lewandowski"),
-            ("Portuguese-Brazilian flair (epic)", "Neymar"),
-        ],
-        "hard": [
-            ("Italian Ballon d'Or winner in 2006, defender", "Cannavaro"),
-            ("Dutch winger, retired in 2019, trickster", "Robben"),
-            ("Mexican keeper famous at the 2014 World Cup", "Ochoa"),
-            ("Japanese midfield legend at Celtic", "Nakamura"),
-        ],
-        "extreme": [
-            ("Historic attacker nicknamed 'Tadstarman' (Secret)", "Tadstarman"),
-            ("A secret legend whose card is Jeeves", "Jeeves"),
-            ("Expensive player JustMatt — expensive rarity", "JustMatt"),
-        ]
-    }
+guess_db = GuessDB(footballers, GUESS_ARTIFACT_FILE)
 
-    # Add programmatic clues for other footballers
-    for p in footballers:
-        name = p["name"]
-        rarity = p["rarity"]
-        if name.lower() in ["messi", "ronaldo", "salah", "mbappe", "neymar", "lewandowski"]:
-            continue
-        clue_easy = f"A {rarity} player named {name[0]}..."
-        clue_normal = f"Player {name} is a {rarity} card."
-        g.setdefault("easy", []).append((clue_easy, name))
-        g.setdefault("normal", []).append((clue_normal, name))
-        if rarity.lower() in ("mythic", "secret"):
-            g.setdefault("hard", []).append((f"Special {rarity} card: {name}", name))
-            g.setdefault("extreme", []).append((f"Rare: {name} (collector's item)", name))
+# -----------------------------
+# Persistence: pluggable storage backend (JSON or SQLite)
+# -----------------------------
+storage = create_storage(STORAGE_BACKEND, DATA_FILE, SQLITE_FILE, PERSISTED_SECTIONS)
+ledger = Ledger(LEDGER_FILE, LEDGER_SNAPSHOT_EVERY)
 
-    return g
+def mark_dirty(section: str, key: Optional[str] = None):
+    # key=None marks the whole section (lists like gamenights, settings)
+    storage.mark(section, key)
 
-data["guess_db"] = build_guess_db()
+# Set once data is loaded and indexed; commands wait on it (see wait_for_data)
+data_ready = asyncio.Event()
 
-# -----------------------------
-# Persistence: save & load to JSON
-# -----------------------------
-def load_data():
-    global data
-    if os.path.exists(DATA_FILE):
-        try:
-            with open(DATA_FILE, "r", encoding="utf-8") as f:
-                file_data = json.load(f)
-            for k in ["tadbucks_balances", "tadzzy_points", "xp_levels", "user_collections", "gamenights", "auctions", "trades", "settings"]:
-                if k in file_data:
-                    data[k] = file_data[k]
-            print("✅ Loaded data from", DATA_FILE)
-        except Exception as e:
-            print("Failed to load data:", e)
-    else:
-        print("No data file found, starting fresh.")
+def print_load_progress(done: int, total: int, section: str):
+    if total:
+        print(f"[Load] {done / total * 100:5.1f}% ({done / 1e6:,.1f}/{total / 1e6:,.1f}MB) {section}")
 
-def save_data():
+def read_storage(into: dict):
     try:
-        to_save = {
-            k: data[k] for k in ["tadbucks_balances", "tadzzy_points", "xp_levels", "user_collections", "gamenights", "auctions", "trades", "settings"]
-        }
-        tmp = DATA_FILE + ".tmp"
-        with open(tmp, "w", encoding="utf-8") as f:
-            json.dump(to_save, f, ensure_ascii=False, indent=2)
-        os.replace(tmp, DATA_FILE)
-        return True
+        if storage.load(into, print_load_progress):
+            print("✅ Loaded data from", storage.location)
+        else:
+            print("No data file found, starting fresh.")
     except Exception as e:
-        print("Failed to save data:", e)
-        return False
+        print("Failed to load data:", e)
+
+def load_ledger(balances: dict) -> dict:
+    # Blocking SQLite work; run in a worker thread (see load_data_async)
+    try:
+        return ledger.load(balances)
+    except Exception as e:
+        print("Failed to open ledger:", e)
+        return {}
+
+def index_loaded_data(ledger_totals: Optional[dict]):
+    """Rebuild the indexes over freshly loaded data. ledger_totals=None keeps the income totals."""
+    upgraded = upgrade_collections(data["user_collections"], catalog)
+    if upgraded:
+        print(f"✅ Upgraded {upgraded} stored cards to catalog references")
+    income_engine.rebuild(data["user_collections"])
+    balance_rank.rebuild(data["tadbucks_balances"])
+    points_rank.rebuild(data["tadzzy_points"])
+    auction_engine.load(data["auctions"])
+    trade_manager.load(data["trades"])
+    giveaway_manager.load(data["giveaways"], data["giveaway_entrants"])
+    cooldowns.load(data["cooldowns"])
+    if ledger_totals is not None:
+        last_income_report.clear()
+        total_income_tracker.clear()
+        for (uid, kind), (total, last) in ledger_totals.items():
+            if kind == "income":
+                total_income_tracker[str(uid)] = total
+                last_income_report[str(uid)] = last
+    data_ready.set()
+
+def load_data():
+    # Blocking; the bot itself uses load_data_async
+    read_storage(data)
+    index_loaded_data(load_ledger(data["tadbucks_balances"]))
+
+async def load_data_async():
+    # Commands wait on data_ready, xp_flush_task and passive_income hold off, and
+    # the scheduler is stopped, so nothing changes the sections being replaced
+    data_ready.clear()
+    resume_scheduler = scheduler.running
+    scheduler.stop()
+    totals = None
+    try:
+        # Saves take the same lock: no autosave mixes old and new sections
+        async with storage.lock:
+            # Parse into a fresh dict in a worker thread so a large file doesn't
+            # stall the gateway heartbeat; swap it in on the loop in one step
+            loaded: dict = {}
+            await asyncio.to_thread(read_storage, loaded)
+            data.update(loaded)
+        # Opening the ledger reads its totals and may write a first snapshot
+        totals = await asyncio.to_thread(load_ledger, dict(data["tadbucks_balances"]))
+    finally:
+        index_loaded_data(totals)
+        if resume_scheduler:
+            scheduler.start()
 
-def backup_data():
-    os.makedirs(DATA_BACKUP_DIR, exist_ok=True)
-    timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-    dest = os.path.join(DATA_BACKUP_DIR, f"tadzzy_data_backup_{timestamp}.json")
+def save_data():
+    # Blocking save; only used where the event loop is not available (shutdown)
+    apply_pending_xp()
+    return storage.save_sync(data)
+
+async def save_data_async(skip_if_busy: bool = False):
+    start = time.perf_counter()
+    saved = await storage.save(data, skip_if_busy=skip_if_busy)
+    if saved is not None:  # skipped saves did no work
+        metrics.observe("save_seconds", time.perf_counter() - start, backend=storage.name)
+    return saved
+
+backup_store = BackupStore(DATA_BACKUP_DIR, BACKUP_CODEC)
+# One backup (create + prune) at a time; the hourly task and !backup can overlap
+backup_lock = asyncio.Lock()
+
+async def backup_data() -> Optional[dict]:
+    # Backups are taken from memory so they include records still in the WAL and
+    # work the same for every storage backend. Chunking, compression and
+    # retention run in a worker thread.
     try:
-        if os.path.exists(DATA_FILE):
-            shutil.copy2(DATA_FILE, dest)
-        return dest
+        async with backup_lock:
+            snap = take_snapshot(data, PERSISTED_SECTIONS)
+            manifest = await asyncio.to_thread(backup_store.create, snap)
+            removed, swept = await asyncio.to_thread(
+                backup_store.prune, BACKUP_KEEP_HOURLY, BACKUP_KEEP_DAILY, BACKUP_KEEP_WEEKLY
+            )
+        if removed:
+            print(f"[Backup] Retention removed {removed} backups and {swept} unused chunks.")
+        return manifest
     except Exception as e:
         print("Backup failed:", e)
         return None
@@ -254,13 +349,21 @@ def backup_data():
 def ensure_user_exists(user_id: int):
     uid = str(user_id)
     if uid not in data["tadbucks_balances"]:
-        data["tadbucks_balances"][uid] = data["settings"].get("starting_balance", STARTING_BALANCE)
+        start = data["settings"].get("starting_balance", STARTING_BALANCE)
+        data["tadbucks_balances"][uid] = start
+        mark_dirty("tadbucks_balances", uid)
+        balance_rank.update(uid, start)
+        ledger.record(user_id, start, start, "start")
     if uid not in data["tadzzy_points"]:
         data["tadzzy_points"][uid] = 0
+        mark_dirty("tadzzy_points", uid)
+        points_rank.update(uid, 0)
     if uid not in data["xp_levels"]:
         data["xp_levels"][uid] = 0
+        mark_dirty("xp_levels", uid)
     if uid not in data["user_collections"]:
         data["user_collections"][uid] = []
+        mark_dirty("user_collections", uid)
 
 def get_balance(user_id: int) -> int:
     uid = str(user_id)
@@ -269,62 +372,183 @@ def get_balance(user_id: int) -> int:
 def set_balance(user_id: int, amount: int):
     uid = str(user_id)
     data["tadbucks_balances"][uid] = int(amount)
+    mark_dirty("tadbucks_balances", uid)
+    balance_rank.update(uid, amount)
+
+def adjust_balance(user_id: int, delta: int, kind: str, ref: Optional[str] = None) -> int:
+    """Change a balance and record it in the ledger. Returns the new balance."""
+    balance = get_balance(user_id) + int(delta)
+    set_balance(user_id, balance)
+    ledger.record(user_id, delta, balance, kind, ref)
+    return balance
+
+def get_points(user_id: int) -> int:
+    return int(data["tadzzy_points"].get(str(user_id), 0))
+
+def set_points(user_id: int, amount: int):
+    uid = str(user_id)
+    data["tadzzy_points"][uid] = int(amount)
+    mark_dirty("tadzzy_points", uid)
+    points_rank.update(uid, amount)
+
+def get_xp(user_id: int) -> int:
+    return int(data["xp_levels"].get(str(user_id), 0))
+
+def set_xp(user_id: int, amount: int):
+    uid = str(user_id)
+    data["xp_levels"][uid] = int(amount)
+    mark_dirty("xp_levels", uid)
 
-def add_to_collection(user_id: int, card: dict) -> bool:
+def add_to_collection(user_id: int, card: OwnedCard) -> bool:
     uid = str(user_id)
     ensure_user_exists(user_id)
     if len(data["user_collections"][uid]) >= MAX_COLLECTION_SLOTS:
         return False
     data["user_collections"][uid].append(card)
+    mark_dirty("user_collections", uid)
+    income_engine.card_added(uid, card)
+    return True
+
+def remove_from_collection(user_id: int, card: OwnedCard) -> bool:
+    uid = str(user_id)
+    coll = data["user_collections"].get(uid, [])
+    try:
+        coll.remove(card)
+    except ValueError:
+        return False
+    mark_dirty("user_collections", uid)
+    income_engine.card_removed(uid, card)
     return True
 
-# Global variables for tracking
+def get_collection(user_id: int) -> list:
+    return data["user_collections"].get(str(user_id), [])
+
+# Balance / collection changes that span an await go through economy, which re-checks
+# the state at the moment of writing (nothing in between can interleave on the loop)
+economy = Economy(get_balance, set_balance, get_collection, add_to_collection, remove_from_collection,
+                  record=ledger.record)
+
+# -----------------------------
+# Batched XP
+# -----------------------------
+xp_accumulator = XPAccumulator()
+
+def current_xp(user_id: int) -> int:
+    # Stored XP plus messages not flushed yet
+    return get_xp(user_id) + xp_accumulator.pending(user_id) * LEVEL_XP_REWARD
+
+def _apply_xp(user_id: int, messages: int) -> int:
+    ensure_user_exists(user_id)
+    old_xp = get_xp(user_id)
+    new_xp = old_xp + messages * LEVEL_XP_REWARD
+    set_xp(user_id, new_xp)
+    levels = levels_crossed(old_xp, new_xp, LEVEL_UP_XP_THRESHOLD)
+    if levels:
+        adjust_balance(user_id, LEVEL_REWARD_TADBUCKS * levels, "level")
+        set_points(user_id, get_points(user_id) + LEVEL_REWARD_TADZZY * levels)
+    return levels
+
+def apply_pending_xp(user_id: Optional[int] = None) -> list:
+    """Flush pending XP (for one user or everyone). Returns (channel, mention, levels) to announce."""
+    if user_id is not None:
+        messages, (channel, mention) = xp_accumulator.pop(user_id)
+        batch = [(user_id, messages, channel, mention)] if messages else []
+    else:
+        batch = xp_accumulator.drain()
+    level_ups = []
+    for uid, messages, channel, mention in batch:
+        levels = _apply_xp(uid, messages)
+        if levels and channel is not None:
+            level_ups.append((channel, mention, levels))
+    return level_ups
+
+async def announce_level_ups(level_ups: list):
+    for channel, mention, levels in level_ups:
+        times = f" x{levels}" if levels > 1 else ""
+        try:
+            await channel.send(
+                f"🎉 {mention} leveled up{times}! You received {LEVEL_REWARD_TADZZY * levels} Tadzzy Points and ${LEVEL_REWARD_TADBUCKS * levels} Tadbucks."
+            )
+        except Exception:
+            pass
+
+income_engine = IncomeEngine()
+balance_rank = RankIndex()
+points_rank = RankIndex()
+name_cache = NameCache()
+
+# One scheduler task for every timed thing (auctions, trade expiry, ...)
+scheduler = DeadlineScheduler()
+paginator = Paginator(scheduler)
+trade_manager = TradeManager(data["trades"], scheduler, lambda trade_id: mark_dirty("trades", trade_id))
+
+# Per (command, user) cooldowns; persisted ones survive restarts
+cooldowns = Cooldowns(data["cooldowns"], mark_dirty)
+cooldowns.define("gamble", GAMBLE_COOLDOWN_SECONDS)
+cooldowns.define("xp", XP_COOLDOWN_SECONDS, persist=False)
+
+# Passive income per user, rebuilt from the ledger's totals on load
 last_income_report = {}
 total_income_tracker = {}
-gamble_cooldowns: Dict[str, str] = {}
 active_guess_games: Dict[str, dict] = {}
-two_way_trades = {}
-pending_trades = {}
 
 # -----------------------------
 # Background tasks
 # -----------------------------
 @tasks.loop(seconds=AUTOSAVE_INTERVAL_SECONDS)
+@metrics.timed("task_seconds", task="autosave")
 async def autosave_task():
-    saved = save_data()
-    if saved:
-        print(f"[{datetime.utcnow().isoformat()}] Autosaved data.")
+    saved = await save_data_async(skip_if_busy=True)
+    if saved is None:
+        print(f"[{datetime.utcnow().isoformat()}] Autosave skipped, previous save still running.")
+    elif saved:
+        print(f"[{datetime.utcnow().isoformat()}] Autosaved data ({storage.metrics.summary()}).")
     else:
         print(f"[{datetime.utcnow().isoformat()}] Autosave failed.")
 
+@tasks.loop(seconds=XP_FLUSH_INTERVAL_SECONDS)
+@metrics.timed("task_seconds", task="xp_flush")
+async def xp_flush_task():
+    if not data_ready.is_set():
+        return  # reloading; the counts stay pending until the new data is in
+    level_ups = apply_pending_xp()
+    if level_ups:
+        await announce_level_ups(level_ups)
+
+@tasks.loop(minutes=BACKUP_INTERVAL_MINUTES)
+@metrics.timed("task_seconds", task="backup")
+async def backup_task():
+    manifest = await backup_data()
+    if manifest:
+        print(f"[Backup] {describe_backup(manifest)}")
+
+@backup_task.before_loop
+async def before_backup_task():
+    await bot.wait_until_ready()
+
+@tasks.loop(seconds=LEDGER_FLUSH_INTERVAL_SECONDS)
+@metrics.timed("task_seconds", task="ledger_flush")
+async def ledger_flush_task():
+    await ledger.flush()
+
 @tasks.loop(minutes=30)
+@metrics.timed("task_seconds", task="passive_income")
 async def passive_income():
-    for uid, coll in data["user_collections"].items():
-        total_income = 0
-        for card in coll:
-            # Use the new income_rate field for more accurate passive income
-            income = card.get("income_rate", 1)
-            
-            # Add bonus based on rarity for extra scaling
-            rarity = card.get("rarity", "Common")
-            if rarity == "Secret":
-                income = int(income * 1.5)  # 50% bonus
-            elif rarity == "Mythic":
-                income = int(income * 1.3)  # 30% bonus
-            elif rarity == "Legendary":
-                income = int(income * 1.2)  # 20% bonus
-            elif rarity == "Epic":
-                income = int(income * 1.1)  # 10% bonus
-            
-            total_income += income
-
-        if total_income > 0:
-            data["tadbucks_balances"][uid] = data["tadbucks_balances"].get(uid, STARTING_BALANCE) + total_income
+    await data_ready.wait()  # pay into the reloaded data, not the sections being replaced
+    # Per-user totals are kept up to date by add_to_collection/remove_from_collection
+    paid_users = 0
+    paid_total = 0
+    balance_rank.invalidate()  # re-sorted once on the next leaderboard query
+    with metrics.timer("payout_seconds"):
+        for uid, total_income in income_engine.payouts():
+            adjust_balance(uid, total_income, "income")
             last_income_report[uid] = total_income
             total_income_tracker[uid] = total_income_tracker.get(uid, 0) + total_income
-            print(f"[Passive Income] User {uid} earned {total_income} Tadbucks.")
+            paid_users += 1
+            paid_total += total_income
+    print(f"[Passive Income] Paid {paid_total:,} Tadbucks to {paid_users:,} users.")
 
-    save_data()
+    await save_data_async()
 
 @passive_income.before_loop
 async def before_passive_income():
@@ -334,37 +558,112 @@ async def before_passive_income():
 # -----------------------------
 # Bot events
 # -----------------------------
+# -----------------------------
+# Health server
+# -----------------------------
+def gateway_connected() -> bool:
+    return bot.is_ready() and not bot.is_closed() and all(not s.is_closed() for s in bot.shards.values())
+
+def autosave_age() -> float:
+    # Before the first save, count from process start
+    last = storage.metrics.last_saved_at or metrics.started_at
+    return time.time() - last
+
+def readiness_problems() -> List[str]:
+    problems = []
+    if not gateway_connected():
+        problems.append("gateway not connected")
+    if not data_ready.is_set():
+        problems.append("data still loading")
+    if autosave_age() > HEALTH_MAX_AUTOSAVE_AGE_SECONDS:
+        problems.append(f"last autosave {autosave_age():.0f}s ago")
+    if loop_lag.last > HEALTH_MAX_LOOP_LAG_SECONDS:
+        problems.append(f"event loop lag {loop_lag.last:.2f}s")
+    return problems
+
+def bot_status() -> dict:
+    latency = bot.latency
+    return {
+        "user": str(bot.user) if bot.user else None,
+        "uptime_seconds": round(time.time() - metrics.started_at),
+        "gateway_connected": gateway_connected(),
+        "gateway_latency_ms": round(latency * 1000) if latency == latency and latency != float("inf") else None,
+        "shards": bot.shard_count or 1,
+        "guilds": len(bot.guilds),
+        "data_loaded": data_ready.is_set(),
+        "users": len(data["tadbucks_balances"]),
+        "storage": storage.name,
+        "last_autosave_age_seconds": round(autosave_age(), 1),
+        "loop_lag_ms": round(loop_lag.last * 1000, 1),
+    }
+
+health_server = HealthServer(bot_status, readiness_problems, metrics.render, port=HEALTH_PORT)
+
+async def setup_hook():
+    # Runs on the bot's loop before login, so /healthz answers during startup too
+    loop_lag.start()
+    watchdog.start()
+    paginator.start(bot)
+    giveaway_manager.start(bot)
+    try:
+        await health_server.start()
+    except OSError as e:
+        print(f"[Health] Could not listen on port {HEALTH_PORT}:", e)
+
+bot.setup_hook = setup_hook
+
 @bot.event
 async def on_ready():
-    print(f"✅ Bot ready as {bot.user} (ID: {bot.user.id})")
-    load_data()
+    startup_profile.mark("login + gateway")
+    print(f"✅ Bot ready as {bot.user} (ID: {bot.user.id}), {bot.shard_count or 1} shard(s)")
+    # on_ready fires again after every reconnect; the data is still in memory then
+    if not data_ready.is_set():
+        with startup_profile.phase("load_data"):
+            await load_data_async()
     if not autosave_task.is_running():
+        if storage.name == "sqlite":
+            autosave_task.change_interval(seconds=SQLITE_AUTOSAVE_INTERVAL_SECONDS)
         autosave_task.start()
     if not passive_income.is_running():
         passive_income.start()
+    if not xp_flush_task.is_running():
+        xp_flush_task.start()
+    if not ledger_flush_task.is_running():
+        ledger_flush_task.start()
+    if not backup_task.is_running():
+        backup_task.start()
+    scheduler.start()
+    resume_broadcast()
+    startup_profile.mark("background tasks")
     await bot.change_presence(activity=discord.Game(name="type !help"))
+    startup_profile.report()
+
+@bot.check
+async def wait_for_data(ctx: commands.Context) -> bool:
+    # Commands that arrive while the data file is still loading wait for it
+    await data_ready.wait()
+    return True
+
+@bot.before_invoke
+async def start_command_timer(ctx: commands.Context):
+    ctx.started_at = time.perf_counter()
+
+@bot.after_invoke
+async def record_command_metrics(ctx: commands.Context):
+    # Runs after the command body whether or not it raised
+    name = ctx.command.qualified_name
+    metrics.observe("command_seconds", time.perf_counter() - ctx.started_at, command=name)
+    if ctx.command_failed:
+        metrics.inc("command_errors", command=name)
 
 @bot.event
 async def on_message(message: discord.Message):
     if message.author.bot:
         return
     
-    # XP system per message
-    uid = message.author.id
-    ensure_user_exists(uid)
-    data["xp_levels"][str(uid)] = int(data["xp_levels"].get(str(uid), 0)) + LEVEL_XP_REWARD
-    
-    # Level check
-    current_xp = data["xp_levels"][str(uid)]
-    if current_xp % LEVEL_UP_XP_THRESHOLD == 0:
-        data["tadbucks_balances"][str(uid)] = int(data["tadbucks_balances"].get(str(uid), data["settings"].get("starting_balance", STARTING_BALANCE))) + LEVEL_REWARD_TADBUCKS
-        data["tadzzy_points"][str(uid)] = int(data["tadzzy_points"].get(str(uid), 0)) + LEVEL_REWARD_TADZZY
-        try:
-            await message.channel.send(
-                f"🎉 {message.author.mention} leveled up! You received {LEVEL_REWARD_TADZZY} Tadzzy Points and ${LEVEL_REWARD_TADBUCKS} Tadbucks."
-            )
-        except Exception:
-            pass
+    # XP system per message (coalesced, applied by xp_flush_task); spam inside the cooldown earns nothing
+    if not cooldowns.acquire("xp", message.author.id):
+        xp_accumulator.add(message.author.id, message.channel, message.author.mention)
 
     # Guess game listener
     key = str(message.author.id)
@@ -387,7 +686,7 @@ async def on_message(message: discord.Message):
         weights = list(rarity_weights.values())
         chosen_rarity = random.choices(rarities, weights=weights, k=1)[0]
 
-        available_cards = [f for f in footballers if f["rarity"] == chosen_rarity]
+        available_cards = catalog.by_rarity(chosen_rarity)
         if available_cards:
             card = random.choice(available_cards)
             await message.channel.send(
@@ -417,8 +716,10 @@ async def help_command(ctx: commands.Context):
             "`!buy <player>` - Purchase a player card\n"
             "`!sell <player>` - Sell your player card\n"
             "`!checkbalance` - View your Tadbucks\n"
+            "`!history` - Your last 20 transactions\n"
             "`!collection` - View your cards\n"
-            "`!leaderboard` - Top Tadbucks players"
+            "`!leaderboard` - Top Tadbucks players\n"
+            "`!rank` - Your leaderboard positions"
         ),
         inline=False
     )
@@ -430,6 +731,7 @@ async def help_command(ctx: commands.Context):
             "`!trade @user <card_index>` - Trade with another player\n"
             "`!accepttrade <trade_id>` - Accept a trade offer\n"
             "`!declinetrade <trade_id>` - Decline a trade offer\n"
+            "`!trades` - Your pending trade offers\n"
             "`!spawnauction <player>` - Start an auction\n"
             "`!bid <player> <amount>` - Bid on auctions"
         ),
@@ -556,7 +858,9 @@ async def adminhelp(ctx: commands.Context):
             "`!forcecloseauction <player>` - Force close auction\n"
             "`!addgamenight <link>` - Add Roblox game night\n"
             "`!gamenightremove <link>` - Remove game night\n"
-            "`!giveawaycreate <time> <prize>` - Create giveaway"
+            "`!giveawaycreate <seconds> <prize>` - Create giveaway\n"
+            "`!giveawaymulti <seconds> <winners> <prize>` - Giveaway with several winners\n"
+            "`!giveawayend <message id>` - End a giveaway now"
         ),
         inline=False
     )
@@ -568,7 +872,12 @@ async def adminhelp(ctx: commands.Context):
             "`!save` - Manually save data\n"
             "`!load` - Reload data from disk\n"
             "`!backup` - Create data backup\n"
+            "`!backups` / `!verifybackup <id>` / `!restorebackup <id>`\n"
+            "`!ledgeraudit` - Check balances against the ledger\n"
+            "`!perf` - Slowest commands and background tasks\n"
+            "`!stalls` - What blocked the event loop, worst first\n"
             "`!broadcast <message>` - Send to all members\n"
+            "`!broadcaststatus` / `!broadcastcancel` - Track or stop it\n"
             "`!say <message>` - Make bot speak"
         ),
         inline=False
@@ -585,26 +894,24 @@ async def shop(ctx: commands.Context, rarity: str = None):
     """Browse the player shop with optional rarity filter"""
     if rarity:
         rarity = rarity.title()
-        available_cards = [f for f in footballers if f["rarity"] == rarity]
-        if not available_cards:
+        if not catalog.by_rarity(rarity):
             return await ctx.send(f"No players found with rarity '{rarity}'. Available rarities: Common, Epic, Legendary, Mythic, Expensive, Secret")
-    else:
-        available_cards = footballers
-    
-    # Sort by price for better organization
-    available_cards.sort(key=lambda x: x["price"], reverse=True)
-    
+    await paged_embed_navigation(ctx, shop_pages(rarity))
+
+def shop_pages(rarity: Optional[str], per_page: int = CATALOG_PAGE_SIZE) -> List[discord.Embed]:
+    """Shop pages, most expensive first; built once per (rarity, page size) and shared, so never mutate them."""
+    return catalog.memo(("shop", rarity, per_page), lambda: build_shop_pages(catalog.by_price(rarity), rarity, per_page))
+
+def build_shop_pages(cards, rarity: Optional[str], per_page: int) -> List[discord.Embed]:
     pages = []
-    per_page = 8
-    
-    for i in range(0, len(available_cards), per_page):
+    for i in range(0, len(cards), per_page):
         embed = discord.Embed(
             title=f"🏪 Tadzzy Card Shop{f' - {rarity} Cards' if rarity else ''}",
             description="Use `!buy <player>` to purchase a card!",
             color=0x00ff00
         )
         
-        for card in available_cards[i:i+per_page]:
+        for card in cards[i:i+per_page]:
             income_info = f"💰 {card.get('income_rate', 1)}/30min"
             embed.add_field(
                 name=f"{card['name']} ({card['rarity']})",
@@ -612,10 +919,9 @@ async def shop(ctx: commands.Context, rarity: str = None):
                 inline=True
             )
         
-        embed.set_footer(text=f"Page {i//per_page + 1}/{(len(available_cards)-1)//per_page + 1} | Tip: Higher rarity = more income!")
+        embed.set_footer(text=f"Page {i//per_page + 1}/{(len(cards)-1)//per_page + 1} | Tip: Higher rarity = more income!")
         pages.append(embed)
-    
-    await paged_embed_navigation(ctx, pages)
+    return pages
 
 @bot.command()
 async def buy(ctx: commands.Context, *, player_name: str):
@@ -624,7 +930,7 @@ async def buy(ctx: commands.Context, *, player_name: str):
     
     card = find_player_card_by_name(player_name)
     if not card:
-        return await ctx.send("❌ Player not found in shop. Use `!shop` to browse available players.")
+        return await ctx.send("❌ Player not found in shop." + (suggestion_hint(player_name) or " Use `!shop` to browse available players."))
     
     user_balance = get_balance(ctx.author.id)
     card_price = card["price"]
@@ -642,18 +948,19 @@ async def buy(ctx: commands.Context, *, player_name: str):
     if len(user_collection) >= MAX_COLLECTION_SLOTS:
         return await ctx.send(f"❌ Your collection is full! ({MAX_COLLECTION_SLOTS}/{MAX_COLLECTION_SLOTS})")
     
-    # Process purchase
-    set_balance(ctx.author.id, user_balance - card_price)
-    data["user_collections"][uid].append(card.copy())
+    # Process purchase (balance and slots are re-checked together with the debit)
+    new_balance = economy.buy_card(ctx.author.id, OwnedCard(card), card_price)
+    if new_balance is None:
+        return await ctx.send("❌ Purchase failed, your balance or collection changed. Try again.")
     
     embed = discord.Embed(
         title="🎉 Purchase Successful!",
         description=f"You bought **{card['name']}** for ${card_price:,}!",
         color=card["color"]
     )
-    embed.add_field(name="Remaining Balance", value=f"${get_balance(ctx.author.id):,}", inline=True)
+    embed.add_field(name="Remaining Balance", value=f"${new_balance:,}", inline=True)
     embed.add_field(name="Passive Income", value=f"💰 {card.get('income_rate', 1)} every 30 minutes", inline=True)
-    embed.add_field(name="Collection", value=f"{len(user_collection)+1}/{MAX_COLLECTION_SLOTS}", inline=True)
+    embed.add_field(name="Collection", value=f"{len(get_collection(ctx.author.id))}/{MAX_COLLECTION_SLOTS}", inline=True)
     
     await ctx.send(embed=embed)
 
@@ -678,17 +985,8 @@ async def trade(ctx: commands.Context, target: discord.Member, card_index: int):
         return
 
     item_to_trade = sender_coll[card_index - 1]
-    trade_id = f"{ctx.author.id}_{target.id}_{int(datetime.utcnow().timestamp())}"
-    
-    # Store trade info
-    pending_trades[trade_id] = {
-        "sender": ctx.author.id,
-        "recipient": target.id,
-        "card": item_to_trade,
-        "card_index": card_index - 1,
-        "status": "pending",
-        "timestamp": datetime.utcnow().isoformat()
-    }
+    # The offer names the card, not its slot, so later collection changes can't swap it
+    trade_id = trade_manager.create(ctx.author.id, target.id, item_to_trade["name"])
 
     embed = discord.Embed(
         title="🔄 Trade Offer",
@@ -708,48 +1006,31 @@ async def trade(ctx: commands.Context, target: discord.Member, card_index: int):
     embed.set_footer(text=f"Trade ID: {trade_id} | Expires in 5 minutes")
 
     await ctx.send(embed=embed)
-    
-    # Auto-expire trade after 5 minutes
-    await asyncio.sleep(300)  # 5 minutes
-    if trade_id in pending_trades and pending_trades[trade_id]["status"] == "pending":
-        del pending_trades[trade_id]
 
 @bot.command()
 async def accepttrade(ctx: commands.Context, trade_id: str):
     """Accept a trade offer"""
-    if trade_id not in pending_trades:
+    trade = trade_manager.get(trade_id)
+    if trade is None:
         return await ctx.send("❌ Trade not found or expired.")
     
-    trade = pending_trades[trade_id]
     if trade["recipient"] != ctx.author.id:
         return await ctx.send("❌ This trade is not for you.")
     
-    if trade["status"] != "pending":
-        return await ctx.send("❌ This trade is no longer available.")
-    
-    sender_id = str(trade["sender"])
-    recipient_id = str(trade["recipient"])
+    sender_id = trade["sender"]
+    recipient_id = trade["recipient"]
     
-    sender_coll = data["user_collections"].get(sender_id, [])
-    recipient_coll = data["user_collections"].get(recipient_id, [])
-    
-    # Check if recipient has space
-    if len(recipient_coll) >= MAX_COLLECTION_SLOTS:
-        await ctx.send("❌ Your collection is full! Cannot accept trade.")
-        del pending_trades[trade_id]
-        return
-    
-    # Check if sender still has the card
-    if trade["card_index"] >= len(sender_coll) or sender_coll[trade["card_index"]]["name"] != trade["card"]["name"]:
-        await ctx.send("❌ The sender no longer has this card.")
-        del pending_trades[trade_id]
-        return
-    
-    # Execute trade
-    card = sender_coll.pop(trade["card_index"])
-    recipient_coll.append(card)
-    
-    trade["status"] = "completed"
+    card = None
+    if len(get_collection(recipient_id)) >= MAX_COLLECTION_SLOTS:
+        error = "❌ Your collection is full! Cannot accept trade."
+    else:
+        # Check if sender still has the card
+        card = next((c for c in get_collection(sender_id) if c["name"] == trade["card_id"]), None)
+        moved = card is not None and economy.transfer_card(sender_id, recipient_id, card, MAX_COLLECTION_SLOTS)
+        error = None if moved else "❌ The sender no longer has this card."
+    trade_manager.remove(trade_id)
+    if error:
+        return await ctx.send(error)
     
     embed = discord.Embed(
         title="✅ Trade Completed!",
@@ -763,20 +1044,37 @@ async def accepttrade(ctx: commands.Context, trade_id: str):
     )
     
     await ctx.send(embed=embed)
-    del pending_trades[trade_id]
 
 @bot.command()
 async def declinetrade(ctx: commands.Context, trade_id: str):
     """Decline a trade offer"""
-    if trade_id not in pending_trades:
+    trade = trade_manager.get(trade_id)
+    if trade is None:
         return await ctx.send("❌ Trade not found.")
     
-    trade = pending_trades[trade_id]
     if trade["recipient"] != ctx.author.id:
         return await ctx.send("❌ This trade is not for you.")
     
     await ctx.send(f"❌ <@{ctx.author.id}> declined the trade offer.")
-    del pending_trades[trade_id]
+    trade_manager.remove(trade_id)
+
+@bot.command()
+async def trades(ctx: commands.Context):
+    """List your pending incoming and outgoing trade offers"""
+    def describe(trade_id: str, other_key: str) -> str:
+        t = trade_manager.trades[trade_id]
+        return f"`{trade_id}` — **{t['card_id']}** with <@{t[other_key]}>, expires <t:{int(t['expires_at'])}:R>"
+
+    incoming = trade_manager.incoming(ctx.author.id)
+    outgoing = trade_manager.outgoing(ctx.author.id)
+    if not incoming and not outgoing:
+        return await ctx.send("🔄 You have no pending trades.")
+    embed = discord.Embed(title="🔄 Your Pending Trades", color=0xff9900)
+    if incoming:
+        embed.add_field(name="Incoming", value="\n".join(describe(t, "sender") for t in incoming[:10]), inline=False)
+    if outgoing:
+        embed.add_field(name="Outgoing", value="\n".join(describe(t, "recipient") for t in outgoing[:10]), inline=False)
+    await ctx.send(embed=embed)
 
 # -----------------------------
 # Enhanced Selling System  
@@ -829,18 +1127,20 @@ async def sell(ctx: commands.Context, *, player_name: str):
         reaction, user = await bot.wait_for("reaction_add", timeout=30.0, check=check)
         
         if str(reaction.emoji) == "✅":
-            # Process sale
-            coll.remove(card)
-            current_balance = get_balance(ctx.author.id)
-            set_balance(ctx.author.id, current_balance + sell_price)
+            # Process sale; the card may have been sold or traded while we waited
+            new_balance = economy.sell_card(ctx.author.id, card, sell_price)
+            if new_balance is None:
+                await msg.edit(content="❌ You no longer own this card. Sale cancelled.", embed=None)
+                await msg.clear_reactions()
+                return
             
             success_embed = discord.Embed(
                 title="✅ Sale Completed!",
                 description=f"You sold **{card['name']}** for ${sell_price:,}!",
                 color=0x00ff00
             )
-            success_embed.add_field(name="New Balance", value=f"${get_balance(ctx.author.id):,}", inline=True)
-            success_embed.add_field(name="Cards Remaining", value=f"{len(coll)}/{MAX_COLLECTION_SLOTS}", inline=True)
+            success_embed.add_field(name="New Balance", value=f"${new_balance:,}", inline=True)
+            success_embed.add_field(name="Cards Remaining", value=f"{len(get_collection(ctx.author.id))}/{MAX_COLLECTION_SLOTS}", inline=True)
             
             await msg.edit(embed=success_embed)
             await msg.clear_reactions()
@@ -942,28 +1242,29 @@ async def nick(ctx: commands.Context, member: discord.Member, *, newname: str):
 @bot.command()
 async def givetadzzypoints(ctx: commands.Context, member: discord.Member, amount: int):
     ensure_user_exists(member.id)
-    data["tadzzy_points"][str(member.id)] = int(data["tadzzy_points"].get(str(member.id), 0)) + amount
+    set_points(member.id, get_points(member.id) + amount)
     await ctx.send(f"✅ Gave {amount} Tadzzy Points to {member.mention}.")
 
 @commands.has_permissions(administrator=True)
 @bot.command()
 async def removetadzzypoints(ctx: commands.Context, member: discord.Member, amount: int):
     ensure_user_exists(member.id)
-    data["tadzzy_points"][str(member.id)] = max(0, int(data["tadzzy_points"].get(str(member.id), 0)) - amount)
+    set_points(member.id, max(0, get_points(member.id) - amount))
     await ctx.send(f"✅ Removed {amount} Tadzzy Points from {member.mention}.")
 
 @commands.has_permissions(administrator=True)
 @bot.command()
 async def givetadbucks(ctx: commands.Context, member: discord.Member, amount: int):
     ensure_user_exists(member.id)
-    data["tadbucks_balances"][str(member.id)] = int(data["tadbucks_balances"].get(str(member.id), STARTING_BALANCE)) + amount
+    adjust_balance(member.id, amount, "admin", f"givetadbucks by {ctx.author.id}")
     await ctx.send(f"✅ Gave ${amount} Tadbucks to {member.mention}.")
 
 @commands.has_permissions(administrator=True)
 @bot.command()
 async def removetadbucks(ctx: commands.Context, member: discord.Member, amount: int):
     ensure_user_exists(member.id)
-    data["tadbucks_balances"][str(member.id)] = max(0, int(data["tadbucks_balances"].get(str(member.id), STARTING_BALANCE)) - amount)
+    balance = get_balance(member.id)
+    adjust_balance(member.id, max(0, balance - amount) - balance, "admin", f"removetadbucks by {ctx.author.id}")
     await ctx.send(f"✅ Removed ${amount} Tadbucks from {member.mention}.")
 
 @commands.has_permissions(administrator=True)
@@ -972,10 +1273,9 @@ async def giveplayer(ctx: commands.Context, member: discord.Member, *, player_na
     ensure_user_exists(member.id)
     card = find_player_card_by_name(player_name)
     if not card:
-        return await ctx.send("Player not found.")
-    if len(data["user_collections"][str(member.id)]) >= MAX_COLLECTION_SLOTS:
+        return await ctx.send("Player not found." + suggestion_hint(player_name))
+    if not add_to_collection(member.id, OwnedCard(card)):
         return await ctx.send("User's collection is full.")
-    data["user_collections"][str(member.id)].append(card)
     await ctx.send(f"✅ Gave {member.mention} the player card **{card['name']}**.")
 
 @commands.has_permissions(administrator=True)
@@ -986,27 +1286,31 @@ async def removeplayer(ctx: commands.Context, member: discord.Member, *, player_
     card = next((c for c in coll if normalize_name(c["name"]) == normalize_name(player_name)), None)
     if not card:
         return await ctx.send("User does not own that player.")
-    coll.remove(card)
+    remove_from_collection(member.id, card)
     await ctx.send(f"✅ Removed {card['name']} from {member.mention}'s collection.")
 
 @commands.has_permissions(administrator=True)
 @bot.command()
 async def addlevel(ctx: commands.Context, member: discord.Member, amount: int):
     ensure_user_exists(member.id)
-    data["xp_levels"][str(member.id)] = int(data["xp_levels"].get(str(member.id), 0)) + amount
+    await announce_level_ups(apply_pending_xp(member.id))
+    set_xp(member.id, get_xp(member.id) + amount)
     await ctx.send(f"✅ Added {amount} XP to {member.mention}.")
 
 @commands.has_permissions(administrator=True)
 @bot.command()
 async def removelevel(ctx: commands.Context, member: discord.Member, amount: int):
     ensure_user_exists(member.id)
-    data["xp_levels"][str(member.id)] = max(0, int(data["xp_levels"].get(str(member.id), 0)) - amount)
+    await announce_level_ups(apply_pending_xp(member.id))
+    set_xp(member.id, max(0, get_xp(member.id) - amount))
     await ctx.send(f"✅ Removed {amount} XP from {member.mention}.")
 
 @commands.has_permissions(administrator=True)
 @bot.command()
 async def resetbalance(ctx: commands.Context, member: discord.Member):
-    data["tadbucks_balances"][str(member.id)] = data["settings"].get("starting_balance", STARTING_BALANCE)
+    ensure_user_exists(member.id)
+    start = data["settings"].get("starting_balance", STARTING_BALANCE)
+    adjust_balance(member.id, start - get_balance(member.id), "admin", f"resetbalance by {ctx.author.id}")
     await ctx.send(f"✅ Reset {member.mention}'s balance to ${data['tadbucks_balances'][str(member.id)]}.")
 
 @commands.has_permissions(administrator=True)
@@ -1014,63 +1318,213 @@ async def resetbalance(ctx: commands.Context, member: discord.Member):
 async def forcecloseauction(ctx: commands.Context, *, player_name: str):
     card = find_player_card_by_name(player_name)
     if not card:
-        return await ctx.send("Player not found.")
+        return await ctx.send("Player not found." + suggestion_hint(player_name))
     pname = card["name"]
-    if pname not in data["auctions"] or not data["auctions"][pname].get("active", False):
+    if not auction_engine.get_active(pname):
         return await ctx.send("No active auction for that player.")
-    auction = data["auctions"][pname]
-    highest_bidder = auction.get("highest_bidder")
-    highest_bid = int(auction.get("highest_bid", 0))
-    auction["active"] = False
-    if highest_bidder:
-        ensure_user_exists(int(highest_bidder))
-        if int(data["tadbucks_balances"].get(str(highest_bidder), STARTING_BALANCE)) >= highest_bid:
-            data["tadbucks_balances"][str(highest_bidder)] -= highest_bid
-            data["user_collections"].setdefault(str(highest_bidder), [])
-            if len(data["user_collections"][str(highest_bidder)]) < MAX_COLLECTION_SLOTS:
-                data["user_collections"][str(highest_bidder)].append(card)
-                await ctx.send(f"🎉 Auction force-closed. <@{highest_bidder}> wins {pname} for ${highest_bid}.")
-                return
-    await ctx.send("Auction force-closed. No valid winner or failed to deliver card.")
+    await ctx.send(f"Auction force-closed. {await settle_auction(pname)}")
+
+# Broadcasts run as a background job: worker pool + rate limiter, checkpointed to disk
+async def send_broadcast_dm(user_id: int, text: str):
+    user = bot.get_user(user_id) or await bot.fetch_user(user_id)
+    await user.send(text)
+
+broadcaster = BroadcastRunner(send_broadcast_dm, BROADCAST_STATE_FILE,
+                              workers=BROADCAST_WORKERS, rate_per_second=BROADCAST_RATE_PER_SECOND)
+broadcast_task: Optional[asyncio.Task] = None
+
+def broadcast_in_progress() -> bool:
+    # The task exists from the moment a job is accepted; broadcaster.running only
+    # turns true once run_broadcast reaches broadcaster.run, after an await
+    return broadcast_task is not None and not broadcast_task.done()
+
+async def run_broadcast(job: BroadcastJob, resumed: bool = False):
+    channel = bot.get_channel(job.channel_id)
+    status = None
+    if channel:
+        try:
+            status = await channel.send(f"📣 Broadcast {'resumed' if resumed else 'started'}: {job.summary()}")
+        except Exception:
+            pass
+
+    async def progress(j: BroadcastJob):
+        if status:
+            await status.edit(content=f"📣 Broadcast in progress: {j.summary()}")
+
+    await broadcaster.run(job, progress)
+    print(f"[Broadcast] Job {job.job_id} done: {job.summary()}")
+    if channel:
+        await channel.send(f"{'🛑' if job.cancelled else '✅'} Broadcast {'cancelled' if job.cancelled else 'finished'}: {job.summary()}")
+
+def resume_broadcast():
+    global broadcast_task
+    if broadcast_in_progress():
+        return
+    job = broadcaster.load_pending()
+    if job:
+        print(f"[Broadcast] Resuming job {job.job_id} ({len(job.remaining)} members left)")
+        broadcast_task = asyncio.create_task(run_broadcast(job, resumed=True))
 
 @commands.has_permissions(administrator=True)
 @bot.command()
 async def broadcast(ctx: commands.Context, *, message: str):
-    sent = 0
-    failed = 0
-    for member in ctx.guild.members:
-        if member.bot:
-            continue
-        try:
-            await member.send(f"[Broadcast from {ctx.guild.name}] {message}")
-            sent += 1
-        except Exception:
-            failed += 1
-    await ctx.send(f"Broadcast sent to {sent} members, failed for {failed} members.")
+    global broadcast_task
+    if broadcast_in_progress():
+        summary = broadcaster.job.summary() if broadcaster.running else "starting"
+        return await ctx.send(f"❌ A broadcast is already running: {summary}")
+    member_ids = [m.id for m in ctx.guild.members if not m.bot]
+    job = BroadcastJob(
+        f"{ctx.guild.id}_{int(datetime.utcnow().timestamp())}", ctx.guild.id, ctx.channel.id,
+        f"[Broadcast from {ctx.guild.name}] {message}", member_ids
+    )
+    broadcast_task = asyncio.create_task(run_broadcast(job))
+
+@commands.has_permissions(administrator=True)
+@bot.command()
+async def broadcaststatus(ctx: commands.Context):
+    if broadcaster.job is None:
+        return await ctx.send("No broadcast has run since startup.")
+    state = "running" if broadcaster.running else "cancelled" if broadcaster.job.cancelled else "finished"
+    await ctx.send(f"📣 Broadcast {state}: {broadcaster.job.summary()}")
+
+@commands.has_permissions(administrator=True)
+@bot.command()
+async def broadcastcancel(ctx: commands.Context):
+    if not broadcaster.running:
+        return await ctx.send("No broadcast is running.")
+    broadcaster.cancel()
+    await ctx.send("🛑 Cancelling broadcast...")
 
 @commands.has_permissions(administrator=True)
 @bot.command()
 async def save(ctx: commands.Context):
-    ok = save_data()
+    ok = await save_data_async()
     await ctx.send("Saved data." if ok else "Save failed.")
 
 @commands.has_permissions(administrator=True)
 @bot.command()
 async def load(ctx: commands.Context):
-    load_data()
+    await load_data_async()
     await ctx.send("Loaded data (from disk).")
 
 @commands.has_permissions(administrator=True)
 @bot.command()
 async def backup(ctx: commands.Context):
-    if not os.path.exists(DATA_FILE):
-        return await ctx.send("No data file to backup.")
-    dest = backup_data()
-    if dest:
-        await ctx.send(f"Backup created: `{dest}`")
+    manifest = await backup_data()
+    if manifest:
+        await ctx.send(f"Backup created: `{describe_backup(manifest)}`")
     else:
         await ctx.send("Backup failed.")
 
+@commands.has_permissions(administrator=True)
+@bot.command()
+async def backups(ctx: commands.Context):
+    manifests = await asyncio.to_thread(backup_store.list)
+    if not manifests:
+        return await ctx.send("No backups yet.")
+    lines = [f"`{describe_backup(m)}`" for m in manifests[-10:][::-1]]
+    await ctx.send(f"🗄️ {len(manifests)} backups, newest first:\n" + "\n".join(lines))
+
+@commands.has_permissions(administrator=True)
+@bot.command()
+async def verifybackup(ctx: commands.Context, backup_id: str):
+    try:
+        problems = await asyncio.to_thread(backup_store.verify, backup_id)
+    except FileNotFoundError:
+        return await ctx.send(f"No backup `{backup_id}`. Use `!backups` to list them.")
+    if problems:
+        return await ctx.send(f"❌ Backup `{backup_id}` has {len(problems)} problems:\n" + "\n".join(problems[:10]))
+    await ctx.send(f"✅ Backup `{backup_id}` verified, every chunk is present and intact.")
+
+@commands.has_permissions(administrator=True)
+@bot.command()
+async def restorebackup(ctx: commands.Context, backup_id: str):
+    """Replace the live data with a backup (verified first) and save it"""
+    try:
+        async with backup_lock:  # retention must not sweep chunks while we read them
+            problems = await asyncio.to_thread(backup_store.verify, backup_id)
+            if problems:
+                return await ctx.send(f"❌ Backup `{backup_id}` failed verification, not restoring:\n" + "\n".join(problems[:10]))
+            restored = await asyncio.to_thread(backup_store.restore, backup_id)
+    except FileNotFoundError:
+        return await ctx.send(f"No backup `{backup_id}`. Use `!backups` to list them.")
+    data_ready.clear()
+    apply_pending_xp()
+    if "tadbucks_balances" in restored:
+        # The ledger is a sum of deltas; record the jump to the restored balances
+        ledger.record_rebase(data["tadbucks_balances"], restored["tadbucks_balances"], "restore", backup_id)
+    for section in PERSISTED_SECTIONS:
+        if section in restored:
+            data[section] = restored[section]
+            mark_dirty(section)
+    # The restore was recorded in the ledger above; its totals haven't changed
+    index_loaded_data(None)
+    ok = await save_data_async()
+    await ctx.send(f"♻️ Restored backup `{backup_id}`." + ("" if ok else " Saving it failed, check the logs."))
+
+@commands.has_permissions(administrator=True)
+@bot.command()
+async def ledgeraudit(ctx: commands.Context):
+    """Compare stored balances with the ledger (latest snapshot + later events)"""
+    try:
+        replayed = await asyncio.to_thread(ledger.replay_balances)
+    except Exception as e:
+        return await ctx.send(f"Ledger audit failed: {e}")
+    balances = {uid: int(v) for uid, v in data["tadbucks_balances"].items()}
+    problems = audit(replayed, balances, ledger.pending_events())
+    if not problems:
+        return await ctx.send(f"✅ Ledger matches all {len(balances):,} balances.")
+    lines = [f"<@{uid}>: ledger ${expected:,}, stored ${actual or 0:,}" for uid, expected, actual in problems[:10]]
+    await ctx.send(f"⚠️ {len(problems):,} balances differ from the ledger:\n" + "\n".join(lines))
+
+def format_latency_rows(series) -> str:
+    rows = [f"{'name':<16}{'calls':>7}{'p50':>8}{'p95':>8}{'p99':>8}{'max':>8}"]
+    for name, hist in series:
+        rows.append(f"{name[:16]:<16}{hist.count:>7,}" + "".join(
+            f"{v * 1000:>6.0f}ms" for v in (hist.quantile(0.5), hist.quantile(0.95), hist.quantile(0.99), hist.max)
+        ))
+    return "```\n" + "\n".join(rows) + "\n```"
+
+@commands.has_permissions(administrator=True)
+@bot.command()
+async def perf(ctx: commands.Context):
+    """Hottest commands (by total time) and background task timings"""
+    embed = discord.Embed(title="⏱️ Performance", color=0x3498db)
+    hottest = metrics.top("command_seconds", "command", 10)
+    embed.add_field(name="Commands", value=format_latency_rows(hottest) if hottest else "No commands run yet.", inline=False)
+    task_rows = metrics.top("task_seconds", "task") + [
+        (label, hist) for label, hist in (("save", metrics.get("save_seconds", backend=storage.name)),
+                                          ("payout", metrics.get("payout_seconds")),
+                                          ("loop lag", metrics.get("loop_lag_seconds"))) if hist
+    ]
+    if task_rows:
+        embed.add_field(name="Tasks", value=format_latency_rows(task_rows), inline=False)
+    errors = sum(sum(series.values()) for series in metrics.counters.values())
+    embed.set_footer(text=f"{errors:,} errors recorded · current loop lag {loop_lag.last * 1000:.0f}ms")
+    await ctx.send(embed=embed)
+
+@commands.has_permissions(administrator=True)
+@bot.command()
+async def stalls(ctx: commands.Context):
+    """Worst event loop stalls seen by the watchdog, with the latest stack"""
+    offenders = watchdog.worst(10)
+    if not offenders:
+        return await ctx.send(f"✅ No event loop stalls over {WATCHDOG_THRESHOLD_SECONDS * 1000:.0f}ms recorded.")
+    now = time.time()
+    rows = [f"{'location':<36}{'count':>6}{'worst':>8}{'total':>8}  last"]
+    for o in offenders:
+        rows.append(f"{o.location[:36]:<36}{o.count:>6}{o.worst * 1000:>6.0f}ms{o.total:>7.1f}s"
+                    f"  {(now - o.last_seen) / 60:.0f}m ago")
+    embed = discord.Embed(title="🐢 Event loop stalls", description="```\n" + "\n".join(rows) + "\n```", color=0xe67e22)
+    latest = watchdog.latest()
+    stack = "\n".join(latest.stack[-8:])
+    embed.add_field(
+        name=f"Latest: {latest.seconds * 1000:.0f}ms" + (f" in task {latest.task}" if latest.task else ""),
+        value=f"```\n{stack[-1000:]}\n```",
+        inline=False,
+    )
+    await ctx.send(embed=embed)
+
 @commands.has_permissions(administrator=True)
 @bot.command()
 async def say(ctx: commands.Context, *, message: str):
@@ -1215,6 +1669,7 @@ async def addgamenight(ctx: commands.Context, link: str):
     if not re.match(r"^https:\/\/www\.roblox\.com\/games\/\d+\/.+", link):
         return await ctx.send("❌ Invalid Roblox link.")
     data["gamenights"].append(link)
+    mark_dirty("gamenights")
     await ctx.send(f"✅ Added gamenight: {link}")
 
 @commands.has_permissions(administrator=True)
@@ -1222,6 +1677,7 @@ async def addgamenight(ctx: commands.Context, link: str):
 async def gamenightremove(ctx: commands.Context, link: str):
     if link in data["gamenights"]:
         data["gamenights"].remove(link)
+        mark_dirty("gamenights")
         await ctx.send(f"❌ Removed gamenight: {link}")
     else:
         await ctx.send("Link not found.")
@@ -1239,10 +1695,10 @@ async def gamenight(ctx: commands.Context):
 # Guess The Player
 # -----------------------------
 async def start_guess(ctx: commands.Context, difficulty: str):
-    db = data["guess_db"]
-    if difficulty not in db or not db[difficulty]:
+    clues = guess_db.get(difficulty)
+    if not clues:
         return await ctx.send("No clues for that difficulty.")
-    q, a = random.choice(db[difficulty])
+    q, a = random.choice(clues)
     active_guess_games[str(ctx.author.id)] = {"difficulty": difficulty, "answer": a}
     await ctx.send(f"⚽ **Guess the player!** {q}")
 
@@ -1265,26 +1721,56 @@ async def guesstheplayerextreme(ctx: commands.Context):
 # -----------------------------
 # Giveaway
 # -----------------------------
+async def on_giveaway_end(gid: str, giveaway: dict, winners: List[int]):
+    channel = bot.get_channel(giveaway["channel_id"])
+    if channel is None:
+        print(f"[Giveaway] {gid} ended but its channel is gone; winners: {winners}")
+        return
+    mentions = ", ".join(f"<@{uid}>" for uid in winners)
+    embed = discord.Embed(
+        title="🎉 Giveaway ended",
+        description=f"Prize: **{giveaway['prize']}**\nWinners: {mentions or 'nobody entered'}",
+        color=0x95a5a6
+    )
+    embed.set_footer(text=f"{giveaway['entrant_count']:,} entrants")
+    try:
+        await channel.get_partial_message(int(gid)).edit(embed=embed, view=None)
+    except discord.HTTPException:
+        pass
+    if not winners:
+        await channel.send("❌ Nobody entered the giveaway.")
+    else:
+        await channel.send(f"🎊 Congratulations {mentions}, you won **{giveaway['prize']}**!")
+
+giveaway_manager = GiveawayManager(data["giveaways"], data["giveaway_entrants"], scheduler, on_giveaway_end,
+                                   mark_dirty, ready=data_ready.is_set)
+
+async def start_giveaway(ctx: commands.Context, time: int, winners: int, prize: str):
+    if time <= 0 or not 1 <= winners <= 20:
+        return await ctx.send("❌ Use a positive duration and between 1 and 20 winners.")
+    embed = discord.Embed(title="🎉 Giveaway! 🎉", description=f"Prize: **{prize}**\nPress 🎉 Enter to join!", color=0xf1c40f)
+    if winners > 1:
+        embed.add_field(name="Winners", value=str(winners))
+    embed.set_footer(text=f"Ends in {time} seconds")
+    msg = await ctx.send(embed=embed, view=giveaway_manager.layout)
+    giveaway_manager.create(msg.id, ctx.channel.id, ctx.author.id, prize, winners, time)
+
 @commands.has_permissions(administrator=True)
 @bot.command()
 async def giveawaycreate(ctx: commands.Context, time: int, *, prize: str):
-    embed = discord.Embed(title="🎉 Giveaway! 🎉", description=f"Prize: **{prize}**\nReact with 🎉 to enter!", color=0xf1c40f)
-    embed.set_footer(text=f"Ends in {time} seconds")
-    msg = await ctx.send(embed=embed)
-    await msg.add_reaction("🎉")
-    await asyncio.sleep(time)
-    msg = await ctx.channel.fetch_message(msg.id)
-    entries = []
-    for reaction in msg.reactions:
-        if str(reaction.emoji) == "🎉":
-            async for u in reaction.users():
-                if not u.bot:
-                    entries.append(u)
-            break
-    if not entries:
-        return await ctx.send("❌ Nobody entered the giveaway.")
-    winner = random.choice(entries)
-    await ctx.send(f"🎊 Congratulations {winner.mention}, you won **{prize}**!")
+    # One winner; prizes are often amounts ("5000 Tadbucks"), so no optional count here
+    await start_giveaway(ctx, time, 1, prize)
+
+@commands.has_permissions(administrator=True)
+@bot.command()
+async def giveawaymulti(ctx: commands.Context, time: int, winners: int, *, prize: str):
+    await start_giveaway(ctx, time, winners, prize)
+
+@commands.has_permissions(administrator=True)
+@bot.command()
+async def giveawayend(ctx: commands.Context, message_id: str):
+    if await giveaway_manager.end(message_id) is None:
+        await ctx.send("❌ No running giveaway with that message id.")
 
 # -----------------------------
 # Economy Commands
@@ -1295,6 +1781,28 @@ async def checkbalance(ctx: commands.Context):
     bal = get_balance(ctx.author.id)
     await ctx.send(f"💰 {ctx.author.mention}, your balance is **${bal:,}** Tadbucks")
 
+@bot.command()
+async def history(ctx: commands.Context):
+    """Last 20 balance changes, newest first"""
+    pending = ledger.pending_events(ctx.author.id)[::-1]
+    try:
+        committed = await asyncio.to_thread(ledger.history, ctx.author.id, 20)
+    except Exception as e:
+        print("[Ledger] History query failed:", e)
+        committed = []
+    # A flush may have committed some of the pending events while we queried
+    seen = set(pending)
+    events = (pending + [e for e in committed if e not in seen])[:20]
+    if not events:
+        return await ctx.send(f"📒 {ctx.author.mention}, no transactions recorded yet.")
+    lines = []
+    for ts, _uid, kind, delta, balance, ref in events:
+        sign = "+" if delta > 0 else "-"
+        detail = f" ({ref})" if ref and kind in ("buy", "sell", "auction") else ""
+        lines.append(f"<t:{int(ts)}:R> **{kind}**{detail} {sign}${abs(delta):,} → ${balance:,}")
+    embed = discord.Embed(title=f"📒 {ctx.author.display_name}'s Transactions", description="\n".join(lines), color=0xf1c40f)
+    await ctx.send(embed=embed)
+
 @bot.command(name="Tadbucks")
 async def tadbucks_help(ctx: commands.Context):
     embed = discord.Embed(title="💵 Tadbucks Economy Guide", color=0xf1c40f)
@@ -1317,91 +1825,116 @@ async def tadbucks_help(ctx: commands.Context):
     await ctx.send(embed=embed)
 
 @bot.command()
+@cooldowns.limit("gamble", start=False)
 async def gamble(ctx: commands.Context, amount: int):
-    uid = str(ctx.author.id)
     ensure_user_exists(ctx.author.id)
     if amount <= 0:
         return await ctx.send("Bet amount must be positive.")
     balance = get_balance(ctx.author.id)
     if amount > balance:
         return await ctx.send("You don't have enough Tadbucks.")
-    last = gamble_cooldowns.get(uid)
-    now = datetime.utcnow()
-    if last:
-        last_dt = datetime.fromisoformat(last)
-        if now - last_dt < timedelta(hours=24):
-            remaining = timedelta(hours=24) - (now - last_dt)
-            return await ctx.send(f"⏰ You can gamble again in {str(remaining).split('.')[0]}.")
-    gamble_cooldowns[uid] = now.isoformat()
+    # Started only once the bet is valid; the check above already turned away most repeats
+    left = cooldowns.acquire("gamble", ctx.author.id)
+    if left:
+        return await ctx.send(f"⏰ You can gamble again in {timedelta(seconds=left)}.")
     if random.random() < 0.3:
-        set_balance(ctx.author.id, balance + amount)
-        await ctx.send(f"🎉 You won! You gained ${amount:,}. New balance: ${get_balance(ctx.author.id):,}")
+        won, new_balance = True, economy.credit(ctx.author.id, amount, "gamble")
     else:
-        set_balance(ctx.author.id, balance - amount)
-        await ctx.send(f"💸 You lost ${amount:,}. New balance: ${get_balance(ctx.author.id):,}")
+        won, new_balance = False, economy.debit(ctx.author.id, amount, "gamble")
+    if new_balance is None:
+        return await ctx.send("You don't have enough Tadbucks.")
+    if won:
+        await ctx.send(f"🎉 You won! You gained ${amount:,}. New balance: ${new_balance:,}")
+    else:
+        await ctx.send(f"💸 You lost ${amount:,}. New balance: ${new_balance:,}")
 
 @bot.command()
 async def fairgamble(ctx: commands.Context, amount: int):
-    uid = str(ctx.author.id)
     ensure_user_exists(ctx.author.id)
     if amount <= 0:
         return await ctx.send("Bet amount must be positive.")
     balance = get_balance(ctx.author.id)
     if amount > balance:
         return await ctx.send("You don't have enough Tadbucks.")
-    level = int(data["xp_levels"].get(uid, 0))
+    level = current_xp(ctx.author.id)
     if level < 50:
         return await ctx.send(f"You need to be at least level 50 for fair gamble. You're level {level//LEVEL_UP_XP_THRESHOLD}.")
     if random.random() < 0.5:
-        set_balance(ctx.author.id, balance + amount)
-        await ctx.send(f"🎉 50/50! You won ${amount:,}. New balance: ${get_balance(ctx.author.id):,}")
+        won, new_balance = True, economy.credit(ctx.author.id, amount, "fairgamble")
     else:
-        set_balance(ctx.author.id, balance - amount)
-        await ctx.send(f"💸 50/50! You lost ${amount:,}. New balance: ${get_balance(ctx.author.id):,}")
+        won, new_balance = False, economy.debit(ctx.author.id, amount, "fairgamble")
+    if new_balance is None:
+        return await ctx.send("You don't have enough Tadbucks.")
+    if won:
+        await ctx.send(f"🎉 50/50! You won ${amount:,}. New balance: ${new_balance:,}")
+    else:
+        await ctx.send(f"💸 50/50! You lost ${amount:,}. New balance: ${new_balance:,}")
+
+# -----------------------------
+# Auctions (settled automatically by the scheduler)
+# -----------------------------
+async def settle_auction(name: str) -> str:
+    """Close an auction and hand the card to the highest bidder. Returns the outcome text."""
+    auction = auction_engine.get_active(name)
+    if auction is None:
+        return f"No active auction for {name}."
+    auction_engine.close(name)
+    if auction.get("highest_bidder") is None:
+        return f"No bids placed for {name}. Auction closed."
+    winner_id = int(auction["highest_bidder"])
+    amount = int(auction["highest_bid"])
+    ensure_user_exists(winner_id)
+    card = find_player_card_by_name(name)
+    if get_balance(winner_id) < amount:
+        return "Winner doesn't have enough balance anymore. Auction cancelled."
+    if not card or economy.buy_card(winner_id, OwnedCard(card), amount, "auction") is None:
+        return "Winner has full collection, cannot add player."
+    return f"🎉 <@{winner_id}> won the auction for {name} with ${amount:,}!"
+
+async def on_auction_expired(name: str):
+    auction = auction_engine.get_active(name)
+    if auction is None:
+        return
+    channel = bot.get_channel(auction["channel_id"]) if auction.get("channel_id") else None
+    result = await settle_auction(name)
+    print(f"[Auction] {name} expired: {result}")
+    if channel:
+        await channel.send(f"⏰ The auction for **{name}** has ended. {result}")
+
+auction_engine = AuctionEngine(data["auctions"], scheduler, on_auction_expired,
+                               lambda name: mark_dirty("auctions", name))
 
 @bot.command()
 async def spawnauction(ctx: commands.Context, *, player_name: str):
     ensure_user_exists(ctx.author.id)
     card = find_player_card_by_name(player_name)
     if not card:
-        return await ctx.send("Player does not exist.")
+        return await ctx.send("Player does not exist." + suggestion_hint(player_name))
     name = card["name"]
-    if name in data["auctions"] and data["auctions"][name].get("active", False):
+    if auction_engine.get_active(name):
         return await ctx.send("Auction already active for this player.")
-    ends_at = (datetime.utcnow() + timedelta(hours=AUCTION_DEFAULT_DURATION_HOURS)).isoformat()
-    data["auctions"][name] = {
-        "highest_bid": 0,
-        "highest_bidder": None,
-        "active": True,
-        "created_by": str(ctx.author.id),
-        "ends_at": ends_at
-    }
-    await ctx.send(f"🏆 Auction started for **{name}**! Place bids with `!bid {name} <amount>`.")
+    auction = auction_engine.open(name, str(ctx.author.id), ctx.channel.id, AUCTION_DEFAULT_DURATION_HOURS * 3600)
+    await ctx.send(f"🏆 Auction started for **{name}**! Place bids with `!bid {name} <amount>`. Ends <t:{int(auction['ends_at'])}:R>.")
 
 @bot.command()
 async def bid(ctx: commands.Context, player_name: str, amount: int):
     ensure_user_exists(ctx.author.id)
     card = find_player_card_by_name(player_name)
     if not card:
-        return await ctx.send("Player not found.")
+        return await ctx.send("Player not found." + suggestion_hint(player_name))
     name = card["name"]
-    auction = data["auctions"].get(name)
-    if not auction or not auction.get("active", False):
+    auction = auction_engine.get_active(name)
+    if not auction:
         return await ctx.send("No active auction for this player.")
-    ends_at = datetime.fromisoformat(auction["ends_at"])
-    if datetime.utcnow() > ends_at:
-        auction["active"] = False
-        return await ctx.send("This auction has already ended.")
+    if auction_engine.is_expired(auction):
+        # The scheduler is about to settle it; do it now so the result is consistent
+        return await ctx.send(f"This auction has already ended. {await settle_auction(name)}")
     current = int(auction.get("highest_bid", 0))
     if amount <= current:
         return await ctx.send("Bid must be higher than current highest.")
-    balance = get_balance(ctx.author.id)
-    if amount > balance:
+    if amount > get_balance(ctx.author.id):
         return await ctx.send("You don't have enough Tadbucks.")
-    auction["highest_bid"] = int(amount)
-    auction["highest_bidder"] = str(ctx.author.id)
-    new_end = max(ends_at, datetime.utcnow() + timedelta(minutes=5))
-    auction["ends_at"] = new_end.isoformat()
+    auction_engine.place_bid(name, str(ctx.author.id), amount)
     await ctx.send(f"🔥 {ctx.author.mention} is now the highest bidder for {name} with ${amount:,}!")
 
 @commands.has_permissions(administrator=True)
@@ -1409,69 +1942,18 @@ async def bid(ctx: commands.Context, player_name: str, amount: int):
 async def closeauction(ctx: commands.Context, *, player_name: str):
     card = find_player_card_by_name(player_name)
     if not card:
-        return await ctx.send("Player not found.")
+        return await ctx.send("Player not found." + suggestion_hint(player_name))
     name = card["name"]
-    auction = data["auctions"].get(name)
-    if not auction or not auction.get("active", False):
+    if not auction_engine.get_active(name):
         return await ctx.send("No active auction for this player.")
-    if auction.get("highest_bidder") is None:
-        auction["active"] = False
-        return await ctx.send(f"No bids placed for {name}. Auction closed.")
-    winner_id = int(auction["highest_bidder"])
-    amount = int(auction["highest_bid"])
-    ensure_user_exists(winner_id)
-    if get_balance(winner_id) < amount:
-        auction["active"] = False
-        return await ctx.send("Winner doesn't have enough balance anymore. Auction cancelled.")
-    set_balance(winner_id, get_balance(winner_id) - amount)
-    user_coll = data["user_collections"].setdefault(str(winner_id), [])
-    if len(user_coll) >= MAX_COLLECTION_SLOTS:
-        auction["active"] = False
-        return await ctx.send("Winner has full collection, cannot add player.")
-    user_coll.append(card)
-    auction["active"] = False
-    await ctx.send(f"🎉 <@{winner_id}> won the auction for {name} with ${amount:,}!")
+    await ctx.send(await settle_auction(name))
 
 # -----------------------------
 # Collection & Allplayers with paging
 # -----------------------------
 async def paged_embed_navigation(ctx, pages: List[discord.Embed], timeout: int = 60):
-    if not pages:
-        return
-    cur = 0
-    message = await ctx.send(embed=pages[cur])
-    if len(pages) == 1:
-        return
-    await message.add_reaction("◀️")
-    await message.add_reaction("⏹️")
-    await message.add_reaction("▶️")
-
-    def check(reaction, user):
-        return user == ctx.author and reaction.message.id == message.id and str(reaction.emoji) in ["◀️", "▶️", "⏹️"]
-
-    while True:
-        try:
-            reaction, user = await bot.wait_for("reaction_add", timeout=timeout, check=check)
-            emoji = str(reaction.emoji)
-            try:
-                await message.remove_reaction(reaction, user)
-            except Exception:
-                pass
-            if emoji == "◀️":
-                cur = (cur - 1) % len(pages)
-                await message.edit(embed=pages[cur])
-            elif emoji == "▶️":
-                cur = (cur + 1) % len(pages)
-                await message.edit(embed=pages[cur])
-            elif emoji == "⏹️":
-                await message.clear_reactions()
-                break
-        except asyncio.TimeoutError:
-            try:
-                await message.clear_reactions()
-            except Exception:
-                pass
-            break
+    # Buttons handled by the shared paginator view; returns once the first page is sent
+    await paginator.send(ctx, pages, timeout)
 
 @bot.command()
 async def collection(ctx: commands.Context):
@@ -1501,8 +1983,14 @@ async def collection(ctx: commands.Context):
 
 @bot.command()
 async def allplayers(ctx: commands.Context):
+    await paged_embed_navigation(ctx, allplayers_pages())
+
+def allplayers_pages(per_page: int = CATALOG_PAGE_SIZE) -> List[discord.Embed]:
+    """Catalog order; cached like shop_pages."""
+    return catalog.memo(("allplayers", None, per_page), lambda: build_allplayers_pages(per_page))
+
+def build_allplayers_pages(per_page: int) -> List[discord.Embed]:
     pages = []
-    per_page = 8
     for i in range(0, len(footballers), per_page):
         embed = discord.Embed(title="⚽ All Footballers", color=0x5865F2)
         for card in footballers[i:i+per_page]:
@@ -1514,45 +2002,62 @@ async def allplayers(ctx: commands.Context):
             )
         embed.set_footer(text=f"Page {i//per_page + 1}/{(len(footballers)-1)//per_page + 1} | Use !buy <player> to purchase")
         pages.append(embed)
-    await paged_embed_navigation(ctx, pages)
+    return pages
 
 # -----------------------------
 # Leaderboards
 # -----------------------------
+async def resolve_names(user_ids: List[int]) -> Dict[int, str]:
+    """Names from the client cache, then the TTL cache; misses are fetched concurrently."""
+    names = {}
+    misses = []
+    for user_id in user_ids:
+        user = bot.get_user(user_id)
+        name = user.name if user else name_cache.get(user_id)
+        if name:
+            names[user_id] = name
+        else:
+            misses.append(user_id)
+    if misses:
+        results = await asyncio.gather(*(bot.fetch_user(u) for u in misses), return_exceptions=True)
+        for user_id, user in zip(misses, results):
+            if isinstance(user, Exception):
+                continue
+            names[user_id] = user.name
+            name_cache.put(user_id, user.name)
+    return names
+
+async def leaderboard_embed(index: RankIndex, title: str, description: str, color: int, fmt) -> discord.Embed:
+    items = index.top(10)
+    names = await resolve_names([int(uid) for uid, _ in items])
+    embed = discord.Embed(title=title, description=description, color=color)
+    for i, (uid, value) in enumerate(items, 1):
+        medal = "🥇" if i == 1 else "🥈" if i == 2 else "🥉" if i == 3 else f"{i}."
+        embed.add_field(name=f"{medal} {names.get(int(uid), uid)}", value=fmt(value), inline=False)
+    return embed
+
 @bot.command()
 async def leaderboard(ctx: commands.Context):
-    items = sorted(data["tadbucks_balances"].items(), key=lambda x: int(x[1]), reverse=True)[:10]
-    embed = discord.Embed(title="💰 Tadbucks Leaderboard", description="Top 10 richest players", color=0xf1c40f)
-    for i, (uid, bal) in enumerate(items, 1):
-        try:
-            user = await bot.fetch_user(int(uid))
-            medal = "🥇" if i == 1 else "🥈" if i == 2 else "🥉" if i == 3 else f"{i}."
-            embed.add_field(
-                name=f"{medal} {user.name if user else uid}",
-                value=f"${int(bal):,} Tadbucks",
-                inline=False
-            )
-        except Exception:
-            embed.add_field(name=f"{i}. {str(uid)}", value=f"${int(bal):,} Tadbucks", inline=False)
+    embed = await leaderboard_embed(balance_rank, "💰 Tadbucks Leaderboard", "Top 10 richest players", 0xf1c40f,
+                                    lambda bal: f"${int(bal):,} Tadbucks")
     await ctx.send(embed=embed)
 
 @bot.command()
 async def points_leaderboard(ctx: commands.Context):
-    items = sorted(data["tadzzy_points"].items(), key=lambda x: int(x[1]), reverse=True)[:10]
-    embed = discord.Embed(title="🏆 Tadzzy Points Leaderboard", description="Top 10 point holders", color=0x00ff00)
-    for i, (uid, pts) in enumerate(items, 1):
-        try:
-            user = await bot.fetch_user(int(uid))
-            medal = "🥇" if i == 1 else "🥈" if i == 2 else "🥉" if i == 3 else f"{i}."
-            embed.add_field(
-                name=f"{medal} {user.name if user else uid}",
-                value=f"{int(pts)} points",
-                inline=False
-            )
-        except Exception:
-            embed.add_field(name=f"{i}. {str(uid)}", value=f"{int(pts)} points", inline=False)
+    embed = await leaderboard_embed(points_rank, "🏆 Tadzzy Points Leaderboard", "Top 10 point holders", 0x00ff00,
+                                    lambda pts: f"{int(pts)} points")
     await ctx.send(embed=embed)
 
+@bot.command()
+async def rank(ctx: commands.Context, member: Optional[discord.Member] = None):
+    member = member or ctx.author
+    ensure_user_exists(member.id)
+    uid = str(member.id)
+    await ctx.send(
+        f"📊 {member.display_name} is **#{balance_rank.rank(uid):,}** of {len(balance_rank):,} in Tadbucks "
+        f"and **#{points_rank.rank(uid):,}** of {len(points_rank):,} in Tadzzy Points."
+    )
+
 @bot.command()
 async def collection_status(ctx: commands.Context, member: Optional[discord.Member] = None):
     member = member or ctx.author
@@ -1582,11 +2087,10 @@ async def income(ctx, arg: str = None):
 
 @bot.command()
 async def messagesleft(ctx):
-    user_id = str(ctx.author.id)
     ensure_user_exists(ctx.author.id)
-    current_xp = data["xp_levels"].get(user_id, 0)
-    current_level = current_xp // LEVEL_UP_XP_THRESHOLD
-    xp_in_current_level = current_xp % LEVEL_UP_XP_THRESHOLD
+    xp = current_xp(ctx.author.id)
+    current_level = xp // LEVEL_UP_XP_THRESHOLD
+    xp_in_current_level = xp % LEVEL_UP_XP_THRESHOLD
     xp_remaining = LEVEL_UP_XP_THRESHOLD - xp_in_current_level
     await ctx.send(f"📊 {ctx.author.mention}, you need **{xp_remaining} XP** more to reach level {current_level + 1}! (Currently level {current_level})")
 
@@ -1595,13 +2099,15 @@ async def messagesleft(ctx):
 # -----------------------------
 @bot.event
 async def on_command_error(ctx: commands.Context, error):
+    if isinstance(error, OnCooldown):
+        return await ctx.send(f"⏰ You can use !{ctx.command} again in {timedelta(seconds=error.retry_after)}.")
     if isinstance(error, commands.MissingPermissions):
         return await ctx.send("❌ You don't have the required permissions to run this command.")
     if isinstance(error, commands.MissingRequiredArgument):
         return await ctx.send("❌ Missing required argument. Check the command usage.")
     if isinstance(error, commands.BadArgument):
         return await ctx.send("❌ Bad argument. Please check your inputs.")
-    print("Unhandled command error:", error)
+    print(f"Unhandled command error in !{ctx.command}:", error)
     await ctx.send(f"❌ An error occurred: {error}")
 
 # -----------------------------
@@ -1610,8 +2116,13 @@ async def on_command_error(ctx: commands.Context, error):
 async def close_and_save():
     print("Saving data before shutdown...")
     save_data()
+    storage.close()
+    ledger.flush_sync()
+    ledger.close()
     print("Saved.")
 
+startup_profile.mark("commands + setup")
+
 # -----------------------------
 # Run bot
 # -----------------------------
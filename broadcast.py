@@ -0,0 +1,208 @@
+"""
+Background broadcast pipeline for TadzzyBot
+- A bounded pool of workers DMs members from a shared queue
+- A token bucket keeps the send rate under Discord's global limit; a 429 with
+  retry_after pauses every worker and the member is retried
+- Progress is checkpointed to disk so a restart resumes where it stopped
+- The pipeline only needs a `send(user_id, text)` coroutine, so it can be driven
+  by a fake client (benchmarks/bench_broadcast.py)
+"""
+
+import asyncio
+import json
+import os
+import time
+from collections import deque
+from typing import Awaitable, Callable, List, Optional
+
+from persistence import write_json_atomic
+
+
+class RateLimiter:
+    """Token bucket with a shared pause for server-side rate limits."""
+
+    def __init__(self, rate_per_second: float, burst: int = 1):
+        self.rate = rate_per_second
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+        self.waited_seconds = 0.0
+
+    def pause(self, seconds: float):
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    delay = self._paused_until - now
+                else:
+                    self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                    self._updated = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    delay = (1 - self._tokens) / self.rate
+                self.waited_seconds += delay
+                await asyncio.sleep(delay)
+
+
+def retry_after_of(error: Exception) -> Optional[float]:
+    """Seconds to back off if error is a rate limit (discord.HTTPException 429 or similar)."""
+    retry_after = getattr(error, "retry_after", None)
+    if retry_after is not None:
+        return float(retry_after)
+    if getattr(error, "status", None) == 429:
+        return 1.0
+    return None
+
+
+class BroadcastJob:
+    def __init__(self, job_id: str, guild_id: int, channel_id: int, text: str, member_ids: List[int]):
+        self.job_id = job_id
+        self.guild_id = guild_id
+        self.channel_id = channel_id
+        self.text = text
+        self.remaining: List[int] = list(member_ids)
+        self.total = len(member_ids)
+        self.sent = 0
+        self.failed = 0
+        self.started_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.cancelled = False
+
+    @property
+    def done(self) -> int:
+        return self.sent + self.failed
+
+    @property
+    def finished(self) -> bool:
+        return self.finished_at is not None
+
+    def summary(self) -> str:
+        elapsed = (self.finished_at or time.time()) - self.started_at
+        return (
+            f"{self.done:,}/{self.total:,} processed — {self.sent:,} sent, {self.failed:,} failed "
+            f"({elapsed:.0f}s)"
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.job_id, "guild_id": self.guild_id, "channel_id": self.channel_id,
+            "text": self.text, "remaining": self.remaining, "total": self.total,
+            "sent": self.sent, "failed": self.failed, "started_at": self.started_at,
+            "finished_at": self.finished_at, "cancelled": self.cancelled,
+        }
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "BroadcastJob":
+        job = cls(d["job_id"], d["guild_id"], d["channel_id"], d["text"], d["remaining"])
+        job.total = d["total"]
+        job.sent = d["sent"]
+        job.failed = d["failed"]
+        job.started_at = d["started_at"]
+        job.finished_at = d.get("finished_at")
+        job.cancelled = d.get("cancelled", False)
+        return job
+
+
+class BroadcastRunner:
+    def __init__(self, send: Callable[[int, str], Awaitable], state_path: Optional[str] = None,
+                 workers: int = 8, rate_per_second: float = 20.0,
+                 checkpoint_seconds: float = 5.0, progress_seconds: float = 15.0,
+                 max_attempts: int = 3):
+        self.send = send
+        self.state_path = state_path
+        self.workers = workers
+        self.limiter = RateLimiter(rate_per_second, burst=workers)
+        self.checkpoint_seconds = checkpoint_seconds
+        self.progress_seconds = progress_seconds
+        self.max_attempts = max_attempts
+        self.job: Optional[BroadcastJob] = None
+        self._in_flight: set = set()
+        self._pending: deque = deque()  # (user_id, attempt)
+
+    @property
+    def running(self) -> bool:
+        return self.job is not None and not self.job.finished
+
+    def load_pending(self) -> Optional[BroadcastJob]:
+        """Unfinished job from a previous run, if any."""
+        if not self.state_path or not os.path.exists(self.state_path):
+            return None
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                job = BroadcastJob.from_dict(json.load(f))
+        except Exception as e:
+            print("[Broadcast] Could not read saved state:", e)
+            return None
+        return None if job.finished else job
+
+    def _snapshot(self) -> dict:
+        state = self.job.to_dict()
+        # In-flight members may be sent twice after a crash; better than skipping them
+        state["remaining"] = list(self._in_flight) + [uid for uid, _ in self._pending]
+        return state
+
+    async def checkpoint(self):
+        if not self.state_path or self.job is None:
+            return
+        try:
+            await asyncio.to_thread(write_json_atomic, self.state_path, self._snapshot(), None)
+        except Exception as e:
+            print("[Broadcast] Checkpoint failed:", e)
+
+    def cancel(self):
+        if self.job is not None:
+            self.job.cancelled = True
+
+    async def _worker(self):
+        pending = self._pending
+        job = self.job
+        while pending and not job.cancelled:
+            user_id, attempt = pending.popleft()
+            self._in_flight.add(user_id)
+            try:
+                await self.limiter.acquire()
+                await self.send(user_id, job.text)
+                job.sent += 1
+            except Exception as e:
+                retry_after = retry_after_of(e)
+                if retry_after is not None and attempt + 1 < self.max_attempts:
+                    self.limiter.pause(retry_after)
+                    pending.append((user_id, attempt + 1))
+                else:
+                    job.failed += 1
+            finally:
+                self._in_flight.discard(user_id)
+
+    async def run(self, job: BroadcastJob, progress: Optional[Callable[[BroadcastJob], Awaitable]] = None) -> BroadcastJob:
+        self.job = job
+        self._pending = deque((user_id, 0) for user_id in job.remaining)
+        job.remaining = []
+        workers = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        last_checkpoint = last_progress = time.monotonic()
+        try:
+            while not all(w.done() for w in workers):
+                await asyncio.wait(workers, timeout=1.0)
+                now = time.monotonic()
+                if now - last_checkpoint >= self.checkpoint_seconds:
+                    await self.checkpoint()
+                    last_checkpoint = now
+                if progress and now - last_progress >= self.progress_seconds:
+                    last_progress = now
+                    try:
+                        await progress(job)
+                    except Exception:
+                        pass
+        finally:
+            for w in workers:
+                w.cancel()
+        job.remaining = [uid for uid, _ in self._pending]
+        self._pending.clear()
+        job.finished_at = time.time()
+        await self.checkpoint()
+        return job
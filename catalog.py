@@ -0,0 +1,140 @@
+"""
+Card catalog for TadzzyBot
+Built once at startup from the footballers list:
+- normalized-name hash index (plus a punctuation/space-insensitive key, so
+  "debruyne" or "de-bruyne" find "De Bruyne")
+- per-rarity buckets and price-sorted views
+- prefix + trigram index for "did you mean" suggestions on near-misses, built
+  on the first suggestion so it doesn't cost anything at startup
+- memo() for anything derived from the cards (e.g. rendered shop pages): a
+  catalog never changes once built, so a new catalog is the only invalidation
+"""
+
+import bisect
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+
+
+def normalize_name(n: str) -> str:
+    return n.strip().lower()
+
+
+def compact_name(n: str) -> str:
+    return "".join(ch for ch in n.lower() if ch.isalnum())
+
+
+def trigrams(key: str) -> set:
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class CardCatalog:
+    def __init__(self, cards: Sequence[dict]):
+        self.cards: Tuple[dict, ...] = tuple(cards)
+        self._by_name: Dict[str, dict] = {}
+        self._by_compact: Dict[str, dict] = {}
+        self._by_rarity: Dict[str, Tuple[dict, ...]] = {}
+        self._trigram_index: Optional[Dict[str, List[int]]] = None
+        self._trigram_counts: List[int] = []
+        self._prefix_keys: List[str] = []
+        self._prefix_ids: List[int] = []
+
+        buckets: Dict[str, List[dict]] = {}
+        for card in self.cards:
+            self._by_name.setdefault(normalize_name(card["name"]), card)
+            self._by_compact.setdefault(compact_name(card["name"]), card)
+            buckets.setdefault(card["rarity"], []).append(card)
+        self._by_rarity = {r: tuple(cs) for r, cs in buckets.items()}
+        self._price_views: Dict[Optional[str], Tuple[dict, ...]] = {}
+        self._memo: Dict[Hashable, Any] = {}
+
+    def _build_suggest_index(self):
+        index: Dict[str, List[int]] = {}
+        prefixes = []
+        for i, card in enumerate(self.cards):
+            key = compact_name(card["name"])
+            prefixes.append((key, i))
+            grams = trigrams(key)
+            self._trigram_counts.append(len(grams))
+            for g in grams:
+                index.setdefault(g, []).append(i)
+        prefixes.sort()
+        self._prefix_keys = [k for k, _ in prefixes]
+        self._prefix_ids = [i for _, i in prefixes]
+        self._trigram_index = index
+
+    def __len__(self):
+        return len(self.cards)
+
+    def __iter__(self):
+        return iter(self.cards)
+
+    @property
+    def rarities(self) -> List[str]:
+        return list(self._by_rarity)
+
+    def get(self, name: str) -> Optional[dict]:
+        card = self._by_name.get(normalize_name(name))
+        if card is None:
+            card = self._by_compact.get(compact_name(name))
+        return card
+
+    def by_rarity(self, rarity: str) -> Tuple[dict, ...]:
+        return self._by_rarity.get(rarity, ())
+
+    def by_price(self, rarity: Optional[str] = None) -> Tuple[dict, ...]:
+        """Cards sorted by price, most expensive first (cached per rarity)."""
+        view = self._price_views.get(rarity)
+        if view is None:
+            source = self.cards if rarity is None else self.by_rarity(rarity)
+            view = tuple(sorted(source, key=lambda c: c["price"], reverse=True))
+            self._price_views[rarity] = view
+        return view
+
+    def memo(self, key: Hashable, build: Callable[[], Any]) -> Any:
+        """build() once per key for the life of this catalog."""
+        value = self._memo.get(key)
+        if value is None:
+            value = self._memo[key] = build()
+        return value
+
+    def _prefix_matches(self, key: str, limit: int) -> List[int]:
+        start = bisect.bisect_left(self._prefix_keys, key)
+        out = []
+        for pos in range(start, min(start + limit, len(self._prefix_keys))):
+            if not self._prefix_keys[pos].startswith(key):
+                break
+            out.append(self._prefix_ids[pos])
+        return out
+
+    def suggest(self, name: str, limit: int = 3, min_score: float = 0.35) -> List[dict]:
+        """Closest catalog cards for a name that didn't match exactly."""
+        key = compact_name(name)
+        if not key:
+            return []
+        if self._trigram_index is None:
+            self._build_suggest_index()
+        found = self._prefix_matches(key, limit)
+        if len(found) < limit:
+            grams = trigrams(key)
+            # Count hits on the selective trigrams only; trigrams shared by a large
+            # part of the catalog ("pla", "bot", ...) say little and cost a lot
+            cutoff = max(64, len(self.cards) // 20)
+            postings = [self._trigram_index.get(g, ()) for g in grams]
+            selective = [p for p in postings if len(p) <= cutoff] or postings
+            hits: Dict[int, int] = {}
+            for posting in selective:
+                for i in posting:
+                    hits[i] = hits.get(i, 0) + 1
+            candidates = sorted(hits, key=hits.get, reverse=True)[:50]
+            # Exact Dice coefficient over the full trigram sets for the shortlist
+            scored = sorted(
+                ((2 * len(grams & trigrams(compact_name(self.cards[i]["name"]))) / (len(grams) + self._trigram_counts[i]), i)
+                 for i in candidates),
+                reverse=True,
+            )
+            for score, i in scored:
+                if score < min_score or len(found) >= limit:
+                    break
+                if i not in found:
+                    found.append(i)
+        return [self.cards[i] for i in found]
@@ -0,0 +1,148 @@
+"""
+Cooldowns for TadzzyBot
+Replaces the gamble_cooldowns dict of ISO strings, which was re-parsed on every
+call, never pruned and forgotten on restart (so a restart reset the 24h gamble
+cooldown):
+- a cooldown is a rule (name + seconds); entries are keyed by (rule, user id)
+  and hold the expiry as integer epoch seconds, so checking one is a dict
+  lookup and an int compare
+- rules with persist=True are mirrored into data["cooldowns"] ("rule:user id"
+  -> expiry) and saved with everything else; short anti-spam rules (XP) stay
+  in memory only
+- expired entries are dropped by a hashed timing wheel (one slot per second),
+  advanced lazily by the calls themselves, so pruning never scans the table
+- limit(rule) is a command check that rejects while the user is on cooldown;
+  acquire() is the atomic test-and-set for the point where the action happens
+"""
+
+import math
+import time
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+
+from discord.ext import commands
+
+Key = Tuple[str, int]  # (rule, user id)
+
+
+class OnCooldown(commands.CheckFailure):
+    def __init__(self, rule: str, retry_after: int):
+        super().__init__(f"{rule} is on cooldown for {retry_after}s")
+        self.rule = rule
+        self.retry_after = retry_after
+
+
+class TimingWheel:
+    """Keys bucketed by expiry second; advance(now) returns the keys that came due."""
+
+    def __init__(self, tick: float = 1.0, slots: int = 4096):
+        self.tick = tick
+        self._slots: List[Dict[Hashable, int]] = [{} for _ in range(slots)]
+        self._cursor = math.floor(time.time() / tick)  # last tick processed
+
+    def add(self, key: Hashable, expires_at: float):
+        due = max(math.ceil(expires_at / self.tick), self._cursor + 1)
+        self._slots[due % len(self._slots)][key] = due
+
+    def advance(self, now: float) -> List[Hashable]:
+        now_tick = math.floor(now / self.tick)
+        if now_tick <= self._cursor:
+            return []
+        slots = self._slots
+        # After a long idle gap one full turn still visits every slot
+        start = max(self._cursor + 1, now_tick - len(slots) + 1)
+        due_keys = []
+        for t in range(start, now_tick + 1):
+            bucket = slots[t % len(slots)]
+            if not bucket:
+                continue
+            # Entries more than one turn away stay for a later round
+            for key in [k for k, due in bucket.items() if due <= now_tick]:
+                del bucket[key]
+                due_keys.append(key)
+        self._cursor = now_tick
+        return due_keys
+
+
+class Cooldowns:
+    def __init__(self, section: dict, mark: Callable[[str, str], None], wheel: Optional[TimingWheel] = None):
+        self.section = section  # persisted: "rule:user id" -> expiry epoch seconds
+        self.mark = mark  # (section, key)
+        self.wheel = wheel or TimingWheel()
+        self.rules: Dict[str, Tuple[int, bool]] = {}  # rule -> (seconds, persist)
+        self._expiry: Dict[Key, int] = {}
+
+    def define(self, rule: str, seconds: int, persist: bool = True):
+        self.rules[rule] = (int(seconds), persist)
+
+    def __len__(self):
+        return len(self._expiry)
+
+    def load(self, section: dict) -> int:
+        """Adopt a freshly loaded section, dropping expired or unknown entries."""
+        self.section = section
+        for key in [k for k in self._expiry if self.rules[k[0]][1]]:
+            del self._expiry[key]
+        now = int(time.time())
+        for stored, expires_at in list(section.items()):
+            rule, _, uid = stored.rpartition(":")
+            if expires_at <= now or rule not in self.rules or not uid.isdigit():
+                del section[stored]
+                self.mark("cooldowns", stored)
+                continue
+            key = (rule, int(uid))
+            self._expiry[key] = expires_at
+            self.wheel.add(key, expires_at)
+        return len(section)
+
+    def _prune(self, now: int):
+        for key in self.wheel.advance(now):
+            expires_at = self._expiry.get(key)
+            if expires_at is None or expires_at > now:
+                continue  # already gone, or re-armed since
+            del self._expiry[key]
+            if self.rules[key[0]][1]:
+                stored = f"{key[0]}:{key[1]}"
+                self.section.pop(stored, None)
+                self.mark("cooldowns", stored)
+
+    def remaining(self, rule: str, user_id: int) -> int:
+        """Seconds left on the cooldown, 0 when the user is free."""
+        now = int(time.time())
+        self._prune(now)
+        expires_at = self._expiry.get((rule, user_id))
+        return expires_at - now if expires_at is not None and expires_at > now else 0
+
+    def acquire(self, rule: str, user_id: int) -> int:
+        """Start the cooldown if it isn't running. 0 on success, else the seconds left."""
+        left = self.remaining(rule, user_id)
+        if left:
+            return left
+        seconds, persist = self.rules[rule]
+        key = (rule, user_id)
+        expires_at = int(time.time()) + seconds
+        self._expiry[key] = expires_at
+        self.wheel.add(key, expires_at)
+        if persist:
+            stored = f"{rule}:{user_id}"
+            self.section[stored] = expires_at
+            self.mark("cooldowns", stored)
+        return 0
+
+    def reset(self, rule: str, user_id: int):
+        if self._expiry.pop((rule, user_id), None) is not None and self.rules[rule][1]:
+            stored = f"{rule}:{user_id}"
+            self.section.pop(stored, None)
+            self.mark("cooldowns", stored)
+
+    def limit(self, rule: str, start: bool = True):
+        """Command check: raise OnCooldown while the author is on cooldown.
+
+        start=False only checks; the command then calls acquire() itself once
+        the action really happens (e.g. after the bet is validated).
+        """
+        def predicate(ctx: commands.Context) -> bool:
+            left = self.acquire(rule, ctx.author.id) if start else self.remaining(rule, ctx.author.id)
+            if left:
+                raise OnCooldown(rule, left)
+            return True
+        return commands.check(predicate)
@@ -0,0 +1,194 @@
+"""
+Giveaways for TadzzyBot
+A giveaway used to be a command coroutine sleeping for its whole duration, then
+walking the 🎉 reaction's users into a list; a restart lost it. Now:
+- giveaways live in data["giveaways"] (message id -> giveaway dict) and end on
+  the shared DeadlineScheduler, so they resume after a restart (one that ended
+  while the bot was down is drawn on the scheduler's first pass)
+- entering is a button click that stores one record,
+  data["giveaway_entrants"]["message id:user id"] -> join time; that dict is
+  both the duplicate check and what gets saved, and a click marks only its own
+  record dirty, so autosaves write one WAL line / row per new entrant
+- clicks that arrive while the data is (re)loading are told to retry instead
+  of being turned away as if the giveaway had ended
+- ending takes the giveaway out first (later clicks are refused), copies the
+  key list and filters/draws it in a worker thread, then drops that
+  giveaway's records in chunks so a huge giveaway doesn't stall the loop
+- winners are drawn with reservoir sampling (Algorithm L): it jumps over
+  runs of entrants instead of drawing a random number for each one, so
+  picking 5 winners from a million entrants takes a few dozen draws
+"""
+
+import asyncio
+import itertools
+import math
+import random
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+import discord
+
+from scheduler import DeadlineScheduler
+
+ENTER_CUSTOM_ID = "tadzzy:giveaway:enter"
+PURGE_CHUNK = 10_000  # entrant records dropped per loop iteration when a giveaway ends
+
+
+def _uniform(rng: random.Random) -> float:
+    u = rng.random()
+    while u == 0.0:
+        u = rng.random()
+    return u
+
+
+def reservoir_sample(items: Iterable[int], k: int, rng: random.Random = random) -> List[int]:
+    """k items chosen uniformly from an iterable of unknown length (Algorithm L)."""
+    it = iter(items)
+    reservoir = list(itertools.islice(it, k))
+    if k <= 0 or len(reservoir) < k:
+        rng.shuffle(reservoir)
+        return reservoir
+    w = math.exp(math.log(_uniform(rng)) / k)
+    while True:
+        skip = int(math.log(_uniform(rng)) / math.log1p(-w))
+        item = next(itertools.islice(it, skip, None), None)
+        if item is None:
+            break
+        reservoir[rng.randrange(k)] = item
+        w *= math.exp(math.log(_uniform(rng)) / k)
+    rng.shuffle(reservoir)  # winner order is random too
+    return reservoir
+
+
+def _draw_keys(keys: List[str], prefix: str, k: int, rng: random.Random):
+    """(winners, that giveaway's keys) from a copy of the entrant keys; runs in a worker thread."""
+    mine = [key for key in keys if key.startswith(prefix)]
+    cut = len(prefix)
+    return reservoir_sample((int(key[cut:]) for key in mine), k, rng), mine
+
+
+class GiveawayView(discord.ui.View):
+    def __init__(self, manager: Optional["GiveawayManager"]):
+        super().__init__(timeout=None)
+        self.manager = manager
+
+    @discord.ui.button(label="Enter", emoji="🎉", style=discord.ButtonStyle.success, custom_id=ENTER_CUSTOM_ID)
+    async def enter(self, interaction: discord.Interaction, button: discord.ui.Button):
+        gid = str(interaction.message.id)
+        if not self.manager.ready():
+            return await interaction.response.send_message(
+                "⏳ The bot is still loading, try again in a moment.", ephemeral=True)
+        entered = self.manager.enter(gid, interaction.user.id)
+        if entered is None:
+            text = "This giveaway has ended."
+        elif self.manager.giveaways[gid]["host"] == interaction.user.id:
+            text = "You can't enter your own giveaway."
+        elif entered:
+            text = f"🎉 You're in! Good luck. ({self.manager.count(gid):,} entrants)"
+        else:
+            text = "You have already entered this giveaway."
+        await interaction.response.send_message(text, ephemeral=True)
+
+
+class GiveawayManager:
+    def __init__(self, giveaways: dict, entrants: dict, scheduler: DeadlineScheduler,
+                 on_end: Callable[[str, dict, List[int]], object],
+                 mark: Callable[[str, str], None], rng: Optional[random.Random] = None,
+                 ready: Callable[[], bool] = lambda: True):
+        self.giveaways = giveaways
+        self.entrants = entrants  # "message id:user id" -> join epoch seconds (persisted)
+        self.scheduler = scheduler
+        self.on_end = on_end
+        self.mark = mark  # (section, key)
+        self.rng = rng or random.SystemRandom()
+        self.ready = ready  # False while the data is being (re)loaded
+        self._counts: Dict[str, int] = {}
+        self.view: Optional[GiveawayView] = None
+        self.layout: Optional[GiveawayView] = None
+
+    def start(self, client: discord.Client):
+        """Register the persistent Enter button; needs the running loop (call from setup_hook)."""
+        if self.view is not None:
+            return
+        self.view = GiveawayView(self)
+        client.add_view(self.view)
+        # Same button, already stopped: sending it doesn't store a view per message
+        self.layout = GiveawayView(None)
+        self.layout.stop()
+
+    def load(self, giveaways: dict, entrants: dict) -> int:
+        """Adopt freshly loaded sections and schedule every pending giveaway."""
+        for gid in list(self.giveaways):
+            self.scheduler.cancel(("giveaway", gid))
+        self.giveaways = giveaways
+        self.entrants = entrants
+        self._counts = dict.fromkeys(giveaways, 0)
+        for key in list(entrants):
+            gid, _, uid = key.partition(":")
+            if gid not in giveaways or not uid.isdigit():
+                # Entrants of a giveaway that ended (or the old per-giveaway lists)
+                del entrants[key]
+                self.mark("giveaway_entrants", key)
+                continue
+            self._counts[gid] += 1
+        for gid, giveaway in giveaways.items():
+            self.scheduler.schedule(("giveaway", gid), giveaway["ends_at"], self._ended)
+        return len(giveaways)
+
+    def create(self, message_id: int, channel_id: int, host_id: int, prize: str,
+               winners: int, duration_seconds: float) -> dict:
+        gid = str(message_id)
+        giveaway = {
+            "channel_id": channel_id,
+            "host": host_id,
+            "prize": prize,
+            "winners": winners,
+            "created_at": time.time(),
+            "ends_at": time.time() + duration_seconds,
+        }
+        self.giveaways[gid] = giveaway
+        self._counts[gid] = 0
+        self.mark("giveaways", gid)
+        self.scheduler.schedule(("giveaway", gid), giveaway["ends_at"], self._ended)
+        return giveaway
+
+    def enter(self, gid: str, user_id: int) -> Optional[bool]:
+        """True if entered, False if already in (or the host), None if there is no running giveaway."""
+        giveaway = self.giveaways.get(gid)
+        if giveaway is None or giveaway["ends_at"] <= time.time():
+            return None
+        key = f"{gid}:{user_id}"
+        if key in self.entrants or user_id == giveaway["host"]:
+            return False
+        self.entrants[key] = int(time.time())
+        self._counts[gid] += 1
+        self.mark("giveaway_entrants", key)
+        return True
+
+    def count(self, gid: str) -> int:
+        return self._counts.get(gid, 0)
+
+    async def _purge(self, keys: List[str]):
+        for i in range(0, len(keys), PURGE_CHUNK):
+            for key in keys[i:i + PURGE_CHUNK]:
+                if self.entrants.pop(key, None) is not None:
+                    self.mark("giveaway_entrants", key)
+            await asyncio.sleep(0)
+
+    async def end(self, gid: str) -> Optional[List[int]]:
+        """Draw winners now and remove the giveaway. None if it doesn't exist."""
+        giveaway = self.giveaways.pop(gid, None)
+        if giveaway is None:
+            return None
+        self.scheduler.cancel(("giveaway", gid))
+        self.mark("giveaways", gid)
+        entrants = self._counts.pop(gid, 0)
+        # list() of the keys is one C-level copy; the scan and draw run off the loop
+        winners, keys = await asyncio.to_thread(
+            _draw_keys, list(self.entrants), f"{gid}:", giveaway.get("winners", 1), self.rng)
+        await self._purge(keys)
+        await self.on_end(gid, dict(giveaway, entrant_count=entrants), winners)
+        return winners
+
+    async def _ended(self, key):
+        await self.end(key[1])
@@ -0,0 +1,134 @@
+"""
+Guess-the-player clues for TadzzyBot
+Clues are built per difficulty the first time that difficulty is played, not at
+import. A precompiled artifact (every clue list, tagged with a fingerprint of the
+catalog) can be generated ahead of time and is then loaded with a single read;
+it is ignored when the catalog has changed since.
+
+Usage: python guess.py compile [artifact_file]   (run from the repo root)
+"""
+
+import hashlib
+import json
+import os
+import sys
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from persistence import write_json_atomic
+
+DIFFICULTIES = ("easy", "normal", "hard", "extreme")
+
+CURATED_CLUES: Dict[str, List[Tuple[str, str]]] = {
+    "easy": [
+        ("Plays as an Argentine forward for PSG", "Messi"),
+        ("Portuguese superstar, now at Al-Nassr", "Ronaldo"),
+        ("Egyptian winger who plays for Liverpool", "Salah"),
+        ("Polish striker known for lethal finishing", "Lewandowski"),
+        ("French speedster who plays for PSG", "Mbappe"),
+        ("Brazilian flair, now an epic name", "Neymar"),
+    ],
+    "normal": [
+        ("Belgian creative mid at Manchester City", "De Bruyne"),
+        ("Korean attacker at Spurs", "Son"),
+        ("Former Barca & Bayern striker, Polish", "Lewandowski"),
+        ("Portuguese-Brazilian flair (epic)", "Neymar"),
+    ],
+    "hard": [
+        ("Italian Ballon d'Or winner in 2006, defender", "Cannavaro"),
+        ("Dutch winger, retired in 2019, trickster", "Robben"),
+        ("Mexican keeper famous at the 2014 World Cup", "Ochoa"),
+        ("Japanese midfield legend at Celtic", "Nakamura"),
+    ],
+    "extreme": [
+        ("Historic attacker nicknamed 'Tadstarman' (Secret)", "Tadstarman"),
+        ("A secret legend whose card is Jeeves", "Jeeves"),
+        ("Expensive player JustMatt — expensive rarity", "JustMatt"),
+    ],
+}
+
+# Already covered by a curated clue
+_CURATED_NAMES = {"messi", "ronaldo", "salah", "mbappe", "neymar", "lewandowski"}
+
+
+def catalog_fingerprint(cards: Sequence[dict]) -> str:
+    h = hashlib.sha1()
+    for card in cards:
+        h.update(f"{card['name']}\x00{card['rarity']}\x01".encode("utf-8"))
+    return h.hexdigest()
+
+
+def build_clues(difficulty: str, cards: Sequence[dict]) -> List[Tuple[str, str]]:
+    clues = list(CURATED_CLUES.get(difficulty, ()))
+    for p in cards:
+        name = p["name"]
+        rarity = p["rarity"]
+        if name.lower() in _CURATED_NAMES:
+            continue
+        if difficulty == "easy":
+            clues.append((f"A {rarity} player named {name[0]}...", name))
+        elif difficulty == "normal":
+            clues.append((f"Player {name} is a {rarity} card.", name))
+        elif rarity.lower() in ("mythic", "secret"):
+            if difficulty == "hard":
+                clues.append((f"Special {rarity} card: {name}", name))
+            elif difficulty == "extreme":
+                clues.append((f"Rare: {name} (collector's item)", name))
+    return clues
+
+
+class GuessDB:
+    def __init__(self, cards: Sequence[dict], artifact_path: Optional[str] = None):
+        self.cards = cards
+        self.artifact_path = artifact_path
+        self._clues: Dict[str, List[Tuple[str, str]]] = {}
+        self._artifact_checked = artifact_path is None
+        self.source = "built"
+
+    def _load_artifact(self):
+        self._artifact_checked = True
+        if not os.path.exists(self.artifact_path):
+            return
+        try:
+            with open(self.artifact_path, "r", encoding="utf-8") as f:
+                artifact = json.load(f)
+        except Exception as e:
+            print("[Guess] Could not read clue artifact:", e)
+            return
+        if artifact.get("fingerprint") != catalog_fingerprint(self.cards):
+            print("[Guess] Clue artifact is out of date, building clues on demand.")
+            return
+        for difficulty, clues in artifact.get("clues", {}).items():
+            self._clues[difficulty] = [tuple(c) for c in clues]
+        self.source = "artifact"
+
+    def get(self, difficulty: str) -> List[Tuple[str, str]]:
+        if not self._artifact_checked:
+            self._load_artifact()
+        clues = self._clues.get(difficulty)
+        if clues is None:
+            clues = self._clues[difficulty] = build_clues(difficulty, self.cards) if difficulty in DIFFICULTIES else []
+        return clues
+
+    def __contains__(self, difficulty: str) -> bool:
+        return difficulty in DIFFICULTIES
+
+
+def compile_artifact(cards: Sequence[dict], path: str) -> int:
+    artifact = {
+        "fingerprint": catalog_fingerprint(cards),
+        "card_count": len(cards),
+        "clues": {d: build_clues(d, cards) for d in DIFFICULTIES},
+    }
+    return write_json_atomic(path, artifact, None)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] != "compile":
+        print(__doc__)
+        sys.exit(1)
+    # The catalog lives in bot.py, which needs discord.py installed to import
+    os.environ.setdefault("DISCORD_TOKEN", "")
+    import bot
+    out = sys.argv[2] if len(sys.argv) > 2 else bot.GUESS_ARTIFACT_FILE
+    written = compile_artifact(bot.footballers, out)
+    print(f"Wrote {out} ({written:,} bytes, {len(bot.footballers)} cards)")
@@ -0,0 +1,65 @@
+"""
+Passive income engine for TadzzyBot
+Keeps a precomputed per-user income total that is updated whenever a card
+enters or leaves a collection, so the 30-minute payout is a single pass over
+the totals instead of a walk over every card.
+"""
+
+from typing import Dict, Iterable, List, Tuple
+
+# Bonus on top of a card's income_rate; rarities not listed get no bonus
+RARITY_INCOME_BONUS = {
+    "Secret": 1.5,     # 50% bonus
+    "Mythic": 1.3,     # 30% bonus
+    "Legendary": 1.2,  # 20% bonus
+    "Epic": 1.1,       # 10% bonus
+}
+
+_income_cache: Dict[tuple, int] = {}
+
+
+def card_income(card) -> int:
+    """Income for one card per payout, rounded per card exactly like the old loop."""
+    income = card.get("income_rate", 1)
+    rarity = card.get("rarity", "Common")
+    key = (income, rarity)
+    cached = _income_cache.get(key)
+    if cached is None:
+        bonus = RARITY_INCOME_BONUS.get(rarity)
+        cached = int(income * bonus) if bonus else income
+        _income_cache[key] = cached
+    return cached
+
+
+class IncomeEngine:
+    def __init__(self):
+        self.totals: Dict[str, int] = {}
+
+    def rebuild(self, collections: Dict[str, Iterable]):
+        self.totals = {}
+        for uid, coll in collections.items():
+            self.set_collection(uid, coll)
+
+    def set_collection(self, uid: str, coll: Iterable):
+        total = sum(card_income(c) for c in coll)
+        if total:
+            self.totals[uid] = total
+        else:
+            self.totals.pop(uid, None)
+
+    def card_added(self, uid: str, card):
+        self.totals[uid] = self.totals.get(uid, 0) + card_income(card)
+
+    def card_removed(self, uid: str, card):
+        total = self.totals.get(uid, 0) - card_income(card)
+        if total:
+            self.totals[uid] = total
+        else:
+            self.totals.pop(uid, None)
+
+    def income_for(self, uid: str) -> int:
+        return self.totals.get(uid, 0)
+
+    def payouts(self) -> List[Tuple[str, int]]:
+        # Snapshot so collection changes during the payout don't affect iteration
+        return [(uid, total) for uid, total in self.totals.items() if total > 0]
@@ -1,16 +1,80 @@
-from flask import Flask
-from threading import Thread
+"""
+Health and status server for TadzzyBot
+An aiohttp server on the bot's own event loop (no extra thread), so it sees
+the real state of the bot and can't fight it for the GIL:
+- GET /healthz   liveness: answers while the event loop is running
+- GET /readyz    readiness: 200, or 503 with the reasons (gateway down, data
+                 still loading, autosave too old, loop lag too high)
+- GET /status    JSON status for dashboards
+- GET /metrics   Prometheus text (metrics.py)
+- GET /          "Bot is alive!" for existing uptime pingers
 
-app = Flask('')
+Every handler only reads a few counters, so polling each second costs
+next to nothing. Access logging is off for the same reason.
+"""
 
-@app.route('/')
-def home():
-    return "Bot is alive!"
+import json
+from typing import Callable, List, Optional
 
-def run():
-    app.run(host='0.0.0.0', port=8080)
+from aiohttp import web
 
-def keep_alive():
-    t = Thread(target=run)
-    t.start()
-    
+StatusSource = Callable[[], dict]
+ReadinessCheck = Callable[[], List[str]]  # reasons the bot is not ready; empty when ready
+
+
+class HealthServer:
+    def __init__(self, status: StatusSource, readiness: ReadinessCheck,
+                 render_metrics: Optional[Callable[[], str]] = None,
+                 host: str = "0.0.0.0", port: int = 8080):
+        self.status = status
+        self.readiness = readiness
+        self.render_metrics = render_metrics
+        self.host = host
+        self.port = port
+        self._runner: Optional[web.AppRunner] = None
+
+        app = web.Application()
+        app.router.add_get("/", self.home)
+        app.router.add_get("/healthz", self.healthz)
+        app.router.add_get("/readyz", self.readyz)
+        app.router.add_get("/status", self.status_json)
+        app.router.add_get("/metrics", self.metrics)
+        self.app = app
+
+    async def start(self):
+        if self._runner is not None:
+            return
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        print(f"[Health] Serving /healthz, /readyz, /status and /metrics on port {self.port}")
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    # -----------------------------
+    # Handlers
+    # -----------------------------
+    async def home(self, request: web.Request) -> web.Response:
+        return web.Response(text="Bot is alive!")
+
+    async def healthz(self, request: web.Request) -> web.Response:
+        return web.Response(text="ok")
+
+    async def readyz(self, request: web.Request) -> web.Response:
+        reasons = self.readiness()
+        if reasons:
+            return web.json_response({"ready": False, "reasons": reasons}, status=503)
+        return web.json_response({"ready": True})
+
+    async def status_json(self, request: web.Request) -> web.Response:
+        status = self.status()
+        status["ready"] = not self.readiness()
+        return web.Response(text=json.dumps(status), content_type="application/json")
+
+    async def metrics(self, request: web.Request) -> web.Response:
+        if self.render_metrics is None:
+            return web.Response(text="metrics not enabled\n", status=404)
+        return web.Response(text=self.render_metrics(), content_type="text/plain")
@@ -0,0 +1,90 @@
+"""
+Leaderboard support for TadzzyBot
+- RankIndex: sorted view of a {user_id: value} section, updated on every change,
+  so top-N and "what's my rank" don't sort the whole dict per command
+- NameCache: TTL cache of display names for users not in the client cache
+"""
+
+import bisect
+import time
+from typing import Dict, List, Optional, Tuple
+
+
+class RankIndex:
+    def __init__(self):
+        self._entries: List[Tuple[int, str]] = []   # (-value, user_id), ascending
+        self._values: Dict[str, int] = {}
+        self._source: Optional[dict] = None
+        self._stale = False
+
+    def rebuild(self, mapping: dict):
+        self._source = mapping
+        self._values = {uid: int(v) for uid, v in mapping.items()}
+        self._entries = sorted((-v, uid) for uid, v in self._values.items())
+        self._stale = False
+
+    def invalidate(self):
+        """Bulk changes (payout ticks) re-sort once on the next query instead of per update."""
+        self._stale = True
+
+    def _fresh(self):
+        if self._stale and self._source is not None:
+            self.rebuild(self._source)
+
+    def update(self, uid: str, value: int):
+        if self._stale:
+            return
+        value = int(value)
+        old = self._values.get(uid)
+        if old == value:
+            return
+        if old is not None:
+            pos = bisect.bisect_left(self._entries, (-old, uid))
+            del self._entries[pos]
+        self._values[uid] = value
+        bisect.insort(self._entries, (-value, uid))
+
+    def remove(self, uid: str):
+        old = self._values.pop(uid, None)
+        if old is not None and not self._stale:
+            pos = bisect.bisect_left(self._entries, (-old, uid))
+            del self._entries[pos]
+
+    def __len__(self):
+        self._fresh()
+        return len(self._entries)
+
+    def top(self, n: int) -> List[Tuple[str, int]]:
+        self._fresh()
+        return [(uid, -neg) for neg, uid in self._entries[:n]]
+
+    def rank(self, uid: str) -> Optional[int]:
+        """1-based rank; users with the same value share a rank."""
+        self._fresh()
+        value = self._values.get(uid)
+        if value is None:
+            return None
+        return bisect.bisect_left(self._entries, (-value,)) + 1
+
+
+class NameCache:
+    def __init__(self, ttl_seconds: float = 3600, max_entries: int = 10_000):
+        self.ttl = ttl_seconds
+        self.max_entries = max_entries
+        self._names: Dict[int, Tuple[str, float]] = {}
+
+    def get(self, user_id: int) -> Optional[str]:
+        hit = self._names.get(user_id)
+        if hit is None:
+            return None
+        name, expires = hit
+        if expires < time.monotonic():
+            del self._names[user_id]
+            return None
+        return name
+
+    def put(self, user_id: int, name: str):
+        if len(self._names) >= self.max_entries:
+            # Drop the oldest insertion; dicts keep insertion order
+            self._names.pop(next(iter(self._names)))
+        self._names[user_id] = (name, time.monotonic() + self.ttl)
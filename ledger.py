@@ -0,0 +1,255 @@
+"""
+Economy ledger for TadzzyBot
+Every balance change (purchases, sales, gambling, passive income, level-up
+rewards, admin adjustments) is appended to a SQLite ledger next to the data
+file. Events are buffered in memory and written in one transaction per flush.
+- events is indexed by (uid, ts), so a user's recent history is an index range
+- totals keeps a running sum / last amount per (uid, kind), so "!income total"
+  and the last payout are single-row lookups that survive restarts
+- snapshots stores everyone's balance every `snapshot_every` events; replaying
+  the ledger starts from the latest snapshot and adds up the deltas after it,
+  so an event whose delta doesn't match the balance change shows in audits
+- balances replaced wholesale (restoring a backup) are recorded as "restore"
+  events for the difference, keeping the sums right
+
+Usage: python ledger.py audit [ledger_file] [json_file]
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+# (ts, uid, kind, delta, balance, ref)
+Event = Tuple[float, int, str, int, int, Optional[str]]
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS events (id INTEGER PRIMARY KEY, ts REAL NOT NULL, uid INTEGER NOT NULL, "
+    "kind TEXT NOT NULL, delta INTEGER NOT NULL, balance INTEGER NOT NULL, ref TEXT)",
+    "CREATE INDEX IF NOT EXISTS events_uid_ts ON events (uid, ts)",
+    "CREATE TABLE IF NOT EXISTS totals (uid INTEGER NOT NULL, kind TEXT NOT NULL, total INTEGER NOT NULL, "
+    "last_delta INTEGER NOT NULL, last_ts REAL NOT NULL, PRIMARY KEY (uid, kind)) WITHOUT ROWID",
+    "CREATE TABLE IF NOT EXISTS snapshots (upto_id INTEGER PRIMARY KEY, ts REAL NOT NULL, balances TEXT NOT NULL)",
+)
+
+
+class Ledger:
+    def __init__(self, path: str, snapshot_every: int = 100_000):
+        self.path = path
+        self.snapshot_every = snapshot_every
+        self._pending: List[Event] = []
+        self._flushing: List[Event] = []
+        self._balances: Dict[int, int] = {}  # latest balance per user, as recorded
+        self._since_snapshot = 0
+        self._lock = threading.Lock()  # one thread at a time on the connection
+        self._flush_lock = asyncio.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self.events_written = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            for statement in SCHEMA:
+                conn.execute(statement)
+            self._conn = conn
+        return self._conn
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # -----------------------------
+    # Recording (event loop thread)
+    # -----------------------------
+    def record(self, user_id: int, delta: int, balance: int, kind: str, ref: Optional[str] = None):
+        if delta == 0:
+            return
+        uid = int(user_id)
+        self._pending.append((time.time(), uid, kind, int(delta), int(balance), ref))
+        self._balances[uid] = int(balance)
+
+    def record_rebase(self, old: Dict[str, int], new: Dict[str, int], kind: str = "restore",
+                      ref: Optional[str] = None) -> int:
+        """Record the change from one whole set of balances to another. Returns events recorded."""
+        before = len(self._pending)
+        for uid in set(old) | set(new):
+            balance = int(new.get(uid, 0))
+            self.record(int(uid), balance - int(old.get(uid, 0)), balance, kind, ref)
+        return len(self._pending) - before
+
+    def pending_events(self, user_id: Optional[int] = None) -> List[Event]:
+        """Events not committed yet, oldest first."""
+        events = self._flushing + self._pending
+        if user_id is None:
+            return events
+        return [e for e in events if e[1] == user_id]
+
+    # -----------------------------
+    # Writing (worker thread)
+    # -----------------------------
+    def _write(self, events: List[Event], balances: Optional[dict]) -> int:
+        totals: Dict[Tuple[int, str], list] = {}
+        for ts, uid, kind, delta, _balance, _ref in events:
+            t = totals.get((uid, kind))
+            if t is None:
+                totals[(uid, kind)] = [delta, delta, ts]
+            else:
+                t[0] += delta
+                t[1] = delta
+                t[2] = ts
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN")
+            try:
+                conn.executemany(
+                    "INSERT INTO events (ts, uid, kind, delta, balance, ref) VALUES (?, ?, ?, ?, ?, ?)", events
+                )
+                conn.executemany(
+                    "INSERT INTO totals (uid, kind, total, last_delta, last_ts) VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT (uid, kind) DO UPDATE SET total = total + excluded.total, "
+                    "last_delta = excluded.last_delta, last_ts = excluded.last_ts",
+                    [(uid, kind, t[0], t[1], t[2]) for (uid, kind), t in totals.items()],
+                )
+                if balances is not None:
+                    upto = conn.execute("SELECT COALESCE(MAX(id), 0) FROM events").fetchone()[0]
+                    conn.execute(
+                        "INSERT OR REPLACE INTO snapshots (upto_id, ts, balances) VALUES (?, ?, ?)",
+                        (upto, time.time(), json.dumps(balances, separators=(",", ":"))),
+                    )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return len(events)
+
+    def _take_batch(self) -> Tuple[List[Event], Optional[dict]]:
+        events, self._pending = self._pending, []
+        self._flushing = events
+        balances = None
+        if self._since_snapshot + len(events) >= self.snapshot_every:
+            balances = {str(uid): bal for uid, bal in self._balances.items()}
+        return events, balances
+
+    def _finish_batch(self, ok: bool, events: List[Event], balances: Optional[dict]):
+        self._flushing = []
+        if not ok:
+            # Keep them for the next flush, ahead of anything recorded since
+            self._pending[:0] = events
+            return
+        self.events_written += len(events)
+        self._since_snapshot = 0 if balances is not None else self._since_snapshot + len(events)
+
+    def flush_sync(self) -> int:
+        events, balances = self._take_batch()
+        if not events:
+            self._flushing = []
+            return 0
+        try:
+            self._write(events, balances)
+        except Exception as e:
+            self._finish_batch(False, events, balances)
+            print("[Ledger] Flush failed:", e)
+            return 0
+        self._finish_batch(True, events, balances)
+        return len(events)
+
+    async def flush(self) -> int:
+        async with self._flush_lock:
+            events, balances = self._take_batch()
+            if not events:
+                self._flushing = []
+                return 0
+            try:
+                await asyncio.to_thread(self._write, events, balances)
+            except Exception as e:
+                self._finish_batch(False, events, balances)
+                print("[Ledger] Flush failed:", e)
+                return 0
+            self._finish_batch(True, events, balances)
+            return len(events)
+
+    # -----------------------------
+    # Queries (worker thread)
+    # -----------------------------
+    def load(self, balances: dict) -> Dict[Tuple[int, str], Tuple[int, int]]:
+        """
+        Open the ledger and return {(uid, kind): (total, last_delta)}. An empty
+        ledger starts from a snapshot of the current balances so audits of users
+        who existed before the ledger still add up.
+        """
+        with self._lock:
+            conn = self._connect()
+            has_events = conn.execute("SELECT 1 FROM events LIMIT 1").fetchone() is not None
+            has_snapshot = conn.execute("SELECT 1 FROM snapshots LIMIT 1").fetchone() is not None
+            totals = {(uid, kind): (total, last) for uid, kind, total, last in
+                      conn.execute("SELECT uid, kind, total, last_delta FROM totals")}
+            self._since_snapshot = conn.execute(
+                "SELECT COUNT(*) FROM events WHERE id > (SELECT COALESCE(MAX(upto_id), 0) FROM snapshots)"
+            ).fetchone()[0]
+        self._balances = {int(uid): int(bal) for uid, bal in balances.items()}
+        if not has_events and not has_snapshot and balances:
+            with self._lock:
+                conn = self._connect()
+                conn.execute(
+                    "INSERT INTO snapshots (upto_id, ts, balances) VALUES (0, ?, ?)",
+                    (time.time(), json.dumps({str(k): v for k, v in balances.items()}, separators=(",", ":"))),
+                )
+        return totals
+
+    def history(self, user_id: int, limit: int = 20) -> List[Event]:
+        """Newest-first committed events for one user (pending ones are added by the caller)."""
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT ts, uid, kind, delta, balance, ref FROM events WHERE uid = ? ORDER BY ts DESC, id DESC LIMIT ?",
+                (int(user_id), limit),
+            ).fetchall()
+        return [tuple(r) for r in rows]
+
+    def replay_balances(self) -> Dict[str, int]:
+        """Balances rebuilt from the latest snapshot plus the deltas of the events after it."""
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute("SELECT upto_id, balances FROM snapshots ORDER BY upto_id DESC LIMIT 1").fetchone()
+            upto, balances = (row[0], json.loads(row[1])) if row else (0, {})
+            for uid, delta in conn.execute("SELECT uid, SUM(delta) FROM events WHERE id > ? GROUP BY uid", (upto,)):
+                balances[str(uid)] = balances.get(str(uid), 0) + delta
+        return balances
+
+
+def audit(replayed: Dict[str, int], balances: Dict[str, int], pending: List[Event] = ()) -> List[Tuple[str, Optional[int], Optional[int]]]:
+    """Users whose stored balance differs from the ledger: (uid, ledger, stored)."""
+    replayed = dict(replayed)
+    for _ts, uid, _kind, delta, _balance, _ref in pending:
+        replayed[str(uid)] = replayed.get(str(uid), 0) + delta
+    mismatches = []
+    for uid in set(replayed) | set(balances):
+        expected, actual = replayed.get(uid), balances.get(uid)
+        # A user removed by a restore is at 0 in the ledger
+        if expected is not None and expected != (actual or 0):
+            mismatches.append((uid, expected, actual))
+    return sorted(mismatches)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] != "audit":
+        print(__doc__)
+        sys.exit(1)
+    ledger_path = sys.argv[2] if len(sys.argv) > 2 else "tadzzy_ledger.db"
+    json_path = sys.argv[3] if len(sys.argv) > 3 else "tadzzy_data.json"
+    if not os.path.exists(ledger_path):
+        sys.exit(f"No ledger at {ledger_path}")
+    with open(json_path, "r", encoding="utf-8") as f:
+        stored = {k: int(v) for k, v in json.load(f).get("tadbucks_balances", {}).items()}
+    start = time.perf_counter()
+    problems = audit(Ledger(ledger_path).replay_balances(), stored)
+    print(f"Audited {len(stored):,} balances in {time.perf_counter() - start:.2f}s, {len(problems):,} mismatches.")
+    for uid, expected, actual in problems[:20]:
+        print(f"  {uid}: ledger {expected}, stored {actual}")
@@ -0,0 +1,280 @@
+"""
+Streaming loader for tadzzy_data.json
+json.load reads the whole file into one string and then builds the whole tree,
+so a large data file briefly needs several times its size in memory. This
+loader reads the file in chunks and decodes one section entry (one user's
+balance, one user's collection, ...) at a time:
+- per-user sections are built entry by entry and validated as they go; bad
+  records are dropped and counted instead of failing the whole load
+- a progress callback is called every few percent of the file
+- other sections (settings, gamenights) are decoded whole, they are small
+"""
+
+import json
+import os
+import re
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, Iterator, Optional
+
+_WS = " \t\n\r"
+_NUMBER_CHARS = "0123456789.eE+-"
+_decoder = json.JSONDecoder()
+_scan_once = _decoder.scan_once
+# Fast paths for the common case; anything unusual (escapes, chunk edges) falls back
+_KEY = re.compile(r'[ \t\n\r]*"([^"\\]*)"[ \t\n\r]*:[ \t\n\r]*')
+_SEP = re.compile(r'[ \t\n\r]*([,}])')
+
+ProgressCallback = Callable[[int, int, str], None]  # (bytes read, total bytes, section)
+
+
+class _ChunkReader:
+    def __init__(self, f, chunk_size: int):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.dropped = 0  # characters discarded from the front of buf
+        self.eof = False
+
+    @property
+    def offset(self) -> int:
+        return self.dropped + self.pos
+
+    def _fill(self, grow: bool = False) -> bool:
+        if self.eof:
+            return False
+        # When a single value spans chunks, read at least as much again so
+        # re-decoding it stays linear overall
+        size = max(self.chunk_size, len(self.buf) - self.pos) if grow else self.chunk_size
+        more = self.f.read(size)
+        if not more:
+            self.eof = True
+            return False
+        if self.pos:
+            self.dropped += self.pos
+            self.buf = self.buf[self.pos:] + more
+            self.pos = 0
+        else:
+            self.buf += more
+        return True
+
+    def peek(self) -> str:
+        """Next non-whitespace character without consuming it ('' at end of file)."""
+        while True:
+            buf, p, n = self.buf, self.pos, len(self.buf)
+            while p < n and buf[p] in _WS:
+                p += 1
+            self.pos = p
+            if p < n:
+                return buf[p]
+            if not self._fill():
+                return ""
+
+    def expect(self, ch: str):
+        found = self.peek()
+        if found != ch:
+            raise ValueError(f"Expected {ch!r} at offset {self.offset:,}, found {found or 'end of file'!r}")
+        self.pos += 1
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = _scan_once(self.buf, self.pos)
+            except (StopIteration, json.JSONDecodeError):
+                if self._fill(grow=True):
+                    continue
+                raise ValueError(f"Invalid JSON value at offset {self.offset:,}") from None
+            # A number (or true/false/null) can run on into the next chunk, and
+            # "12." + "5" would otherwise decode as 12
+            tail = end
+            while tail < len(self.buf) and self.buf[tail] in _NUMBER_CHARS:
+                tail += 1
+            if tail == len(self.buf) and self._fill(grow=True):
+                continue
+            self.pos = end
+            return value
+
+    def keys(self) -> Iterator[str]:
+        """Walk an object; the caller must consume each key's value before resuming."""
+        self.expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            m = _KEY.match(self.buf, self.pos)
+            if m is not None and m.end() < len(self.buf):
+                key = m.group(1)
+                self.pos = m.end()
+            else:
+                key = self.value()
+                if not isinstance(key, str):
+                    raise ValueError(f"Expected an object key at offset {self.offset:,}")
+                self.expect(":")
+            yield key
+            m = _SEP.match(self.buf, self.pos)
+            if m is not None:
+                sep = m.group(1)
+                self.pos = m.end()
+            else:
+                sep = self.peek()
+                self.pos += 1
+            if sep == "}":
+                return
+            if sep != ",":
+                raise ValueError(f"Expected ',' or '}}' at offset {self.offset - 1:,}, found {sep or 'end of file'!r}")
+
+
+    def items(self) -> Iterator[tuple]:
+        """(key, value) pairs of an object; the per-record hot path."""
+        self.expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        key_match, sep_match, scan = _KEY.match, _SEP.match, _scan_once
+        while True:
+            # Fast path: key, value and the separator after it are all in the buffer
+            buf = self.buf
+            m = key_match(buf, self.pos)
+            sep = None
+            if m is not None:
+                try:
+                    value, end = scan(buf, m.end())
+                    sep = sep_match(buf, end)
+                except (StopIteration, json.JSONDecodeError):
+                    pass
+            if sep is not None:
+                self.pos = sep.end()
+                key, closing = m.group(1), sep.group(1)
+            else:
+                key = self.value()
+                if not isinstance(key, str):
+                    raise ValueError(f"Expected an object key at offset {self.offset:,}")
+                self.expect(":")
+                value = self.value()
+                closing = self.peek()
+                self.pos += 1
+                if closing not in (",", "}"):
+                    raise ValueError(f"Expected ',' or '}}' at offset {self.offset - 1:,}, found {closing or 'end of file'!r}")
+            yield key, value
+            if closing == "}":
+                return
+
+
+# -----------------------------
+# Record validation
+# -----------------------------
+def _int_value(v) -> int:
+    if isinstance(v, bool):
+        raise ValueError("boolean")
+    if isinstance(v, int):
+        return v
+    if isinstance(v, float) and v.is_integer():
+        return int(v)
+    if isinstance(v, str) and v.strip().lstrip("-").isdigit():
+        return int(v)
+    raise ValueError(f"not an integer: {v!r}")
+
+
+def _collection(v) -> list:
+    if not isinstance(v, list):
+        raise ValueError("collection is not a list")
+    for i, card in enumerate(v):
+        if isinstance(card, str):
+            # Card ids repeat across users; share one string per id
+            v[i] = sys.intern(card)
+            continue
+        if isinstance(card, dict) and isinstance(card.get("id", card.get("name")), str):
+            continue
+        raise ValueError(f"bad card {card!r}")
+    return v
+
+
+def _object(v) -> dict:
+    if not isinstance(v, dict):
+        raise ValueError("not an object")
+    return v
+
+
+# section -> (validate value, keys must be user ids)
+RECORD_SECTIONS = {
+    "tadbucks_balances": (_int_value, True),
+    "tadzzy_points": (_int_value, True),
+    "xp_levels": (_int_value, True),
+    "user_collections": (_collection, True),
+    "auctions": (_object, False),
+    "trades": (_object, False),
+    "giveaways": (_object, False),
+    "giveaway_entrants": (_int_value, False),  # "message id:user id" -> join time
+    "cooldowns": (_int_value, False),  # "command:user id"
+}
+
+
+@dataclass
+class LoadReport:
+    path: str
+    total_bytes: int = 0
+    seconds: float = 0.0
+    records: Dict[str, int] = field(default_factory=dict)
+    invalid: Dict[str, int] = field(default_factory=dict)
+    examples: list = field(default_factory=list)  # first few (section, key, reason)
+
+    def summary(self) -> str:
+        records = sum(self.records.values())
+        invalid = sum(self.invalid.values())
+        text = (f"Loaded {records:,} records from {self.path} ({self.total_bytes / 1e6:.1f}MB) "
+                f"in {self.seconds:.2f}s")
+        if invalid:
+            text += f", dropped {invalid:,} invalid records"
+        return text
+
+
+def stream_load(path: str, data: dict, sections: Iterable[str],
+                progress: Optional[ProgressCallback] = None, progress_step: float = 0.05,
+                chunk_size: int = 1 << 20) -> LoadReport:
+    """Fill data[section] for each wanted section found in the file."""
+    wanted = set(sections)
+    report = LoadReport(path, os.path.getsize(path))
+    step = max(1, int(report.total_bytes * progress_step))
+    next_report = step
+    start = time.perf_counter()
+    with open(path, "r", encoding="utf-8") as f:
+        r = _ChunkReader(f, chunk_size)
+        for section in r.keys():
+            if section not in wanted:
+                r.value()
+                continue
+            spec = RECORD_SECTIONS.get(section)
+            if spec is None or r.peek() != "{":
+                data[section] = r.value()
+                continue
+            validate, user_keys = spec
+            loaded = {}
+            invalid = 0
+            for key, raw in r.items():
+                try:
+                    if user_keys:
+                        if not key.isdigit():
+                            raise ValueError("key is not a user id")
+                        # The same user id keys every section; keep one copy
+                        key = sys.intern(key)
+                    loaded[key] = validate(raw)
+                except ValueError as e:
+                    invalid += 1
+                    if len(report.examples) < 5:
+                        report.examples.append((section, key, str(e)))
+                if progress is not None and r.offset >= next_report:
+                    progress(r.offset, report.total_bytes, section)
+                    next_report = r.offset + step
+            data[section] = loaded
+            report.records[section] = len(loaded)
+            if invalid:
+                report.invalid[section] = invalid
+        if r.peek() != "":
+            raise ValueError(f"Unexpected data after the top-level object at offset {r.offset:,}")
+    report.seconds = time.perf_counter() - start
+    if progress is not None:
+        progress(report.total_bytes, report.total_bytes, "done")
+    return report
@@ -0,0 +1,139 @@
+"""
+Event loop watchdog for TadzzyBot
+Finds out what is blocking the event loop when the bot "freezes":
+- a heartbeat callback on the loop updates a timestamp every `interval`
+- a daemon thread checks that timestamp; once the heartbeat is more than
+  `threshold` late, the loop thread is stuck in something, and the thread
+  grabs its stack with sys._current_frames() while it is still stuck
+- when the heartbeat comes back the stall's length is known, and it is
+  recorded against the innermost frame in our own code (e.g. bot.py:512
+  passive_income), so repeat offenders add up in one entry
+- the most recent stalls are kept in a ring buffer, offenders in a small
+  table ranked by their worst stall
+
+When idle this costs one loop callback and one thread wake-up per interval.
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Dict, List, Optional
+
+_OWN_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+@dataclass
+class Stall:
+    started: float  # wall clock
+    seconds: float
+    location: str
+    task: Optional[str]
+    stack: List[str]
+
+
+@dataclass
+class Offender:
+    location: str
+    count: int = 0
+    worst: float = 0.0
+    total: float = 0.0
+    last_seen: float = 0.0
+
+
+def _location(frames: traceback.StackSummary) -> str:
+    """Innermost frame in this repo's code, else the innermost frame."""
+    for fs in reversed(frames):
+        path = os.path.abspath(fs.filename)
+        if path.startswith(_OWN_DIR) and "site-packages" not in path:
+            return f"{os.path.basename(path)}:{fs.lineno} {fs.name}"
+    if frames:
+        fs = frames[-1]
+        return f"{os.path.basename(fs.filename)}:{fs.lineno} {fs.name}"
+    return "unknown"
+
+
+class LoopWatchdog:
+    def __init__(self, threshold: float = 0.25, interval: float = 0.1,
+                 recent: int = 50, offenders: int = 50):
+        self.threshold = threshold
+        self.interval = interval
+        self.recent: Deque[Stall] = deque(maxlen=recent)
+        self.offenders: Dict[str, Offender] = {}
+        self.max_offenders = offenders
+        self._beat = 0.0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread = 0
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def start(self):
+        """Call from the event loop thread."""
+        if self._thread is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._beat = time.monotonic()
+        self._loop.call_soon(self._heartbeat)
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _heartbeat(self):
+        self._beat = time.monotonic()
+        if not self._stop.is_set():
+            self._loop.call_later(self.interval, self._heartbeat)
+
+    # -----------------------------
+    # Watchdog thread
+    # -----------------------------
+    def _sample(self):
+        frame = sys._current_frames().get(self._loop_thread)
+        if frame is None:
+            return "unknown", [], None
+        frames = traceback.extract_stack(frame)
+        task = asyncio.current_task(self._loop)  # plain dict lookup, fine off-thread
+        name = task.get_name() if task is not None else None
+        return _location(frames), [f"{os.path.basename(fs.filename)}:{fs.lineno} {fs.name}" for fs in frames[-12:]], name
+
+    def _watch(self):
+        pending = None  # (beat seen when the stall was detected, wall-clock start, sample)
+        while not self._stop.wait(self.interval):
+            beat = self._beat
+            late = time.monotonic() - beat - self.interval
+            if pending is None:
+                if late > self.threshold:
+                    pending = (beat, time.time() - late, self._sample())
+            elif beat != pending[0]:
+                # The heartbeat ran again: the loop is free, and the stall lasted this long
+                self._record(pending[1], beat - pending[0] - self.interval, *pending[2])
+                pending = None
+
+    def _record(self, started: float, seconds: float, location: str, stack: List[str], task: Optional[str]):
+        self.recent.append(Stall(started, seconds, location, task, stack))
+        offender = self.offenders.get(location)
+        if offender is None and len(self.offenders) >= self.max_offenders:
+            # Table full: replace the mildest offender if this stall was worse
+            mildest = min(self.offenders.values(), key=lambda o: o.worst)
+            if mildest.worst < seconds:
+                del self.offenders[mildest.location]
+        if offender is None and len(self.offenders) < self.max_offenders:
+            offender = self.offenders[location] = Offender(location)
+        if offender is not None:
+            offender.count += 1
+            offender.total += seconds
+            offender.worst = max(offender.worst, seconds)
+            offender.last_seen = started
+        print(f"[Watchdog] Event loop blocked {seconds:.2f}s in {location}" + (f" (task {task})" if task else ""))
+
+    def worst(self, n: int = 10) -> List[Offender]:
+        return sorted(list(self.offenders.values()), key=lambda o: o.worst, reverse=True)[:n]
+
+    def latest(self) -> Optional[Stall]:
+        return self.recent[-1] if self.recent else None
@@ -0,0 +1,165 @@
+"""
+Runtime metrics for TadzzyBot
+Every command, background task, save and payout is timed into a fixed-bucket
+histogram, so memory stays constant however long the bot runs:
+- histograms are keyed by metric name plus labels (e.g. command="buy"); p50 /
+  p95 / p99 are estimated from the buckets
+- counters count errors
+- LoopLagMonitor sleeps for a fixed interval and records how late it woke up,
+  which is how long something else held the event loop
+- render() produces the Prometheus text format for the /metrics endpoint
+"""
+
+import asyncio
+import bisect
+import functools
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+PREFIX = "tadzzy_"
+# 0.5ms .. ~2min, each bucket 1.5x the last
+BUCKETS: Tuple[float, ...] = tuple(0.0005 * 1.5 ** i for i in range(31))
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)  # last slot: above the largest bucket
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(BUCKETS, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th observation (capped at the max seen)."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank and n:
+                return min(BUCKETS[i], self.max) if i < len(BUCKETS) else self.max
+        return self.max
+
+
+def _labels(labels: dict) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(key: LabelKey, extra: str = "") -> str:
+    parts = [f'{k}="{v}"' for k, v in key]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Metrics:
+    def __init__(self):
+        self.histograms: Dict[str, Dict[LabelKey, Histogram]] = {}
+        self.counters: Dict[str, Dict[LabelKey, int]] = {}
+        self.started_at = time.time()
+
+    def observe(self, name: str, seconds: float, **labels):
+        series = self.histograms.setdefault(name, {})
+        key = _labels(labels)
+        hist = series.get(key)
+        if hist is None:
+            hist = series[key] = Histogram()
+        hist.observe(seconds)
+
+    def inc(self, name: str, n: int = 1, **labels):
+        series = self.counters.setdefault(name, {})
+        key = _labels(labels)
+        series[key] = series.get(key, 0) + n
+
+    def get(self, name: str, **labels) -> Optional[Histogram]:
+        return self.histograms.get(name, {}).get(_labels(labels))
+
+    @contextmanager
+    def timer(self, name: str, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def timed(self, name: str, **labels):
+        """Decorator for coroutine functions (e.g. under @tasks.loop); errors are counted too."""
+        def decorate(fn):
+            @functools.wraps(fn)
+            async def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return await fn(*args, **kwargs)
+                except Exception:
+                    self.inc(name.replace("_seconds", "_errors"), **labels)
+                    raise
+                finally:
+                    self.observe(name, time.perf_counter() - start, **labels)
+            return wrapper
+        return decorate
+
+    def top(self, name: str, label: str, n: int = 10) -> List[Tuple[str, Histogram]]:
+        """Series of one histogram, most total time first."""
+        series = [(dict(key).get(label, ""), hist) for key, hist in list(self.histograms.get(name, {}).items())]
+        series.sort(key=lambda item: item[1].total, reverse=True)
+        return series[:n]
+
+    def errors(self, name: str, **labels) -> int:
+        return self.counters.get(name, {}).get(_labels(labels), 0)
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        lines = [f"# TYPE {PREFIX}uptime_seconds gauge",
+                 f"{PREFIX}uptime_seconds {time.time() - self.started_at:.0f}"]
+        for name, series in sorted(self.counters.items()):
+            lines.append(f"# TYPE {PREFIX}{name}_total counter")
+            for key, value in list(series.items()):
+                lines.append(f"{PREFIX}{name}_total{_format_labels(key)} {value}")
+        for name, series in sorted(self.histograms.items()):
+            metric = PREFIX + name
+            lines.append(f"# TYPE {metric} histogram")
+            for key, hist in list(series.items()):
+                cumulative = 0
+                for bound, n in zip(BUCKETS, hist.counts):
+                    cumulative += n
+                    le = _format_labels(key, 'le="%.4g"' % bound)
+                    lines.append(f"{metric}_bucket{le} {cumulative}")
+                le = _format_labels(key, 'le="+Inf"')
+                lines.append(f"{metric}_bucket{le} {hist.count}")
+                lines.append(f"{metric}_sum{_format_labels(key)} {hist.total:.6f}")
+                lines.append(f"{metric}_count{_format_labels(key)} {hist.count}")
+        return "\n".join(lines) + "\n"
+
+
+class LoopLagMonitor:
+    """Records how late a fixed sleep wakes up, into the loop_lag_seconds histogram."""
+
+    def __init__(self, metrics: Metrics, interval: float = 0.5):
+        self.metrics = metrics
+        self.interval = interval
+        self.last = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            self.last = max(0.0, loop.time() - start - self.interval)
+            self.metrics.observe("loop_lag_seconds", self.last)
@@ -0,0 +1,100 @@
+"""
+Compact owned-card representation for TadzzyBot
+A card in a user's collection is an OwnedCard: a reference to the shared catalog
+entry plus a small dict of per-instance fields, only when they differ from the
+catalog. It reads like the old card dict (card["name"], card.get("income_rate")).
+
+On disk a card is just its catalog id (the player name); cards that differ from
+the catalog are stored as {"id": name, <differing fields>}. Old full-dict cards
+are upgraded when the data is loaded. An id that is no longer in the catalog
+gets placeholder fields (RETIRED_CARD) so commands can still show and sell it;
+it is saved as the same id, so it resolves again if the card comes back.
+"""
+
+from typing import Optional
+
+_MISSING = object()
+
+# Fields for cards whose id left the catalog: shown as retired, worth and earning nothing
+RETIRED_CARD = {"rarity": "Retired", "price": 0, "color": 0x95a5a6, "income_rate": 0}
+
+
+def _retired(name: str) -> dict:
+    return {**RETIRED_CARD, "name": name}
+
+
+class OwnedCard:
+    __slots__ = ("base", "extra")
+
+    def __init__(self, base: dict, extra: Optional[dict] = None):
+        self.base = base
+        self.extra = extra or None
+
+    @property
+    def card_id(self) -> str:
+        return self["name"]
+
+    def __getitem__(self, key):
+        if self.extra is not None and key in self.extra:
+            return self.extra[key]
+        return self.base[key]
+
+    def get(self, key, default=None):
+        if self.extra is not None and key in self.extra:
+            return self.extra[key]
+        return self.base.get(key, default)
+
+    def __contains__(self, key):
+        return key in self.base or (self.extra is not None and key in self.extra)
+
+    def to_dict(self) -> dict:
+        return {**self.base, **self.extra} if self.extra else dict(self.base)
+
+    def copy(self) -> "OwnedCard":
+        return OwnedCard(self.base, dict(self.extra) if self.extra else None)
+
+    def to_json(self):
+        if not self.extra:
+            return self.base["name"]
+        rec = {"id": self["name"]}
+        rec.update((k, v) for k, v in self.extra.items() if k != "name")
+        return rec
+
+    def __repr__(self):
+        return f"OwnedCard({self.to_json()!r})"
+
+
+def decode_card(raw, catalog) -> OwnedCard:
+    """Build an OwnedCard from any stored form: id string, {"id": ...} or a legacy full dict."""
+    if isinstance(raw, OwnedCard):
+        return raw
+    if isinstance(raw, str):
+        base = catalog.get(raw)
+        return OwnedCard(base if base is not None else _retired(raw))
+    fields = dict(raw)
+    name = fields.pop("id", _MISSING)
+    if name is _MISSING:
+        name = fields.get("name", "")
+    fields.pop("name", None)
+    base = catalog.get(name)
+    if base is None:
+        # No longer in the catalog: keep every field on the instance
+        return OwnedCard(_retired(name), fields)
+    extra = {k: v for k, v in fields.items() if base.get(k, _MISSING) != v}
+    if base["name"] != name:
+        extra["name"] = name
+    return OwnedCard(base, extra)
+
+
+def upgrade_collections(collections: dict, catalog) -> int:
+    """Convert every stored card to an OwnedCard in place. Returns how many were legacy dicts."""
+    legacy = 0
+    for uid, coll in collections.items():
+        for i, raw in enumerate(coll):
+            if isinstance(raw, OwnedCard):
+                continue
+            if isinstance(raw, dict) and "id" not in raw:
+                legacy += 1
+            coll[i] = decode_card(raw, catalog)
+    return legacy
+
@@ -0,0 +1,122 @@
+"""
+Button paginator for TadzzyBot
+Replaces the reaction paginator, which kept a wait_for("reaction_add") check
+per open menu (run against every reaction bot-wide) and made add/remove
+reaction calls on each page turn:
+- one persistent view (timeout=None, fixed custom ids) is registered once
+  with bot.add_view; discord.py routes every button click to it by custom id
+- messages are sent with a stopped copy of the same buttons, so discord.py
+  doesn't register a view per message; the click still finds the one
+  persistent view
+- per-message state lives in Paginator.sessions keyed by message id, so a
+  click is two dict lookups however many menus are open
+- a page turn is answered by editing the message in the interaction response
+- sessions expire through the shared DeadlineScheduler; expiry removes the
+  buttons with one edit. After a restart the sessions are gone and clicking
+  an old menu just removes its buttons
+"""
+
+import time
+from typing import Dict, List, Optional
+
+import discord
+
+from scheduler import DeadlineScheduler
+
+CUSTOM_ID_PREFIX = "tadzzy:pages:"
+
+
+class Session:
+    __slots__ = ("message", "pages", "index", "owner_id", "timeout")
+
+    def __init__(self, message: discord.Message, pages: List[discord.Embed], owner_id: int, timeout: float):
+        self.message = message
+        self.pages = pages
+        self.index = 0
+        self.owner_id = owner_id
+        self.timeout = timeout  # idle seconds before the buttons are removed
+
+
+class PaginatorView(discord.ui.View):
+    def __init__(self, paginator: Optional["Paginator"]):
+        super().__init__(timeout=None)
+        self.paginator = paginator
+
+    @discord.ui.button(emoji="◀️", style=discord.ButtonStyle.secondary, custom_id=CUSTOM_ID_PREFIX + "prev")
+    async def prev_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.paginator.turn(interaction, -1)
+
+    @discord.ui.button(emoji="⏹️", style=discord.ButtonStyle.secondary, custom_id=CUSTOM_ID_PREFIX + "stop")
+    async def stop_paging(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.paginator.close(interaction)
+
+    @discord.ui.button(emoji="▶️", style=discord.ButtonStyle.secondary, custom_id=CUSTOM_ID_PREFIX + "next")
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.paginator.turn(interaction, 1)
+
+
+class Paginator:
+    def __init__(self, scheduler: DeadlineScheduler, timeout: float = 60):
+        self.scheduler = scheduler
+        self.timeout = timeout
+        self.sessions: Dict[int, Session] = {}
+        self.view: Optional[PaginatorView] = None
+        self._layout: Optional[PaginatorView] = None
+
+    def start(self, client: discord.Client):
+        """Register the persistent view; needs the running loop (call from setup_hook)."""
+        if self.view is not None:
+            return
+        self.view = PaginatorView(self)
+        client.add_view(self.view)
+        # Same buttons, already stopped: sending it doesn't store a view per message
+        self._layout = PaginatorView(None)
+        self._layout.stop()
+
+    async def send(self, ctx, pages: List[discord.Embed], timeout: Optional[float] = None) -> Optional[discord.Message]:
+        if not pages:
+            return None
+        if len(pages) == 1:
+            return await ctx.send(embed=pages[0])
+        message = await ctx.send(embed=pages[0], view=self._layout)
+        session = self.sessions[message.id] = Session(message, pages, ctx.author.id, timeout or self.timeout)
+        self._touch(session)
+        return message
+
+    def _touch(self, session: Session):
+        self.scheduler.schedule(("pages", session.message.id), time.time() + session.timeout, self._expired)
+
+    async def _expired(self, key):
+        session = self.sessions.pop(key[1], None)
+        if session is None:
+            return
+        try:
+            await session.message.edit(view=None)
+        except discord.HTTPException:
+            pass
+
+    async def _session_for(self, interaction: discord.Interaction) -> Optional[Session]:
+        session = self.sessions.get(interaction.message.id)
+        if session is None:
+            await interaction.response.edit_message(view=None)
+            return None
+        if interaction.user.id != session.owner_id:
+            await interaction.response.send_message("These pages belong to someone else.", ephemeral=True)
+            return None
+        return session
+
+    async def turn(self, interaction: discord.Interaction, step: int):
+        session = await self._session_for(interaction)
+        if session is None:
+            return
+        session.index = (session.index + step) % len(session.pages)
+        self._touch(session)
+        await interaction.response.edit_message(embed=session.pages[session.index])
+
+    async def close(self, interaction: discord.Interaction):
+        session = await self._session_for(interaction)
+        if session is None:
+            return
+        del self.sessions[interaction.message.id]
+        self.scheduler.cancel(("pages", interaction.message.id))
+        await interaction.response.edit_message(view=None)
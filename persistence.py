@@ -0,0 +1,355 @@
+"""
+Background persistence for TadzzyBot
+- Cheap, consistent snapshot of the in-memory data taken on the event loop
+- JSON serialization, fsync and atomic replace done in a worker thread
+- Saves never overlap; callers can skip or wait when a save is in flight
+- Metrics for snapshot time, serialize time and bytes written
+- Dirty tracking + write-ahead log so a save only writes records that changed,
+  with periodic compaction back into the main data file
+"""
+
+import asyncio
+import json
+import os
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Set
+
+
+@dataclass
+class SaveMetrics:
+    saves: int = 0
+    skipped: int = 0
+    failures: int = 0
+    last_snapshot_ms: float = 0.0
+    last_serialize_ms: float = 0.0
+    last_bytes: int = 0
+    total_bytes: int = 0
+    last_saved_at: Optional[float] = None
+    last_records: int = 0
+    compactions: int = 0
+
+    def summary(self) -> str:
+        return (
+            f"snapshot {self.last_snapshot_ms:.1f}ms, serialize {self.last_serialize_ms:.1f}ms, "
+            f"{self.last_bytes:,} bytes, {self.last_records:,} records"
+        )
+
+
+def json_default(o):
+    """json `default=` hook: objects like OwnedCard provide their stored form via to_json()."""
+    to_json = getattr(o, "to_json", None)
+    if to_json is None:
+        raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+    return to_json()
+
+
+def copy_record(v):
+    return list(v) if isinstance(v, list) else dict(v) if isinstance(v, dict) else v
+
+
+def snapshot_section(value):
+    # Two levels deep is enough: sections are {key: scalar | list | dict} and the
+    # nested card / auction dicts are replaced rather than mutated by the bot.
+    if isinstance(value, dict):
+        return {k: copy_record(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return list(value)
+    return value
+
+
+def take_snapshot(data: dict, sections: Iterable[str]) -> Dict[str, object]:
+    return {k: snapshot_section(data[k]) for k in sections if k in data}
+
+
+def write_json_atomic(path: str, obj, indent: Optional[int] = None) -> int:
+    """Stream obj to path via a temp file + fsync + os.replace. Returns bytes written."""
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        # json.dump streams through the pure-Python encoder, which gives up the GIL
+        # every switch interval, so the event loop keeps running while a worker
+        # thread writes a large file. json.dumps would use the C encoder: faster
+        # overall, but it holds the GIL for the whole encode and stalls the loop.
+        json.dump(obj, f, ensure_ascii=False, indent=indent, default=json_default)
+        f.flush()
+        os.fsync(f.fileno())
+        size = f.tell()
+    os.replace(tmp, path)
+    return size
+
+
+class PersistenceWriter:
+    def __init__(self, path: str, sections: Iterable[str], indent: Optional[int] = None):
+        self.path = path
+        self.sections = tuple(sections)
+        self.indent = indent
+        self.metrics = SaveMetrics()
+        self._lock = asyncio.Lock()
+
+    @property
+    def busy(self) -> bool:
+        return self._lock.locked()
+
+    def snapshot(self, data: dict) -> Dict[str, object]:
+        start = time.perf_counter()
+        snap = take_snapshot(data, self.sections)
+        self.metrics.last_snapshot_ms = (time.perf_counter() - start) * 1000
+        return snap
+
+    def _write(self, snap) -> int:
+        start = time.perf_counter()
+        size = write_json_atomic(self.path, snap, self.indent)
+        self.metrics.last_serialize_ms = (time.perf_counter() - start) * 1000
+        return size
+
+    def _record(self, size: int):
+        self.metrics.saves += 1
+        self.metrics.last_bytes = size
+        self.metrics.total_bytes += size
+        self.metrics.last_saved_at = time.time()
+
+    def save_sync(self, data: dict) -> bool:
+        """Blocking save, for shutdown paths where no event loop is running."""
+        try:
+            self._record(self._write(self.snapshot(data)))
+            return True
+        except Exception as e:
+            self.metrics.failures += 1
+            print("Failed to save data:", e)
+            return False
+
+    async def save(self, data: dict, skip_if_busy: bool = False) -> Optional[bool]:
+        """
+        Snapshot on the loop, write in a worker thread.
+        Returns None when skip_if_busy is set and a save is already running.
+        """
+        if skip_if_busy and self._lock.locked():
+            self.metrics.skipped += 1
+            return None
+        async with self._lock:
+            try:
+                snap = self.snapshot(data)
+                size = await asyncio.to_thread(self._write, snap)
+                self._record(size)
+                return True
+            except Exception as e:
+                self.metrics.failures += 1
+                print("Failed to save data:", e)
+                return False
+
+
+# -----------------------------
+# Dirty tracking + write-ahead log
+# -----------------------------
+WHOLE_SECTION = None
+# Top-level key of the main file; the WAL's first line carries the same number
+GENERATION_KEY = "_generation"
+
+
+class DirtyTracker:
+    """Records which (section, key) pairs changed since the last save."""
+
+    def __init__(self):
+        self._keys: Dict[str, Set[str]] = {}
+        self._whole: Set[str] = set()
+
+    def mark(self, section: str, key: Optional[str] = WHOLE_SECTION):
+        if key is WHOLE_SECTION:
+            self._whole.add(section)
+        elif section not in self._whole:
+            self._keys.setdefault(section, set()).add(key)
+
+    def __bool__(self):
+        return bool(self._keys or self._whole)
+
+    def __len__(self):
+        return len(self._whole) + sum(len(v) for v in self._keys.values())
+
+    def clear(self):
+        self._keys.clear()
+        self._whole.clear()
+
+    def drain(self):
+        keys, whole = self._keys, self._whole
+        self._keys, self._whole = {}, set()
+        for section in whole:
+            keys.pop(section, None)
+        return keys, whole
+
+    def restore(self, keys: Dict[str, Set[str]], whole: Set[str]):
+        # Put back records from a failed save so the next one retries them
+        for section in whole:
+            self.mark(section)
+        for section, ks in keys.items():
+            for k in ks:
+                self.mark(section, k)
+
+
+def wal_records(data: dict, keys: Dict[str, Set[str]], whole: Set[str]) -> List[dict]:
+    records = []
+    for section in whole:
+        records.append({"s": section, "v": snapshot_section(data.get(section))})
+    for section, ks in keys.items():
+        values = data.get(section, {})
+        for k in ks:
+            if k in values:
+                records.append({"s": section, "k": k, "v": copy_record(values[k])})
+            else:
+                records.append({"s": section, "k": k, "d": 1})
+    return records
+
+
+def append_wal(path: str, records: List[dict]) -> int:
+    payload = "".join(json.dumps(r, ensure_ascii=False, separators=(",", ":"), default=json_default) + "\n" for r in records)
+    raw = payload.encode("utf-8")
+    with open(path, "ab") as f:
+        f.write(raw)
+        f.flush()
+        os.fsync(f.fileno())
+    return len(raw)
+
+
+def replay_wal(path: str, data: dict, sections: Iterable[str], generation: int = 0) -> int:
+    """
+    Apply WAL records on top of data. A torn final line (crash mid-append) is
+    cut off so later appends don't land behind it. A WAL whose header is older
+    than the main file's generation (crash after compaction replaced the file
+    but before the WAL was removed) is already contained in it and is deleted.
+    """
+    if not os.path.exists(path):
+        return 0
+    allowed = set(sections)
+    applied = 0
+    good_bytes = 0
+    stale = False
+    with open(path, "rb") as f:
+        for line in f:
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                break
+            if not good_bytes and rec.get("g", 0) < generation:
+                stale = True
+                break
+            good_bytes += len(line)
+            if "g" in rec:
+                continue  # header
+            section = rec.get("s")
+            if section not in allowed:
+                continue
+            if "k" not in rec:
+                data[section] = rec["v"]
+            elif rec.get("d"):
+                data.setdefault(section, {}).pop(rec["k"], None)
+            else:
+                data.setdefault(section, {})[rec["k"]] = rec["v"]
+            applied += 1
+    if stale:
+        os.remove(path)
+        return 0
+    if good_bytes < os.path.getsize(path):
+        with open(path, "r+b") as f:
+            f.truncate(good_bytes)
+    return applied
+
+
+class IncrementalPersistence(PersistenceWriter):
+    """
+    Saves append only the dirty records to <path>.wal; every so often the WAL is
+    compacted by rewriting the full data file and removing the log.
+    Each compaction bumps a generation number stored in the main file and in
+    the first line of every new WAL, so a log left behind by a crash between
+    the two steps is recognised as older than the file and not replayed.
+    """
+
+    def __init__(self, path: str, sections: Iterable[str], indent: Optional[int] = None,
+                 compact_every_records: int = 100_000, compact_wal_ratio: float = 0.5):
+        super().__init__(path, sections, indent)
+        self.wal_path = path + ".wal"
+        self.dirty = DirtyTracker()
+        self.compact_every_records = compact_every_records
+        self.compact_wal_ratio = compact_wal_ratio
+        self._wal_records = 0
+        self._wal_bytes = 0
+        self.generation = 0
+
+    def mark(self, section: str, key: Optional[str] = WHOLE_SECTION):
+        self.dirty.mark(section, key)
+
+    def load(self, data: dict) -> int:
+        """Replay the WAL over data that was just loaded from the main file."""
+        self.dirty.clear()
+        self.generation = int(data.pop(GENERATION_KEY, 0) or 0)
+        applied = replay_wal(self.wal_path, data, self.sections, self.generation)
+        self._wal_records = applied
+        self._wal_bytes = os.path.getsize(self.wal_path) if os.path.exists(self.wal_path) else 0
+        return applied
+
+    def _needs_compaction(self) -> bool:
+        if not os.path.exists(self.path):
+            return True
+        if self._wal_records >= self.compact_every_records:
+            return True
+        return self._wal_bytes > os.path.getsize(self.path) * self.compact_wal_ratio
+
+    def _truncate_wal(self):
+        if os.path.exists(self.wal_path):
+            os.remove(self.wal_path)
+        self._wal_records = 0
+        self._wal_bytes = 0
+
+    def _compact(self, snap) -> int:
+        snap[GENERATION_KEY] = self.generation + 1
+        size = self._write(snap)
+        self.generation += 1
+        self._truncate_wal()
+        self.metrics.compactions += 1
+        return size
+
+    def _append(self, records: List[dict]) -> int:
+        start = time.perf_counter()
+        if not os.path.exists(self.wal_path):
+            records = [{"g": self.generation}] + records
+        size = append_wal(self.wal_path, records)
+        self.metrics.last_serialize_ms = (time.perf_counter() - start) * 1000
+        self._wal_records += len(records)
+        self._wal_bytes += size
+        return size
+
+    def save_sync(self, data: dict) -> bool:
+        try:
+            self.dirty.clear()
+            self._record(self._compact(self.snapshot(data)))
+            self.metrics.last_records = 0
+            return True
+        except Exception as e:
+            self.metrics.failures += 1
+            print("Failed to save data:", e)
+            return False
+
+    async def save(self, data: dict, skip_if_busy: bool = False) -> Optional[bool]:
+        if skip_if_busy and self._lock.locked():
+            self.metrics.skipped += 1
+            return None
+        async with self._lock:
+            keys, whole = {}, set()
+            try:
+                if self._needs_compaction():
+                    self.dirty.clear()
+                    snap = self.snapshot(data)
+                    size = await asyncio.to_thread(self._compact, snap)
+                    self.metrics.last_records = 0
+                else:
+                    start = time.perf_counter()
+                    keys, whole = self.dirty.drain()
+                    records = wal_records(data, keys, whole)
+                    self.metrics.last_snapshot_ms = (time.perf_counter() - start) * 1000
+                    self.metrics.last_records = len(records)
+                    size = await asyncio.to_thread(self._append, records) if records else 0
+                self._record(size)
+                return True
+            except Exception as e:
+                self.dirty.restore(keys, whole)
+                self.metrics.failures += 1
+                print("Failed to save data:", e)
+                return False
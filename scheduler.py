@@ -0,0 +1,102 @@
+"""
+Deadline scheduler for TadzzyBot
+One asyncio task drives a min-heap of (deadline, key) entries, so thousands of
+auctions / trades / giveaways don't each need a sleeping task. Deadlines are
+epoch seconds so they can be persisted and rescheduled after a restart.
+"""
+
+import asyncio
+import heapq
+import itertools
+import time
+from typing import Awaitable, Callable, Dict, Hashable, Optional, Union
+
+Callback = Callable[[Hashable], Union[None, Awaitable[None]]]
+
+
+class DeadlineScheduler:
+    def __init__(self):
+        self._heap = []  # (deadline, seq, key)
+        self._entries: Dict[Hashable, tuple] = {}  # key -> (deadline, seq, callback)
+        self._seq = itertools.count()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._running_callbacks = set()
+        self.fired = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def deadline(self, key) -> Optional[float]:
+        entry = self._entries.get(key)
+        return entry[0] if entry else None
+
+    def schedule(self, key: Hashable, deadline: float, callback: Callback):
+        """Run callback(key) at deadline (epoch seconds). Rescheduling a key replaces it."""
+        seq = next(self._seq)
+        self._entries[key] = (deadline, seq, callback)
+        heapq.heappush(self._heap, (deadline, seq, key))
+        if self._wakeup is not None and self._heap[0][1] == seq:
+            self._wakeup.set()
+
+    def cancel(self, key: Hashable):
+        # Heap entry is left behind and skipped when it surfaces
+        self._entries.pop(key, None)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def _callback_done(self, task: asyncio.Task):
+        self._running_callbacks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            print("[Scheduler] Callback failed:", task.exception())
+
+    def _pop_stale(self):
+        heap = self._heap
+        while heap:
+            deadline, seq, key = heap[0]
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] == seq:
+                return
+            heapq.heappop(heap)
+
+    async def _run(self):
+        while True:
+            self._pop_stale()
+            timeout = None
+            if self._heap:
+                timeout = self._heap[0][0] - time.time()
+                if timeout <= 0:
+                    _deadline, _seq, key = heapq.heappop(self._heap)
+                    _d, _s, callback = self._entries.pop(key)
+                    self.fired += 1
+                    try:
+                        result = callback(key)
+                    except Exception as e:
+                        print(f"[Scheduler] Callback for {key!r} failed:", e)
+                        continue
+                    if asyncio.iscoroutine(result):
+                        # Don't let one slow callback (e.g. a channel send) hold up the others
+                        task = asyncio.create_task(result)
+                        self._running_callbacks.add(task)
+                        task.add_done_callback(self._callback_done)
+                    continue
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
@@ -0,0 +1,59 @@
+"""
+Startup profiling for TadzzyBot
+Set TADZZY_PROFILE_STARTUP=1 (or run `python bot.py --profile-startup`) to print
+how long each startup phase took, from the first import to the first on_ready.
+Phases are always recorded until the first report, a handful of perf_counter
+calls; marks after that (on_ready runs again on every reconnect) are ignored.
+"""
+
+import os
+import sys
+import time
+from contextlib import contextmanager
+from typing import List, Optional, Tuple
+
+
+def profile_requested(argv: Optional[List[str]] = None) -> bool:
+    argv = sys.argv if argv is None else argv
+    return "--profile-startup" in argv or os.getenv("TADZZY_PROFILE_STARTUP", "") not in ("", "0")
+
+
+class StartupProfile:
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.started = time.perf_counter()
+        self._last = self.started
+        self.phases: List[Tuple[str, float]] = []
+        self.reported = False
+
+    def mark(self, name: str):
+        """Close a phase covering everything since the previous mark."""
+        if self.reported:
+            return
+        now = time.perf_counter()
+        self.phases.append((name, now - self._last))
+        self._last = now
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            if not self.reported:
+                now = time.perf_counter()
+                self.phases.append((name, now - start))
+                self._last = now
+
+    def report(self):
+        """Print the phase table once (on_ready also fires on reconnects)."""
+        if self.reported:
+            return
+        self.reported = True
+        if not self.enabled:
+            return
+        total = time.perf_counter() - self.started
+        print(f"[Startup] Ready after {total * 1000:.1f}ms")
+        for name, seconds in self.phases:
+            share = seconds / total * 100 if total else 0.0
+            print(f"[Startup]   {name:<20} {seconds * 1000:9.1f}ms  {share:5.1f}%")
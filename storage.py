@@ -0,0 +1,273 @@
+"""
+Pluggable storage backends for TadzzyBot
+- JsonBackend: tadzzy_data.json + write-ahead log (see persistence.py)
+- SQLiteBackend: local SQLite database in WAL mode, dirty records flushed in
+  one batched transaction per save
+- migrate_json_to_sqlite: one-shot migration from the JSON layout
+
+Both backends keep the same in-memory `data` dict the bot works on, so they can
+be swapped with the TADZZY_STORAGE environment variable and benchmarked against
+the same workload (benchmarks/bench_storage.py).
+
+Usage: python storage.py migrate [json_file] [sqlite_file]
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+import sys
+import time
+from typing import Dict, Iterable, List, Optional
+
+from loader import ProgressCallback, stream_load
+from persistence import IncrementalPersistence, SaveMetrics, DirtyTracker, json_default, wal_records, GENERATION_KEY, WHOLE_SECTION
+
+PERSISTED_SECTIONS = ["tadbucks_balances", "tadzzy_points", "xp_levels", "user_collections", "gamenights", "auctions", "trades",
+                      "giveaways", "giveaway_entrants", "cooldowns", "settings"]
+
+
+class StorageBackend:
+    """Interface shared by all backends."""
+
+    name = "base"
+    location = ""
+
+    @property
+    def lock(self) -> asyncio.Lock:
+        """Held by every save; hold it to keep saves out (e.g. while reloading)."""
+        return self._lock
+
+    def load(self, data: dict, progress: Optional[ProgressCallback] = None) -> bool:
+        """Fill data in place. Returns False when there is nothing stored yet."""
+        raise NotImplementedError
+
+    def mark(self, section: str, key: Optional[str] = WHOLE_SECTION):
+        raise NotImplementedError
+
+    async def save(self, data: dict, skip_if_busy: bool = False) -> Optional[bool]:
+        raise NotImplementedError
+
+    def save_sync(self, data: dict) -> bool:
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+# -----------------------------
+# JSON
+# -----------------------------
+class JsonBackend(IncrementalPersistence, StorageBackend):
+    name = "json"
+
+    @property
+    def location(self):
+        return self.path
+
+    def load(self, data: dict, progress: Optional[ProgressCallback] = None) -> bool:
+        found = os.path.exists(self.path)
+        if found:
+            report = stream_load(self.path, data, self.sections + (GENERATION_KEY,), progress)
+            print(f"✅ {report.summary()}")
+            for section, key, reason in report.examples:
+                print(f"   Dropped {section}[{key}]: {reason}")
+        replayed = super().load(data)
+        if replayed:
+            print(f"✅ Replayed {replayed} records from {self.wal_path}")
+        return found
+
+
+# -----------------------------
+# SQLite
+# -----------------------------
+# section -> (table, value is an integer)
+SQLITE_TABLES = {
+    "tadbucks_balances": ("balances", True),
+    "tadzzy_points": ("points", True),
+    "xp_levels": ("xp", True),
+    "user_collections": ("collections", False),
+    "auctions": ("auctions", False),
+    "trades": ("trades", False),
+    "giveaways": ("giveaways", False),
+    "giveaway_entrants": ("giveaway_entrants", False),
+    "cooldowns": ("cooldowns", True),
+}
+# Everything else (gamenights, settings, ...) is stored whole in the kv table
+SQLITE_KV_TABLE = "kv"
+
+
+def _dumps(v) -> str:
+    return json.dumps(v, ensure_ascii=False, separators=(",", ":"), default=json_default)
+
+
+class SQLiteBackend(StorageBackend):
+    name = "sqlite"
+
+    def __init__(self, path: str, sections: Iterable[str]):
+        self.path = path
+        self.location = path
+        self.sections = tuple(sections)
+        self.dirty = DirtyTracker()
+        self.metrics = SaveMetrics()
+        self._lock = asyncio.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    @property
+    def busy(self) -> bool:
+        return self._lock.locked()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            # Only ever used by one thread at a time (guarded by self._lock)
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            for table, is_int in SQLITE_TABLES.values():
+                value_type = "INTEGER" if is_int else "TEXT"
+                conn.execute(
+                    f"CREATE TABLE IF NOT EXISTS {table} (key TEXT PRIMARY KEY, value {value_type} NOT NULL) WITHOUT ROWID"
+                )
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {SQLITE_KV_TABLE} (key TEXT PRIMARY KEY, value TEXT NOT NULL) WITHOUT ROWID"
+            )
+            self._conn = conn
+        return self._conn
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def mark(self, section: str, key: Optional[str] = WHOLE_SECTION):
+        self.dirty.mark(section, key)
+
+    def load(self, data: dict, progress: Optional[ProgressCallback] = None) -> bool:
+        found = os.path.exists(self.path)
+        conn = self._connect()
+        for section in self.sections:
+            if section in SQLITE_TABLES:
+                table, is_int = SQLITE_TABLES[section]
+                rows = conn.execute(f"SELECT key, value FROM {table}")
+                if is_int:
+                    data[section] = dict(rows)
+                else:
+                    data[section] = {k: json.loads(v) for k, v in rows}
+            else:
+                row = conn.execute(f"SELECT value FROM {SQLITE_KV_TABLE} WHERE key = ?", (section,)).fetchone()
+                if row is not None:
+                    data[section] = json.loads(row[0])
+        self.dirty.clear()
+        return found
+
+    def _apply(self, records: List[dict]) -> int:
+        """Write records in a single transaction. Returns the number of rows touched."""
+        start = time.perf_counter()
+        upserts: Dict[str, list] = {}
+        deletes: Dict[str, list] = {}
+        clears: List[str] = []
+        for rec in records:
+            section = rec["s"]
+            if section not in SQLITE_TABLES:
+                upserts.setdefault(SQLITE_KV_TABLE, []).append((section, _dumps(rec["v"])))
+                continue
+            table, is_int = SQLITE_TABLES[section]
+            if "k" not in rec:
+                clears.append(table)
+                rows = rec["v"].items()
+            elif rec.get("d"):
+                deletes.setdefault(table, []).append((rec["k"],))
+                continue
+            else:
+                rows = [(rec["k"], rec["v"])]
+            target = upserts.setdefault(table, [])
+            for k, v in rows:
+                target.append((k, int(v) if is_int else _dumps(v)))
+
+        conn = self._connect()
+        conn.execute("BEGIN")
+        try:
+            for table in clears:
+                conn.execute(f"DELETE FROM {table}")
+            for table, rows in deletes.items():
+                conn.executemany(f"DELETE FROM {table} WHERE key = ?", rows)
+            for table, rows in upserts.items():
+                conn.executemany(f"INSERT OR REPLACE INTO {table} (key, value) VALUES (?, ?)", rows)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        self.metrics.last_serialize_ms = (time.perf_counter() - start) * 1000
+        return sum(len(r) for r in upserts.values()) + sum(len(r) for r in deletes.values())
+
+    def _record(self, rows: int):
+        self.metrics.saves += 1
+        self.metrics.last_records = rows
+        self.metrics.last_bytes = 0
+        self.metrics.last_saved_at = time.time()
+
+    def save_all(self, data: dict) -> int:
+        """Write every persisted section (used by the migrator)."""
+        records = [{"s": section, "v": data[section]} for section in self.sections if section in data]
+        return self._apply(records)
+
+    def save_sync(self, data: dict) -> bool:
+        keys, whole = self.dirty.drain()
+        try:
+            self._record(self._apply(wal_records(data, keys, whole)))
+            return True
+        except Exception as e:
+            self.dirty.restore(keys, whole)
+            self.metrics.failures += 1
+            print("Failed to save data:", e)
+            return False
+
+    async def save(self, data: dict, skip_if_busy: bool = False) -> Optional[bool]:
+        if skip_if_busy and self._lock.locked():
+            self.metrics.skipped += 1
+            return None
+        async with self._lock:
+            start = time.perf_counter()
+            keys, whole = self.dirty.drain()
+            records = wal_records(data, keys, whole)
+            self.metrics.last_snapshot_ms = (time.perf_counter() - start) * 1000
+            try:
+                rows = await asyncio.to_thread(self._apply, records) if records else 0
+                self._record(rows)
+                return True
+            except Exception as e:
+                self.dirty.restore(keys, whole)
+                self.metrics.failures += 1
+                print("Failed to save data:", e)
+                return False
+
+
+def create_storage(kind: str, json_path: str, sqlite_path: str, sections: Iterable[str]) -> StorageBackend:
+    if kind == "sqlite":
+        return SQLiteBackend(sqlite_path, sections)
+    if kind != "json":
+        print(f"Unknown storage backend '{kind}', falling back to json.")
+    return JsonBackend(json_path, sections)
+
+
+def migrate_json_to_sqlite(json_path: str, sqlite_path: str, sections: Iterable[str]) -> int:
+    """Copy the JSON data file (plus any pending WAL records) into a SQLite database."""
+    sections = tuple(sections)
+    data: dict = {}
+    if not JsonBackend(json_path, sections).load(data):
+        raise FileNotFoundError(json_path)
+    db = SQLiteBackend(sqlite_path, sections)
+    try:
+        return db.save_all(data)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] != "migrate":
+        print(__doc__)
+        sys.exit(1)
+    src = sys.argv[2] if len(sys.argv) > 2 else "tadzzy_data.json"
+    dst = sys.argv[3] if len(sys.argv) > 3 else "tadzzy_data.db"
+    rows = migrate_json_to_sqlite(src, dst, PERSISTED_SECTIONS)
+    print(f"✅ Migrated {rows} rows from {src} to {dst}")
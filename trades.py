@@ -0,0 +1,92 @@
+"""
+Trade offers for TadzzyBot
+Pending offers live in data["trades"] (trade_id -> trade dict) so they survive a
+restart. Expiry is a deadline on the shared DeadlineScheduler instead of a
+sleeping command coroutine per offer, and per-user indexes answer "my incoming /
+outgoing trades" without scanning every offer. An offer names the card by its
+catalog id, not by its position in the sender's collection.
+"""
+
+import time
+from typing import Callable, Dict, List, Optional, Set
+
+TRADE_TTL_SECONDS = 5 * 60
+
+
+class TradeManager:
+    def __init__(self, trades: dict, scheduler, mark: Callable[[str], None], ttl_seconds: float = TRADE_TTL_SECONDS):
+        self.trades = trades
+        self.scheduler = scheduler
+        self.mark = mark
+        self.ttl = ttl_seconds
+        self._incoming: Dict[int, Set[str]] = {}
+        self._outgoing: Dict[int, Set[str]] = {}
+
+    def _index(self, trade_id: str, trade: dict):
+        self._incoming.setdefault(trade["recipient"], set()).add(trade_id)
+        self._outgoing.setdefault(trade["sender"], set()).add(trade_id)
+        self.scheduler.schedule(("trade", trade_id), trade["expires_at"], self._expired)
+
+    def _unindex(self, trade_id: str, trade: dict):
+        for index, uid in ((self._incoming, trade["recipient"]), (self._outgoing, trade["sender"])):
+            ids = index.get(uid)
+            if ids is not None:
+                ids.discard(trade_id)
+                if not ids:
+                    del index[uid]
+        self.scheduler.cancel(("trade", trade_id))
+
+    def _expired(self, key):
+        self.remove(key[1])
+
+    def load(self, trades: dict) -> int:
+        """Adopt a freshly loaded trades section, dropping offers that expired while offline."""
+        for trade_id, trade in list(self.trades.items()):
+            self._unindex(trade_id, trade)
+        self.trades = trades
+        now = time.time()
+        for trade_id, trade in list(trades.items()):
+            if trade.get("status") != "pending" or "card_id" not in trade or trade.get("expires_at", 0) <= now:
+                del trades[trade_id]
+                self.mark(trade_id)
+                continue
+            self._index(trade_id, trade)
+        return len(trades)
+
+    def create(self, sender: int, recipient: int, card_id: str) -> str:
+        now = time.time()
+        trade_id = f"{sender}_{recipient}_{int(now)}"
+        n = 1
+        while trade_id in self.trades:
+            n += 1
+            trade_id = f"{sender}_{recipient}_{int(now)}_{n}"
+        trade = {
+            "sender": sender,
+            "recipient": recipient,
+            "card_id": card_id,
+            "status": "pending",
+            "created_at": now,
+            "expires_at": now + self.ttl,
+        }
+        self.trades[trade_id] = trade
+        self._index(trade_id, trade)
+        self.mark(trade_id)
+        return trade_id
+
+    def get(self, trade_id: str) -> Optional[dict]:
+        trade = self.trades.get(trade_id)
+        if trade is None or trade["expires_at"] <= time.time():
+            return None
+        return trade
+
+    def remove(self, trade_id: str):
+        trade = self.trades.pop(trade_id, None)
+        if trade is not None:
+            self._unindex(trade_id, trade)
+            self.mark(trade_id)
+
+    def incoming(self, user_id: int) -> List[str]:
+        return sorted(self._incoming.get(user_id, ()))
+
+    def outgoing(self, user_id: int) -> List[str]:
+        return sorted(self._outgoing.get(user_id, ()))
@@ -0,0 +1,85 @@
+"""
+Economy transactions for TadzzyBot
+Commands used to read a balance or a collection, await something (a reaction,
+a channel send) and then write back what they had read, so two commands from
+the same user could double-spend or sell the same card twice.
+- Economy: compare-and-set style mutations that re-check state at the moment of
+  writing (debit only if the balance still covers it, remove a card only if
+  that exact card is still owned)
+- none of them await, so each runs whole on the event loop and no lock is
+  needed: a command reads, awaits, then calls one of these, and whatever
+  changed during the await is caught by the re-check
+"""
+
+from typing import Callable, Optional
+
+
+class Economy:
+    """
+    Compare-and-set operations over the bot's balance / collection helpers.
+    None of these await, so each one is atomic on the event loop.
+    """
+
+    def __init__(self, get_balance: Callable[[int], int], set_balance: Callable[[int, int], None],
+                 get_collection: Callable[[int], list], add_card: Callable[[int, object], bool],
+                 remove_card: Callable[[int, object], bool],
+                 record: Optional[Callable[..., None]] = None):
+        self.get_balance = get_balance
+        self.set_balance = set_balance
+        self.get_collection = get_collection
+        self.add_card = add_card
+        self.remove_card = remove_card
+        self.record = record  # record(user_id, delta, new_balance, kind, ref), e.g. Ledger.record
+
+    def _set(self, user_id: int, old: int, new: int, kind: str, ref: Optional[str]):
+        self.set_balance(user_id, new)
+        if self.record is not None:
+            self.record(user_id, new - old, new, kind, ref)
+
+    def debit(self, user_id: int, amount: int, kind: str = "adjust", ref: Optional[str] = None) -> Optional[int]:
+        """Take amount if the balance still covers it. Returns the new balance, or None."""
+        balance = self.get_balance(user_id)
+        if amount > balance:
+            return None
+        self._set(user_id, balance, balance - amount, kind, ref)
+        return balance - amount
+
+    def credit(self, user_id: int, amount: int, kind: str = "adjust", ref: Optional[str] = None) -> int:
+        balance = self.get_balance(user_id)
+        self._set(user_id, balance, balance + amount, kind, ref)
+        return balance + amount
+
+    def owns(self, user_id: int, card) -> bool:
+        return any(c is card for c in self.get_collection(user_id))
+
+    def compare_and_remove_card(self, user_id: int, card) -> bool:
+        """Remove this exact card instance, only if the user still holds it."""
+        if not self.owns(user_id, card):
+            return False
+        return self.remove_card(user_id, card)
+
+    def buy_card(self, user_id: int, card, price: int, kind: str = "buy") -> Optional[int]:
+        """Debit and add the card together; nothing changes if either step can't happen."""
+        balance = self.get_balance(user_id)
+        if price > balance:
+            return None
+        if not self.add_card(user_id, card):
+            return None
+        self._set(user_id, balance, balance - price, kind, card["name"])
+        return balance - price
+
+    def sell_card(self, user_id: int, card, price: int, kind: str = "sell") -> Optional[int]:
+        if not self.compare_and_remove_card(user_id, card):
+            return None
+        return self.credit(user_id, price, kind, card["name"])
+
+    def transfer_card(self, from_id: int, to_id: int, card, max_slots: int) -> bool:
+        """Move the card between collections; it stays with from_id unless both steps succeed."""
+        if len(self.get_collection(to_id)) >= max_slots:
+            return False
+        if not self.compare_and_remove_card(from_id, card):
+            return False
+        if not self.add_card(to_id, card):
+            self.add_card(from_id, card)  # put it back
+            return False
+        return True
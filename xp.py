@@ -0,0 +1,43 @@
+"""
+Batched XP accounting for TadzzyBot
+on_message only bumps a per-user counter here; the bot flushes the counters into
+the main store on a short timer and pays level-up rewards for every multiple of
+the level threshold crossed inside the batch.
+"""
+
+from typing import Dict, List, Tuple
+
+
+def levels_crossed(old_xp: int, new_xp: int, threshold: int) -> int:
+    """Number of multiples of threshold in (old_xp, new_xp]."""
+    if new_xp <= old_xp:
+        return 0
+    return new_xp // threshold - old_xp // threshold
+
+
+class XPAccumulator:
+    __slots__ = ("_counts", "_targets")
+
+    def __init__(self):
+        self._counts: Dict[int, int] = {}
+        # user_id -> (channel, mention) of the latest message, for level-up announcements
+        self._targets: Dict[int, tuple] = {}
+
+    def add(self, user_id: int, channel=None, mention: str = ""):
+        counts = self._counts
+        counts[user_id] = counts.get(user_id, 0) + 1
+        self._targets[user_id] = (channel, mention)
+
+    def pending(self, user_id: int) -> int:
+        return self._counts.get(user_id, 0)
+
+    def __len__(self):
+        return len(self._counts)
+
+    def pop(self, user_id: int) -> Tuple[int, tuple]:
+        return self._counts.pop(user_id, 0), self._targets.pop(user_id, (None, ""))
+
+    def drain(self) -> List[Tuple[int, int, object, str]]:
+        counts, targets = self._counts, self._targets
+        self._counts, self._targets = {}, {}
+        return [(uid, n) + targets.get(uid, (None, "")) for uid, n in counts.items()]